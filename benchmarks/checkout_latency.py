@@ -0,0 +1,102 @@
+"""Checkout latency against cart size.
+
+Posts carts of increasing line counts to ``/api/pos/checkout`` on a fresh
+SQLite file and reports, per line count, p50/p95 latency, latency per line
+and SQL statements per checkout (from the Server-Timing header). With bulk
+item and ledger inserts the statement count stays flat as carts grow.
+
+Usage:
+    python benchmarks/checkout_latency.py --lines 1,10,50,100 --runs 50
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app import create_app  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Product, User  # noqa: E402
+from routes import QUERY_COUNT, benchmark_config, percentile  # noqa: E402
+
+USERNAME = 'bench'
+PASSWORD = 'bench-password'
+
+
+def prepare(app, products):
+    with app.app_context():
+        db.create_all()
+        user = User(username=USERNAME, email='bench@example.com', is_active=True)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.add_all(
+            Product(name=f'Product {i}', price=100.0, unit='piece', stock_quantity=10_000_000)
+            for i in range(products)
+        )
+        db.session.commit()
+        return [product_id for (product_id,) in db.session.query(Product.id).order_by(Product.id)]
+
+
+def measure(client, product_ids, line_count, runs):
+    cart = {
+        'items': [{'id': product_id, 'quantity': 1, 'price': 100.0} for product_id in product_ids[:line_count]],
+        'total_amount': 100.0 * line_count,
+        'payment_method': 'cash',
+    }
+    client.post('/api/pos/checkout', json=cart)  # warm up
+    latencies, queries = [], []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = client.post('/api/pos/checkout', json=cart)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 201:
+            raise RuntimeError(f'checkout failed with {response.status_code}: {response.get_data(as_text=True)}')
+        match = QUERY_COUNT.search(response.headers.get('Server-Timing', ''))
+        queries.append(int(match.group(1)) if match else 0)
+    p50 = percentile(latencies, 50)
+    return {
+        'p50_ms': round(p50, 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'ms_per_line': round(p50 / line_count, 3),
+        'queries': max(queries),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lines', default='1,5,10,25,50,100', help='Comma-separated cart line counts')
+    parser.add_argument('--runs', type=int, default=30, help='Checkouts per line count')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    args = parser.parse_args(argv)
+    line_counts = [int(count) for count in args.lines.split(',')]
+
+    tmpdir = tempfile.mkdtemp()
+    try:
+        app = create_app(benchmark_config(os.path.join(tmpdir, 'checkout.db')))
+        product_ids = prepare(app, max(line_counts))
+        client = app.test_client()
+        client.post('/login', data={'username': USERNAME, 'password': PASSWORD})
+
+        report = {}
+        for line_count in line_counts:
+            report[line_count] = result = measure(client, product_ids, line_count, args.runs)
+            print(f"  {line_count:>4} lines  p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+                  f"{result['ms_per_line']:>7.3f} ms/line  {result['queries']:>3} queries")
+        with app.app_context():
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(tmpdir)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
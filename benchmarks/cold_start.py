@@ -0,0 +1,119 @@
+"""Cold-start benchmark for application workers.
+
+Each run starts a fresh Python interpreter (the same as a new gunicorn worker
+without --preload), imports the WSGI entry point and reports how long the
+import took, the resident memory afterwards and which heavy libraries ended up
+loaded.
+
+Usage:
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py --runs 10 --output cold_start.json
+    python benchmarks/cold_start.py --max-import-seconds 2 --max-rss-mb 120
+
+The process exits with status 1 when a threshold is exceeded or when one of
+the heavy libraries is imported at startup, so it can be used in CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from lazy_imports import HEAVY_MODULES  # noqa: E402
+
+# Executed in the child interpreter. Kept dependency free so the measurement
+# only includes what the target module itself pulls in.
+CHILD_SCRIPT = r'''
+import importlib, json, sys, time
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+elapsed = time.perf_counter() - start
+rss_kb = 0
+try:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                rss_kb = int(line.split()[1])
+                break
+except OSError:
+    import resource
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = [name for name in sys.argv[2:] if name in sys.modules]
+print(json.dumps({'import_seconds': elapsed, 'rss_mb': rss_kb / 1024.0, 'heavy_modules': heavy}))
+'''
+
+
+def measure_once(target):
+    """Import ``target`` in a fresh interpreter and return its measurements."""
+    result = subprocess.run(
+        [sys.executable, '-c', CHILD_SCRIPT, target, *HEAVY_MODULES],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # The app may print to stdout while importing; the report is the last line
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def run_benchmark(target, runs):
+    samples = [measure_once(target) for _ in range(runs)]
+    import_times = [s['import_seconds'] for s in samples]
+    rss = [s['rss_mb'] for s in samples]
+    heavy = sorted({name for s in samples for name in s['heavy_modules']})
+    return {
+        'target': target,
+        'runs': runs,
+        'import_seconds': {
+            'median': statistics.median(import_times),
+            'max': max(import_times),
+        },
+        'rss_mb': {
+            'median': statistics.median(rss),
+            'max': max(rss),
+        },
+        'heavy_modules_loaded': heavy,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', default='wsgi', help='Module to import (default: wsgi)')
+    parser.add_argument('--runs', type=int, default=5, help='Number of fresh interpreters to start')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--max-import-seconds', type=float, help='Fail if the median import time exceeds this')
+    parser.add_argument('--max-rss-mb', type=float, help='Fail if the median RSS exceeds this')
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.target, args.runs)
+
+    print(f"Cold start of '{report['target']}' over {report['runs']} runs")
+    print(f"  import time: median {report['import_seconds']['median']:.3f}s, "
+          f"max {report['import_seconds']['max']:.3f}s")
+    print(f"  RSS per worker: median {report['rss_mb']['median']:.1f} MB, "
+          f"max {report['rss_mb']['max']:.1f} MB")
+    print(f"  heavy modules loaded at startup: {', '.join(report['heavy_modules_loaded']) or 'none'}")
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+
+    failures = []
+    if report['heavy_modules_loaded']:
+        failures.append(f"heavy modules imported at startup: {report['heavy_modules_loaded']}")
+    if args.max_import_seconds is not None and report['import_seconds']['median'] > args.max_import_seconds:
+        failures.append(f"median import time above {args.max_import_seconds}s")
+    if args.max_rss_mb is not None and report['rss_mb']['median'] > args.max_rss_mb:
+        failures.append(f"median RSS above {args.max_rss_mb} MB")
+
+    for failure in failures:
+        print(f'REGRESSION: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""Route-level benchmark against a production-sized SQLite database.
+
+Seeds (once, then reuses) a database with 10k products, 1M sales, ~3M sale
+items and 5M stock history rows at ``--scale 1``, then drives the main routes
+through the Flask test client and reports, per route, p50/p95 latency, the
+number of SQL statements per request (from the Server-Timing header) and the
+peak Python memory allocated while serving one request.
+
+Usage:
+    python benchmarks/routes.py --scale 0.01 --output baseline.json
+    python benchmarks/routes.py --scale 0.01 --baseline baseline.json
+
+With ``--baseline`` the process exits with status 1 when a route got slower
+than the latency tolerance, issues more queries or allocates more memory than
+the memory tolerance allows, so it can be used in CI. The application cache is
+cleared before every request, so the numbers reflect uncached work.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import re
+import sqlite3
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import update  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from extensions import cache, db  # noqa: E402
+from models import Product, User  # noqa: E402
+from seeding import SeedPlan, seed_database  # noqa: E402
+
+FULL_SCALE = {
+    'products': 10_000,
+    'sales': 1_000_000,
+    'items_per_sale': 3,
+    'stock_history': 5_000_000,
+}
+USERNAME = 'bench'
+PASSWORD = 'bench-password'
+QUERY_COUNT = re.compile(r'desc="(\d+) queries"')
+
+
+def scaled_counts(scale):
+    return {
+        'products': max(int(FULL_SCALE['products'] * scale), 10),
+        'sales': max(int(FULL_SCALE['sales'] * scale), 10),
+        'items_per_sale': FULL_SCALE['items_per_sale'],
+        'stock_history': max(int(FULL_SCALE['stock_history'] * scale), 10),
+    }
+
+
+def benchmark_config(path):
+    config = {k: getattr(TestingConfig, k) for k in dir(TestingConfig) if k.isupper()}
+    config.update(
+        TESTING=False,
+        SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}',
+        SQL_PROFILING=True,
+        SQL_SERVER_TIMING=True,
+    )
+    return config
+
+
+def seed(counts, seed_value=42):
+    """Fill the (empty) database of the current app with benchmark data."""
+    user = User(username=USERNAME, email='bench@example.com', is_active=True)
+    user.set_password(PASSWORD)
+    db.session.add(user)
+    db.session.commit()
+
+    plan = SeedPlan.scaled(
+        counts['sales'] / SeedPlan.sales,
+        products=counts['products'],
+        sales=counts['sales'],
+        items_per_sale=counts['items_per_sale'],
+        stock_history=counts['stock_history'],
+    )
+    seed_database(plan, random_seed=seed_value)
+
+    # Every checkout in the benchmark must succeed, whatever product it picks
+    db.session.execute(update(Product).values(stock_quantity=1_000_000))
+    db.session.commit()
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('ANALYZE')
+
+
+def prepare_database(path, counts, reseed=False):
+    """Create and seed the database at ``path`` unless it already matches ``counts``."""
+    meta_path = path + '.json'
+    if not reseed and os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as fh:
+            if json.load(fh) == counts:
+                return False
+
+    for suffix in ('', '-wal', '-shm', '.json'):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    app = create_app(benchmark_config(path))
+    with app.app_context():
+        db.create_all()
+        seed(counts)
+        db.engine.dispose()
+    with open(meta_path, 'w') as fh:
+        json.dump(counts, fh)
+    return True
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100.0 * len(ordered)) - 1, 0)]
+
+
+def route_requests(client, counts, prices, rng):
+    """Name -> callable(i) issuing one request for each benchmarked route."""
+    def sale_detail(i):
+        return client.get(f'/sales/{rng.randrange(counts["sales"]) + 1}')
+
+    def process_sale(i):
+        product_id = rng.randrange(counts['products']) + 1
+        price = prices[product_id]
+        return client.post('/pos/process', data={
+            'items': json.dumps([{'id': product_id, 'quantity': 1, 'price': price}]),
+            'total_amount': price,
+            'payment_method': 'cash',
+        })
+
+    return {
+        'dashboard': lambda i: client.get('/dashboard'),
+        'pos': lambda i: client.get('/pos'),
+        'sales': lambda i: client.get('/sales'),
+        'inventory': lambda i: client.get('/inventory'),
+        'inventory_export': lambda i: client.get('/inventory/export'),
+        'pos_process': process_sale,
+        'sale_detail': sale_detail,
+    }
+
+
+def _issue(app, request):
+    with app.app_context():
+        cache.clear()
+    response = request()
+    response.get_data()  # drain streamed bodies inside the measurement
+    return response
+
+
+def measure_route(app, make_request, runs):
+    latencies, queries, statuses = [], [], set()
+    _issue(app, lambda: make_request(-1))  # warm up templates and connections
+    for i in range(runs):
+        started = time.perf_counter()
+        response = _issue(app, lambda: make_request(i))
+        latencies.append((time.perf_counter() - started) * 1000)
+        statuses.add(response.status_code)
+        match = QUERY_COUNT.search(response.headers.get('Server-Timing', ''))
+        queries.append(int(match.group(1)) if match else 0)
+
+    # Memory is measured on a separate request: tracemalloc slows everything down
+    tracemalloc.start()
+    _issue(app, lambda: make_request(runs))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'p50_ms': round(percentile(latencies, 50), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'queries': max(queries),
+        'peak_mb': round(peak / (1024 * 1024), 2),
+        'status': sorted(statuses),
+    }
+
+
+def run_benchmark(path, counts, runs, routes=None, seed_value=42):
+    app = create_app(benchmark_config(path))
+    client = app.test_client()
+    rng = random.Random(seed_value)
+    results = {}
+    with app.app_context():
+        prices = dict(db.session.query(Product.id, Product.price))
+
+    # Requests run without an outer app context so each gets a fresh session
+    login = client.post('/login', data={'username': USERNAME, 'password': PASSWORD})
+    if login.status_code != 302:
+        raise RuntimeError('could not log in to the benchmark database')
+    for name, make_request in route_requests(client, counts, prices, rng).items():
+        if routes and name not in routes:
+            continue
+        results[name] = measure_route(app, make_request, runs)
+        print(f"  {name:<18} p50 {results[name]['p50_ms']:>9.2f} ms  "
+              f"p95 {results[name]['p95_ms']:>9.2f} ms  "
+              f"{results[name]['queries']:>5} queries  "
+              f"peak {results[name]['peak_mb']:>8.2f} MB  status {results[name]['status']}")
+    return {
+        'meta': {
+            'counts': counts,
+            'runs': runs,
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        },
+        'routes': results,
+    }
+
+
+def compare(report, baseline, latency_tolerance, memory_tolerance, min_latency_ms=5.0, min_memory_mb=1.0):
+    """Return a list of regression messages of ``report`` against ``baseline``."""
+    failures = []
+    if report['meta']['counts'] != baseline['meta']['counts']:
+        failures.append('baseline was recorded at a different scale')
+        return failures
+
+    for name, base in baseline['routes'].items():
+        current = report['routes'].get(name)
+        if current is None:
+            continue
+        limit = base['p95_ms'] * (1 + latency_tolerance)
+        if current['p95_ms'] > limit and current['p95_ms'] - base['p95_ms'] > min_latency_ms:
+            failures.append(f"{name}: p95 {current['p95_ms']} ms > {limit:.2f} ms (baseline {base['p95_ms']} ms)")
+        if current['queries'] > base['queries']:
+            failures.append(f"{name}: {current['queries']} queries per request (baseline {base['queries']})")
+        limit = base['peak_mb'] * (1 + memory_tolerance)
+        if current['peak_mb'] > limit and current['peak_mb'] - base['peak_mb'] > min_memory_mb:
+            failures.append(f"{name}: peak memory {current['peak_mb']} MB > {limit:.2f} MB "
+                            f"(baseline {base['peak_mb']} MB)")
+        if any(status >= 500 for status in current['status']):
+            failures.append(f"{name}: server errors {current['status']}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', type=float, default=1.0, help='Fraction of the full data set to seed')
+    parser.add_argument('--db', help='SQLite file to seed and reuse (default: benchmarks/.data/routes-<scale>.db)')
+    parser.add_argument('--reseed', action='store_true', help='Recreate the database even if it matches')
+    parser.add_argument('--runs', type=int, default=20, help='Requests per route')
+    parser.add_argument('--route', action='append', dest='routes', help='Only run this route (repeatable)')
+    parser.add_argument('--output', help='Write the report as JSON to this file')
+    parser.add_argument('--baseline', help='Compare against this JSON report and fail on regressions')
+    parser.add_argument('--latency-tolerance', type=float, default=0.25,
+                        help='Allowed relative p95 increase (default 0.25)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.25,
+                        help='Allowed relative peak memory increase (default 0.25)')
+    args = parser.parse_args(argv)
+
+    counts = scaled_counts(args.scale)
+    path = args.db or os.path.join(ROOT, 'benchmarks', '.data', f'routes-{args.scale:g}.db')
+
+    started = time.perf_counter()
+    if prepare_database(path, counts, args.reseed):
+        print(f'Seeded {path} in {time.perf_counter() - started:.1f}s')
+    print(f"Benchmarking {counts['products']} products, {counts['sales']} sales, "
+          f"{counts['sales'] * counts['items_per_sale']} sale items, "
+          f"{counts['stock_history']} stock history rows; {args.runs} requests per route")
+
+    report = run_benchmark(path, counts, args.runs, args.routes)
+
+    if args.output:
+        with open(args.output, 'w') as fh:
+            json.dump(report, fh, indent=2)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline) as fh:
+        baseline = json.load(fh)
+    failures = compare(report, baseline, args.latency_tolerance, args.memory_tolerance)
+    for failure in failures:
+        print(f'REGRESSION: {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Concurrent checkout stress test.
+
+Starts several worker processes that each log in and post random carts to
+``/pos/process`` against one SQLite file, the way gunicorn workers share the
+production database. Stock is deliberately scarce so workers fight over the
+last units. Reports checkouts per second and fails (exit status 1) if any
+product ended below zero or the units sold do not match the stock taken.
+
+Usage:
+    python benchmarks/stock_stress.py --workers 8 --checkouts 200
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import func  # noqa: E402
+
+from app import create_app  # noqa: E402
+from config import TestingConfig  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Product, Sale, SaleItem, User  # noqa: E402
+
+USERNAME = 'stress'
+PASSWORD = 'stress-password'
+
+
+def stress_config(path):
+    config = {k: getattr(TestingConfig, k) for k in dir(TestingConfig) if k.isupper()}
+    config.update(TESTING=False, SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}')
+    return config
+
+
+def prepare(path, products, stock):
+    app = create_app(stress_config(path))
+    with app.app_context():
+        db.create_all()
+        user = User(username=USERNAME, email='stress@example.com', is_active=True)
+        user.set_password(PASSWORD)
+        db.session.add(user)
+        db.session.add_all(
+            Product(name=f'Product {i}', price=100.0, unit='piece', stock_quantity=stock)
+            for i in range(products)
+        )
+        db.session.commit()
+        prices = dict(db.session.query(Product.id, Product.price))
+        db.engine.dispose()
+    return prices
+
+
+def worker(path, prices, checkouts, cart_size, seed, results):
+    app = create_app(stress_config(path))
+    client = app.test_client()
+    client.post('/login', data={'username': USERNAME, 'password': PASSWORD})
+    rng = random.Random(seed)
+    product_ids = list(prices)
+    statuses = {}
+    for _ in range(checkouts):
+        lines = [{'id': product_id, 'quantity': rng.randint(1, 3), 'price': prices[product_id]}
+                 for product_id in rng.sample(product_ids, cart_size)]
+        response = client.post('/pos/process', data={
+            'items': json.dumps(lines),
+            'total_amount': sum(line['quantity'] * line['price'] for line in lines),
+            'payment_method': 'cash',
+        })
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    with app.app_context():
+        db.engine.dispose()
+    results.put(statuses)
+
+
+def run(workers, checkouts, products, stock, cart_size):
+    tmpdir = tempfile.mkdtemp()
+    path = os.path.join(tmpdir, 'stress.db')
+    try:
+        prices = prepare(path, products, stock)
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        processes = [
+            ctx.Process(target=worker, args=(path, prices, checkouts, min(cart_size, products), seed, results))
+            for seed in range(workers)
+        ]
+        started = time.perf_counter()
+        for process in processes:
+            process.start()
+        statuses = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - started
+        for process in processes:
+            process.join()
+
+        app = create_app(stress_config(path))
+        with app.app_context():
+            lowest = db.session.query(func.min(Product.stock_quantity)).scalar()
+            remaining = db.session.query(func.sum(Product.stock_quantity)).scalar()
+            sold = db.session.query(func.coalesce(func.sum(SaleItem.quantity), 0)).scalar()
+            sales = Sale.query.count()
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(tmpdir)
+
+    combined = {}
+    for result in statuses:
+        for status, count in result.items():
+            combined[status] = combined.get(status, 0) + count
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'attempts': workers * checkouts,
+        'sales': sales,
+        'checkouts_per_s': round(workers * checkouts / elapsed, 1),
+        'sales_per_s': round(sales / elapsed, 1),
+        'units_sold': sold,
+        'lowest_stock': lowest,
+        'consistent': lowest >= 0 and sold + remaining == products * stock,
+        'status': combined,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4, help='Concurrent worker processes')
+    parser.add_argument('--checkouts', type=int, default=100, help='Checkouts posted by each worker')
+    parser.add_argument('--products', type=int, default=20, help='Products on sale')
+    parser.add_argument('--stock', type=int, default=50, help='Initial stock of every product')
+    parser.add_argument('--cart-size', type=int, default=3, help='Distinct products per cart')
+    args = parser.parse_args(argv)
+
+    report = run(args.workers, args.checkouts, args.products, args.stock, args.cart_size)
+    print(f"{report['attempts']} checkouts from {args.workers} workers in {report['elapsed_s']}s: "
+          f"{report['checkouts_per_s']} checkouts/s, {report['sales']} completed "
+          f"({report['sales_per_s']} sales/s), {report['units_sold']} units sold, "
+          f"lowest stock {report['lowest_stock']}, responses {report['status']}")
+    if not report['consistent']:
+        print('FAILED: stock went negative or does not match the units sold')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
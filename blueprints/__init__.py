@@ -0,0 +1,40 @@
+"""Route blueprints.
+
+Blueprint modules are only imported when they are enabled, so a node that
+serves a subset of the application (for example a till-only POS node with
+``BAKERY_BLUEPRINTS=sales``) never loads the other route modules.
+"""
+import importlib
+
+# name -> module path; every module exposes its blueprint as ``bp``
+BLUEPRINTS = {
+    'main': 'blueprints.main',
+    'sales': 'blueprints.sales',
+    'inventory': 'blueprints.inventory',
+    'suppliers': 'blueprints.suppliers',
+    'finance': 'blueprints.finance',
+    'employees': 'blueprints.employees',
+    'production': 'blueprints.production',
+    'imports': 'blueprints.imports',
+}
+
+# Login, logout and the dashboard are needed by every deployment
+REQUIRED_BLUEPRINTS = ('main',)
+
+
+def register_blueprints(app, names=None):
+    """Import and register the requested blueprints on ``app``."""
+    if names is None:
+        names = app.config.get('ENABLED_BLUEPRINTS', BLUEPRINTS.keys())
+
+    unknown = set(names) - set(BLUEPRINTS)
+    if unknown:
+        raise ValueError(f"Unknown blueprint(s): {', '.join(sorted(unknown))}")
+
+    enabled = list(REQUIRED_BLUEPRINTS) + [name for name in names if name not in REQUIRED_BLUEPRINTS]
+    for name in enabled:
+        module = importlib.import_module(BLUEPRINTS[name])
+        app.register_blueprint(module.bp)
+
+    app.config['ENABLED_BLUEPRINTS'] = tuple(enabled)
+    return enabled
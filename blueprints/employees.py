@@ -0,0 +1,81 @@
+from flask import Blueprint, render_template, redirect, url_for, flash
+from flask_login import login_required
+
+from extensions import db
+from forms import EmployeeForm
+from models import Employee
+
+bp = Blueprint('employees', __name__)
+
+@bp.route('/employees')
+@login_required
+def employee_list():
+    employees = Employee.query.order_by(Employee.name).all()
+    return render_template('employee_list.html', employees=employees)
+
+@bp.route('/employees/create', methods=['GET', 'POST'])
+@login_required
+def employee_create():
+    form = EmployeeForm()
+    if form.validate_on_submit():
+        employee = Employee(
+            name=form.name.data,
+            phone=form.phone.data,
+            email=form.email.data,
+            role=form.role.data,
+            department=form.department.data,
+            salary=form.salary.data,
+            hire_date=form.hire_date.data,
+            is_active=form.is_active.data,
+            can_manage_employees=form.can_manage_employees.data,
+            can_manage_inventory=form.can_manage_inventory.data,
+            can_manage_finance=form.can_manage_finance.data,
+            can_manage_system=form.can_manage_system.data,
+            can_manage_suppliers=form.can_manage_suppliers.data,
+            can_process_sales=form.can_process_sales.data,
+            can_manage_production=form.can_manage_production.data
+        )
+        db.session.add(employee)
+        db.session.commit()
+        flash('Employee created successfully!', 'success')
+        return redirect(url_for('employees.employee_list'))
+    return render_template('employee_form.html', form=form)
+
+@bp.route('/employees/<int:id>/edit', methods=['GET', 'POST'])
+@login_required
+def employee_edit(id):
+    employee = Employee.query.get_or_404(id)
+    form = EmployeeForm(obj=employee)
+    if form.validate_on_submit():
+        employee.name = form.name.data
+        employee.phone = form.phone.data
+        employee.email = form.email.data
+        employee.role = form.role.data
+        employee.department = form.department.data
+        employee.salary = form.salary.data
+        employee.hire_date = form.hire_date.data
+        employee.is_active = form.is_active.data
+        employee.can_manage_employees = form.can_manage_employees.data
+        employee.can_manage_inventory = form.can_manage_inventory.data
+        employee.can_manage_finance = form.can_manage_finance.data
+        employee.can_manage_system = form.can_manage_system.data
+        employee.can_manage_suppliers = form.can_manage_suppliers.data
+        employee.can_process_sales = form.can_process_sales.data
+        employee.can_manage_production = form.can_manage_production.data
+        db.session.commit()
+        flash('Employee updated successfully!', 'success')
+        return redirect(url_for('employees.employee_list'))
+    return render_template('employee_form.html', form=form, employee=employee)
+
+@bp.route('/employees/<int:id>/delete', methods=['POST'])
+@login_required
+def employee_delete(id):
+    employee = Employee.query.get_or_404(id)
+    try:
+        db.session.delete(employee)
+        db.session.commit()
+        flash('Employee deleted successfully!', 'success')
+    except Exception as e:
+        db.session.rollback()
+        flash('Error deleting employee. They may have associated records.', 'danger')
+    return redirect(url_for('employees.employee_list'))
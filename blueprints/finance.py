@@ -0,0 +1,64 @@
+from flask import Blueprint, render_template, redirect, url_for, flash
+from flask_login import login_required
+from sqlalchemy import func
+
+from extensions import db
+from forms import ExpenseForm
+from models import Expense
+
+bp = Blueprint('finance', __name__)
+
+@bp.route('/financial')
+@login_required
+def financial():
+    expenses = Expense.query.order_by(Expense.date.desc()).all()
+    total_expenses = db.session.query(func.coalesce(func.sum(Expense.amount), 0)).scalar()
+    return render_template('financial.html', expenses=expenses, total_expenses=total_expenses)
+
+@bp.route('/expenses/new', methods=['GET', 'POST'])
+@login_required
+def new_expense():
+    form = ExpenseForm()
+    if form.validate_on_submit():
+        expense = Expense(
+            date=form.date.data,
+            type=form.type.data,
+            amount=form.amount.data,
+            description=form.description.data
+        )
+        db.session.add(expense)
+        db.session.commit()
+        flash('Expense added successfully')
+        return redirect(url_for('finance.financial'))
+    return render_template('expense_form.html', form=form, title='New Expense')
+
+@bp.route('/expenses/<int:id>/edit', methods=['GET', 'POST'])
+@login_required
+def edit_expense(id):
+    expense = Expense.query.get_or_404(id)
+    form = ExpenseForm(obj=expense)
+    if form.validate_on_submit():
+        expense.date = form.date.data
+        expense.type = form.type.data
+        expense.amount = form.amount.data
+        expense.description = form.description.data
+        db.session.commit()
+        flash('Expense updated successfully')
+        return redirect(url_for('finance.financial'))
+    return render_template('expense_form.html', form=form, title='Edit Expense', expense=expense)
+
+@bp.route('/expenses/<int:id>/delete', methods=['POST'])
+@login_required
+def delete_expense(id):
+    expense = Expense.query.get_or_404(id)
+    db.session.delete(expense)
+    db.session.commit()
+    flash('Expense deleted successfully')
+    return redirect(url_for('finance.financial'))
+
+@bp.route('/expenses')
+@login_required
+def expense_list():
+    expenses = Expense.query.order_by(Expense.date.desc()).all()
+    form = ExpenseForm()
+    return render_template('expense_list.html', expenses=expenses, form=form)
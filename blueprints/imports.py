@@ -0,0 +1,232 @@
+from flask import Blueprint, render_template, redirect, url_for, flash, send_file
+from flask_login import login_required
+from io import BytesIO
+import logging
+
+from blueprints.sales import flash_shortfalls
+from database import begin_write_transaction
+from extensions import db
+from forms import ImportForm
+from lazy_imports import pd
+from services.stock import InsufficientStock, put_stock, take_stock
+from models import Product, Supplier, StockHistory
+
+logger = logging.getLogger('barkery_system')
+
+bp = Blueprint('imports', __name__)
+
+ALLOWED_EXTENSIONS = {'csv', 'xlsx', 'xls'}
+
+# Where each import type sends the user once it has finished
+IMPORT_REDIRECTS = {
+    'products': 'inventory.product_list',
+    'suppliers': 'suppliers.supplier_list',
+    'inventory': 'inventory.inventory',
+}
+
+class InvalidImportRows(Exception):
+    """Rows of an import file that cannot be applied; nothing was imported."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        super().__init__('; '.join(self.messages))
+
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+@bp.route('/import/<type>', methods=['GET', 'POST'])
+@login_required
+def import_data(type):
+    if type not in ['products', 'suppliers', 'inventory']:
+        flash('Invalid import type', 'danger')
+        return redirect(url_for('main.dashboard'))
+    
+    form = ImportForm()
+    if form.validate_on_submit():
+        try:
+            file = form.file.data
+            if not file:
+                flash('Please select a file to import', 'danger')
+                return redirect(url_for('imports.import_data', type=type))
+            
+            # Process the file based on type
+            if type == 'products':
+                process_product_import(file)
+            elif type == 'suppliers':
+                process_supplier_import(file)
+            elif type == 'inventory':
+                process_inventory_import(file)
+            
+            flash(f'{type.title()} imported successfully', 'success')
+            return redirect(url_for(IMPORT_REDIRECTS[type]))
+        except InvalidImportRows as e:
+            db.session.rollback()
+            for message in e.messages:
+                flash(message, 'danger')
+        except InsufficientStock as e:
+            db.session.rollback()
+            flash_shortfalls(e)
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Import error: {str(e)}")
+            flash('Error importing data. Please check the file format and try again.', 'danger')
+    
+    return render_template('import_form.html', type=type, form=form)
+
+@bp.route('/import/products', methods=['GET', 'POST'])
+@login_required
+def import_products():
+    form = ImportForm()
+    if form.validate_on_submit():
+        file = form.file.data
+        # Implement file import logic here
+        flash('Products imported successfully', 'success')
+        return redirect(url_for('inventory.product_list'))
+    return render_template('import_form.html', form=form, title='Import Products')
+
+def process_product_import(file):
+    # Read the file; codes stay text so leading zeros and long EANs survive
+    codes = {'barcode': str, 'sku': str}
+    if file.filename.endswith('.csv'):
+        df = pd.read_csv(file, dtype=codes)
+    else:
+        df = pd.read_excel(file, dtype=codes)
+    
+    # Process each row
+    for _, row in df.iterrows():
+        barcode = row.get('barcode', row.get('sku'))
+        product = Product(
+            name=row['name'],
+            barcode=barcode if isinstance(barcode, str) else None,
+            price=float(row['price']),
+            description=row.get('description', ''),
+            category=row.get('category', ''),
+            stock_quantity=int(row.get('stock_quantity', 0)),
+            minimum_stock_level=int(row.get('minimum_stock_level', 0)),
+            reorder_quantity=int(row.get('reorder_quantity', 0)),
+            is_active=bool(row.get('is_active', True))
+        )
+        db.session.add(product)
+    
+    db.session.commit()
+
+def process_supplier_import(file):
+    # Read the file
+    if file.filename.endswith('.csv'):
+        df = pd.read_csv(file)
+    else:
+        df = pd.read_excel(file)
+    
+    # Process each row
+    for _, row in df.iterrows():
+        supplier = Supplier(
+            name=row['name'],
+            contact_person=row.get('contact_person', ''),
+            phone=row.get('phone', ''),
+            email=row.get('email', ''),
+            address=row.get('address', ''),
+            is_active=bool(row.get('is_active', True))
+        )
+        db.session.add(supplier)
+    
+    db.session.commit()
+
+def process_inventory_import(file):
+    # Read the file
+    if file.filename.endswith('.csv'):
+        df = pd.read_csv(file)
+    else:
+        df = pd.read_excel(file)
+    
+    rows = [
+        (int(row['product_id']), int(row['quantity']), str(row['type']).lower(), row.get('reference', ''))
+        for _, row in df.iterrows()
+    ]
+    # 'in' and 'out' give the direction; a signed quantity would be ambiguous
+    negative = [
+        f'Row {number}: quantity must not be negative'
+        for number, (_, quantity, _, _) in enumerate(rows, start=2) if quantity < 0
+    ]
+    if negative:
+        raise InvalidImportRows(negative)
+    begin_write_transaction(db.session)
+    known = {
+        product_id for (product_id,) in
+        db.session.query(Product.id).filter(Product.id.in_({row[0] for row in rows}))
+    }
+
+    # Net movement per product, applied with one atomic statement per direction
+    net = {}
+    for product_id, quantity, movement, reference in rows:
+        if product_id not in known:
+            continue
+        change = quantity if movement == 'in' else -quantity
+        net[product_id] = net.get(product_id, 0) + change
+
+        # Add stock history entry
+        history = StockHistory(
+            product_id=product_id,
+            quantity=change,
+            type=movement,
+            notes=f'Bulk import - {reference}'
+        )
+        db.session.add(history)
+
+    put_stock({product_id: change for product_id, change in net.items() if change > 0})
+    take_stock({product_id: -change for product_id, change in net.items() if change < 0})
+    db.session.commit()
+
+@bp.route('/download/template/<type>')
+@login_required
+def download_template(type):
+    if type == 'products':
+        data = {
+            'name': ['Sample Product 1', 'Sample Product 2'],
+            'price': [100.00, 200.00],
+            'description': ['Description 1', 'Description 2'],
+            'category': ['Category 1', 'Category 2'],
+            'stock_quantity': [10, 20],
+            'minimum_stock_level': [5, 10],
+            'reorder_quantity': [20, 30],
+            'is_active': [True, True]
+        }
+        filename = 'product_import_template.xlsx'
+    elif type == 'suppliers':
+        data = {
+            'name': ['Supplier 1', 'Supplier 2'],
+            'contact_person': ['John Doe', 'Jane Smith'],
+            'phone': ['1234567890', '0987654321'],
+            'email': ['john@example.com', 'jane@example.com'],
+            'address': ['Address 1', 'Address 2'],
+            'is_active': [True, True]
+        }
+        filename = 'supplier_import_template.xlsx'
+    elif type == 'inventory':
+        data = {
+            'product_id': [1, 2],
+            'quantity': [10, 5],
+            'type': ['in', 'out'],
+            'reference': ['PO123', 'SO456'],
+            'date': ['2024-03-20', '2024-03-20']
+        }
+        filename = 'inventory_import_template.xlsx'
+    else:
+        flash('Invalid template type', 'error')
+        return redirect(url_for('main.dashboard'))
+    
+    df = pd.DataFrame(data)
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='Template')
+        worksheet = writer.sheets['Template']
+        for idx, col in enumerate(df.columns):
+            max_length = max(df[col].astype(str).apply(len).max(), len(col)) + 2
+            worksheet.column_dimensions[chr(65 + idx)].width = max_length
+    
+    output.seek(0)
+    return send_file(
+        output,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        as_attachment=True,
+        download_name=filename
+    )
@@ -0,0 +1,355 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, Response, current_app
+from flask_login import login_required, current_user
+import csv
+from io import StringIO
+import logging
+
+from database import begin_write_transaction
+from extensions import db
+from forms import ProductForm
+from models import Product, Supplier, StockHistory, StockAdjustment
+from services.search import search_products
+from services.stock import InsufficientStock, put_stock, take_stock
+
+logger = logging.getLogger('barkery_system')
+
+bp = Blueprint('inventory', __name__)
+
+# Search results shown on the product list, best match first
+PRODUCT_SEARCH_LIMIT = 200
+
+@bp.route('/products')
+@login_required
+def product_list():
+    query = request.args.get('q', '').strip()
+    stmt = search_products(query, active_only=False) if query else None
+    if stmt is None:
+        products = Product.query.all()
+    else:
+        products = db.session.scalars(stmt.limit(PRODUCT_SEARCH_LIMIT)).all()
+    return render_template('product_list.html', products=products, query=query)
+
+@bp.route('/products/new', methods=['GET', 'POST'])
+@login_required
+def new_product():
+    form = ProductForm()
+    # Populate supplier choices
+    suppliers = Supplier.query.filter_by(is_active=True).all()
+    form.supplier_id.choices = [(0, 'Select a supplier')] + [(s.id, s.name) for s in suppliers]
+    
+    if form.validate_on_submit():
+        try:
+            product = Product(
+                name=form.name.data,
+                barcode=form.barcode.data,
+                description=form.description.data,
+                price=form.price.data,
+                category=form.category.data,
+                unit=form.unit.data,
+                stock_quantity=form.stock_quantity.data,
+                minimum_stock_level=form.min_stock.data,
+                supplier_id=form.supplier_id.data if form.supplier_id.data != 0 else None,
+                is_active=form.is_active.data
+            )
+            db.session.add(product)
+            db.session.commit()
+            flash('Product added successfully', 'success')
+            return redirect(url_for('inventory.product_list'))
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f'Error adding product: {str(e)}')
+            flash(f'Error adding product: {str(e)}', 'danger')
+    else:
+        # Log specific form validation errors
+        for field, errors in form.errors.items():
+            for error in errors:
+                current_app.logger.error(f'Validation error in {field}: {error}')
+                flash(f'{field}: {error}', 'danger')
+    
+    return render_template('product_form.html', form=form, title='New Product')
+
+@bp.route('/products/<int:id>/edit', methods=['GET', 'POST'])
+@login_required
+def edit_product(id):
+    product = Product.query.get_or_404(id)
+    form = ProductForm(obj=product)
+    # Populate supplier choices
+    suppliers = Supplier.query.filter_by(is_active=True).all()
+    form.supplier_id.choices = [(0, 'Select a supplier')] + [(s.id, s.name) for s in suppliers]
+    
+    if form.validate_on_submit():
+        product.name = form.name.data
+        product.barcode = form.barcode.data
+        product.description = form.description.data
+        product.price = form.price.data
+        product.category = form.category.data
+        product.supplier_id = form.supplier_id.data if form.supplier_id.data != 0 else None
+        product.stock_quantity = form.stock_quantity.data
+        product.minimum_stock_level = form.minimum_stock_level.data
+        product.reorder_quantity = form.reorder_quantity.data
+        product.is_active = form.is_active.data
+        db.session.commit()
+        flash('Product updated successfully')
+        return redirect(url_for('inventory.product_list'))
+    return render_template('product_form.html', form=form, title='Edit Product', product=product)
+
+@bp.route('/products/<int:id>')
+@login_required
+def product_detail(id):
+    product = Product.query.get_or_404(id)
+    stock_history = StockHistory.query.filter_by(product_id=id).order_by(StockHistory.created_at.desc()).limit(10).all()
+    return render_template('product_detail.html', product=product, stock_history=stock_history)
+
+@bp.route('/products/<int:id>/delete', methods=['POST'])
+@login_required
+def product_delete(id):
+    product = Product.query.get_or_404(id)
+    try:
+        db.session.delete(product)
+        db.session.commit()
+        flash('Product deleted successfully')
+    except Exception as e:
+        db.session.rollback()
+        flash('Error deleting product: ' + str(e), 'error')
+    return redirect(url_for('inventory.product_list'))
+
+@bp.route('/inventory')
+@login_required
+def inventory():
+    products = Product.query.all()
+    low_stock_products = [p for p in products if p.stock_quantity <= p.minimum_stock_level]
+    return render_template('inventory.html', products=products, low_stock_products=low_stock_products)
+
+@bp.route('/inventory/add-stock', methods=['POST'])
+@login_required
+def add_stock():
+    try:
+        # Log all incoming form data for debugging
+        logger.info(f"Add Stock Request - Form Data: {dict(request.form)}")
+        
+        # Get form data
+        product_id = request.form.get('product_id')
+        quantity = request.form.get('quantity')
+        notes = request.form.get('notes', '')
+        
+        # Validate input
+        if not product_id or not quantity:
+            logger.error("Add Stock Error: Product ID or quantity missing")
+            return jsonify({
+                'success': False, 
+                'message': 'Product ID and quantity are required'
+            }), 400
+        
+        try:
+            product_id = int(product_id)
+            quantity = int(quantity)
+        except ValueError:
+            logger.error(f"Add Stock Error: Invalid product ID or quantity. product_id: {product_id}, quantity: {quantity}")
+            return jsonify({
+                'success': False, 
+                'message': 'Invalid product ID or quantity'
+            }), 400
+        
+        if quantity <= 0:
+            return jsonify({
+                'success': False, 
+                'message': 'Quantity must be a positive number'
+            }), 400
+        
+        # Find the product
+        begin_write_transaction(db.session)
+        product = Product.query.get(product_id)
+        if not product:
+            logger.error(f"Add Stock Error: Product not found. ID: {product_id}")
+            return jsonify({
+                'success': False, 
+                'message': 'Product not found'
+            }), 404
+        
+        # Update stock quantity
+        put_stock({product.id: quantity})
+        
+        # Create stock history record
+        stock_history = StockHistory(
+            product_id=product.id,
+            quantity=quantity,
+            type='addition',
+            notes=notes,
+            user_id=current_user.id
+        )
+        
+        # Add to session and commit
+        try:
+            db.session.add(stock_history)
+            db.session.commit()
+            
+            logger.info(f"Stock added successfully. Product: {product.name}, Quantity: {quantity}")
+            
+            return jsonify({
+                'success': True, 
+                'message': f'Added {quantity} units to {product.name}'
+            }), 200
+        
+        except Exception as commit_error:
+            db.session.rollback()
+            logger.error(f"Database commit error: {str(commit_error)}")
+            return jsonify({
+                'success': False, 
+                'message': 'Error saving stock addition to database'
+            }), 500
+    
+    except Exception as e:
+        # Catch any unexpected errors
+        logger.error(f"Unexpected error in add_stock: {str(e)}")
+        
+        return jsonify({
+            'success': False, 
+            'message': 'An unexpected error occurred while adding stock'
+        }), 500
+
+@bp.route('/inventory/adjust-stock/<int:product_id>', methods=['POST'])
+@login_required
+def adjust_stock(product_id):
+    """Adjust stock quantity for a specific product."""
+    try:
+        # Get form data
+        quantity = request.form.get('quantity')
+        adjustment_type = request.form.get('adjustment_type')
+
+        # Validate inputs
+        if not quantity or not adjustment_type:
+            return jsonify({
+                'success': False, 
+                'message': 'Missing required parameters.'
+            }), 400
+
+        try:
+            quantity = int(quantity)
+        except ValueError:
+            return jsonify({
+                'success': False, 
+                'message': 'Quantity must be a valid number.'
+            }), 400
+
+        # Validate quantity
+        if quantity <= 0:
+            return jsonify({
+                'success': False, 
+                'message': 'Quantity must be a positive number.'
+            }), 400
+
+        # Find the product
+        begin_write_transaction(db.session)
+        product = Product.query.get_or_404(product_id)
+
+        # Adjust stock based on type
+        if adjustment_type == 'add':
+            put_stock({product.id: quantity})
+        elif adjustment_type == 'remove':
+            try:
+                take_stock({product.id: quantity})
+            except InsufficientStock:
+                db.session.rollback()
+                return jsonify({
+                    'success': False, 
+                    'message': f'Cannot remove more stock than available for {product.name}.'
+                }), 400
+        else:
+            return jsonify({
+                'success': False, 
+                'message': 'Invalid adjustment type.'
+            }), 400
+
+        # Log stock adjustment
+        stock_adjustment = StockAdjustment(
+            product_id=product.id,
+            quantity=quantity,
+            adjustment_type=adjustment_type,
+            user_id=current_user.id
+        )
+        db.session.add(stock_adjustment)
+        db.session.commit()
+
+        return jsonify({
+            'success': True, 
+            'message': f'Successfully {"added" if adjustment_type == "add" else "removed"} {quantity} units from {product.name} stock.'
+        }), 200
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating stock adjustment: {str(e)}")
+        return jsonify({
+            'success': False, 
+            'message': 'An error occurred while adjusting stock. Please try again later.'
+        }), 500
+
+@bp.route('/inventory/history/<int:product_id>')
+@login_required
+def stock_history(product_id):
+    product = Product.query.get_or_404(product_id)
+    history = StockHistory.query.filter_by(product_id=product_id).order_by(StockHistory.created_at.desc()).all()
+    return render_template('stock_history.html', product=product, history=history)
+
+@bp.route('/inventory/export')
+@login_required
+def export_inventory():
+    
+    products = Product.query.all()
+    
+    # Create CSV data
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(['Product', 'Category', 'Current Stock', 'Minimum Level', 'Status', 'Last Updated'])
+    
+    for product in products:
+        writer.writerow([
+            product.name,
+            product.category,
+            product.stock_quantity,
+            product.minimum_stock_level,
+            'Low Stock' if product.stock_quantity <= product.minimum_stock_level else 'In Stock',
+            product.updated_at.strftime('%Y-%m-%d')
+        ])
+    
+    output.seek(0)
+    return Response(
+        output,
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=inventory.csv'}
+    )
+
+@bp.route('/inventory/reorder/<int:product_id>', methods=['POST'])
+@login_required
+def reorder_product(product_id):
+    product = Product.query.get_or_404(product_id)
+    try:
+        # Calculate reorder quantity
+        reorder_qty = max(product.reorder_quantity, product.minimum_stock_level * 2)
+        
+        # There are no purchase orders; the request is recorded in the stock ledger.
+        # A 'reorder' row records the units asked for; stock is unchanged until they arrive.
+        reorder_history = StockHistory(
+            product_id=product.id,
+            quantity=reorder_qty,
+            type='reorder',
+            notes=f'Reorder request for {reorder_qty} units',
+            user_id=current_user.id
+        )
+        db.session.add(reorder_history)
+        
+        db.session.commit()
+        
+        # Send notification (could be email, SMS, or in-app notification)
+        logger.info(f"Reorder request created for {product.name}. Quantity: {reorder_qty}")
+        
+        return jsonify({
+            'success': True, 
+            'message': f'Reorder request created for {product.name}. Quantity: {reorder_qty}'
+        }), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error creating reorder request: {str(e)}")
+        return jsonify({
+            'success': False, 
+            'message': 'Failed to create reorder request'
+        }), 500
@@ -0,0 +1,128 @@
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask_login import login_user, logout_user, login_required, current_user
+from dataclasses import asdict
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+import logging
+
+from extensions import db
+from forms import LoginForm, RegistrationForm
+from models import User, Sale, StockHistory
+from services.dashboard import get_dashboard_metrics
+
+logger = logging.getLogger('barkery_system')
+
+bp = Blueprint('main', __name__)
+
+@bp.route('/login', methods=['GET', 'POST'])
+def login():
+    if current_user.is_authenticated:
+        return redirect(url_for('main.dashboard'))
+
+    form = LoginForm()
+    if form.validate_on_submit():
+        try:
+            user = User.query.filter_by(username=form.username.data).first()
+            if user and user.check_password(form.password.data):
+                login_user(user, remember=form.remember.data)
+                user.last_login = datetime.now(timezone.utc)
+                db.session.commit()
+                next_page = request.args.get('next')
+                if not next_page or urlparse(next_page).netloc != '':
+                    next_page = url_for('main.dashboard')
+                logger.info(f"User {user.username} logged in successfully")
+                return redirect(next_page)
+            logger.warning(f"Failed login attempt for username: {form.username.data}")
+            flash('Invalid username or password', 'danger')
+        except Exception as e:
+            logger.error(f"Login error: {str(e)}")
+            flash('An error occurred during login. Please try again.', 'danger')
+    return render_template('login.html', form=form)
+
+@bp.route('/logout')
+@login_required
+def logout():
+    try:
+        logout_user()
+        logger.info(f"User logged out successfully")
+        return redirect(url_for('main.login'))
+    except Exception as e:
+        logger.error(f"Logout error: {str(e)}")
+        flash('An error occurred during logout. Please try again.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
+@bp.route('/')
+def index():
+    if current_user.is_authenticated:
+        return redirect(url_for('main.dashboard'))
+    return redirect(url_for('main.login'))
+
+@bp.route('/dashboard')
+@login_required
+def dashboard():
+    try:
+        metrics = get_dashboard_metrics()
+        # Get recent sales
+        recent_sales = Sale.query.order_by(Sale.sale_date.desc()).limit(5).all()
+        # Get recent stock updates
+        recent_stock_updates = StockHistory.query.order_by(StockHistory.created_at.desc()).limit(5).all()
+        return render_template('dashboard.html',
+            **asdict(metrics),
+            recent_sales=recent_sales,
+            recent_stock_updates=recent_stock_updates)
+    except Exception as e:
+        logger.error(f"Dashboard error: {str(e)}")
+        flash('An error occurred loading the dashboard.', 'danger')
+        return redirect(url_for('main.index'))
+
+@bp.route('/register', methods=['GET', 'POST'])
+def register():
+    if current_user.is_authenticated:
+        return redirect(url_for('main.dashboard'))
+
+    form = RegistrationForm()
+    if form.validate_on_submit():
+        try:
+            # Ensure database tables are created
+            db.create_all()
+
+            # Check if user already exists
+            existing_user_by_username = User.query.filter_by(username=form.username.data).first()
+            existing_user_by_email = User.query.filter_by(email=form.email.data).first()
+
+            if existing_user_by_username:
+                flash('Username already taken. Please choose a different one.', 'danger')
+                return render_template('register.html', title='Register', form=form)
+
+            if existing_user_by_email:
+                flash('Email already registered. Please use a different one.', 'danger')
+                return render_template('register.html', title='Register', form=form)
+
+            # Create new user
+            user = User(
+                username=form.username.data,
+                email=form.email.data,
+                is_active=True
+            )
+            user.set_password(form.password.data)
+
+            # Add and commit the new user
+            db.session.add(user)
+            db.session.commit()
+
+            flash('Registration successful! Please login.', 'success')
+            return redirect(url_for('main.login'))
+        except Exception as e:
+            # Rollback the session in case of any error
+            db.session.rollback()
+
+            # Log the specific error
+            logger.error(f"Registration error: {str(e)}")
+
+            # Check for specific error types
+            if 'UNIQUE constraint' in str(e):
+                flash('An account with this username or email already exists.', 'danger')
+            else:
+                flash('An unexpected error occurred. Please try again.', 'danger')
+
+    return render_template('register.html', title='Register', form=form)
@@ -0,0 +1,21 @@
+from flask import Blueprint, render_template, redirect, url_for, flash
+from flask_login import login_required
+import logging
+
+from models import Recipe, ProductionBatch
+
+logger = logging.getLogger('barkery_system')
+
+bp = Blueprint('production', __name__)
+
+@bp.route('/production')
+@login_required
+def production():
+    try:
+        recipes = Recipe.query.filter_by(is_active=True).all()
+        recent_batches = ProductionBatch.query.order_by(ProductionBatch.start_time.desc()).limit(10).all()
+        return render_template('production.html', recipes=recipes, recent_batches=recent_batches)
+    except Exception as e:
+        logger.error(f"Production route error: {str(e)}")
+        flash('An error occurred loading the production page.', 'danger')
+        return redirect(url_for('main.dashboard'))
@@ -0,0 +1,726 @@
+from flask import (
+    Blueprint, Response, render_template, request, redirect, url_for, flash, jsonify, current_app, abort,
+    stream_with_context
+)
+from flask_login import login_required, current_user
+from datetime import datetime, timezone
+import json
+import logging
+
+from markupsafe import Markup
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from database import begin_write_transaction
+from extensions import cache, db
+from forms import PaymentForm, SaleForm
+from models import Product, Sale, SaleItem, StockHistory, Payment
+from services import catalog, receivables, sales_summary, search
+from services.barcodes import find_by_code
+from services.checkout import PAYMENT_METHODS, CartLine, CheckoutError, checkout, parse_cart
+from services.idempotency import (
+    MAX_KEY_LENGTH, IdempotencyKeyReused, find_response, request_fingerprint, save_response
+)
+from services.pagination import InvalidCursor, keyset_paginate
+from services.pos_sync import sync_sales
+from services.sale_queries import (
+    ITEMS_WITH_PRODUCTS, PAYMENTS, SALE_SORTS, InvalidSaleFilter, filter_sales, get_sale_or_404, sale_filters
+)
+from services.sales_export import EXPORT_FORMATS, csv_lines, export_query, ndjson_lines
+from services.stock import InsufficientStock, put_stock, take_stock
+
+logger = logging.getLogger('barkery_system')
+
+bp = Blueprint('sales', __name__)
+
+# Rendered receipts of completed sales; the key changes whenever the sale row does
+RECEIPT_CACHE_TIMEOUT = 24 * 3600
+
+def flash_shortfalls(error):
+    for shortfall in error.shortfalls:
+        logger.error(f"Insufficient stock for {shortfall.name}")
+        flash(f"Insufficient stock for {shortfall.name}: {shortfall.requested} requested, "
+              f"{shortfall.available} available", 'error')
+
+@bp.route('/pos')
+@login_required
+def pos():
+    # Read the version first: a change racing the page load is then refetched, not missed
+    catalog_version, _ = catalog.current_version()
+    products = Product.query.filter_by(is_active=True).all()
+    # Get recent sales for reference
+    recent_sales = Sale.query.order_by(Sale.sale_date.desc()).limit(5).all()
+    return render_template('pos.html', products=products, recent_sales=recent_sales,
+                           catalog_version=catalog_version)
+
+@bp.route('/pos/process', methods=['POST'])
+@login_required
+def process_sale():
+    try:
+        # Log all form data for debugging
+        logger.info(f"Received form data: {request.form}")
+        
+        # Attempt to parse items
+        items_str = request.form.get('items', '[]')
+        logger.info(f"Items string: {items_str}")
+        
+        try:
+            items = json.loads(items_str)
+        except json.JSONDecodeError as json_err:
+            logger.error(f"JSON Decode Error: {json_err}")
+            flash(f'Invalid items data: {json_err}', 'error')
+            return redirect(url_for('sales.pos'))
+
+        # Validate total amount
+        try:
+            total_amount = float(request.form.get('total_amount', 0))
+        except ValueError as val_err:
+            logger.error(f"Total amount conversion error: {val_err}")
+            flash('Invalid total amount', 'error')
+            return redirect(url_for('sales.pos'))
+
+        # Get other form data with default values
+        customer_name = request.form.get('customer_name', '')
+        payment_method = request.form.get('payment_method', 'cash')
+
+        # Validate every line before touching the database, then sell the
+        # cart holding the write lock (SQLite) until the sale commits
+        try:
+            lines = parse_cart(items)
+            user_id = current_user.id
+            begin_write_transaction(db.session)
+            checkout(lines, total_amount, customer_name, payment_method, user_id)
+        except CheckoutError as e:
+            for message in e.messages:
+                flash(message, 'error')
+            db.session.rollback()
+            return redirect(url_for('sales.pos'))
+        except InsufficientStock as e:
+            flash_shortfalls(e)
+            db.session.rollback()
+            return redirect(url_for('sales.pos'))
+
+        db.session.commit()
+        flash('Sale completed successfully', 'success')
+        return redirect(url_for('sales.pos'))
+    except Exception as e:
+        logger.error(f"Unexpected error processing sale: {str(e)}", exc_info=True)
+        db.session.rollback()
+        flash(f'Unexpected error: {str(e)}', 'error')
+        return redirect(url_for('sales.pos'))
+
+def checkout_payload(sale, lines, products):
+    # The stock update expired stock_quantity; read the new levels in one query
+    stock = dict(db.session.query(Product.id, Product.stock_quantity).filter(Product.id.in_(products)))
+    return {
+        'sale': {
+            'id': sale.id,
+            'sale_date': sale.sale_date.isoformat(),
+            'customer_name': sale.customer_name,
+            'payment_method': sale.payment_method,
+            'payment_status': sale.payment_status,
+            'total_amount': sale.total_amount,
+            'items': [{
+                'product_id': line.product_id,
+                'name': products[line.product_id].name,
+                'quantity': line.quantity,
+                'unit_price': line.price,
+                'total_price': line.price * line.quantity,
+            } for line in lines],
+        },
+        'stock': [{
+            'product_id': product.id,
+            'name': product.name,
+            'stock_quantity': stock[product.id],
+        } for product in products.values()],
+    }
+
+def replay_response(stored):
+    status, body = stored
+    response = jsonify(body)
+    response.status_code = status
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+def checkout_error(message, status, **extra):
+    return jsonify({'success': False, 'message': message, **extra}), status
+
+@bp.route('/api/pos/checkout', methods=['POST'])
+@login_required
+def api_checkout():
+    """JSON checkout for POS terminals.
+
+    Takes ``{"items": [{"id", "quantity", "price"}], "total_amount",
+    "customer_name", "payment_method"}`` and answers 201 with the sale, its
+    line totals and the remaining stock of the products sold. A request
+    repeated with the same ``Idempotency-Key`` header gets the original
+    response back instead of selling the cart again.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return checkout_error('Request body must be a JSON object', 400)
+
+    key = request.headers.get('Idempotency-Key')
+    if key is not None and not 0 < len(key) <= MAX_KEY_LENGTH:
+        return checkout_error(f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters', 400)
+
+    try:
+        lines = parse_cart(data.get('items'))
+    except CheckoutError as e:
+        return checkout_error(e.messages[0], 400, errors=e.messages)
+    try:
+        total_amount = float(data.get('total_amount', sum(line.price * line.quantity for line in lines)))
+    except (TypeError, ValueError):
+        return checkout_error('Invalid total amount', 400)
+    customer_name = data.get('customer_name') or ''
+    payment_method = data.get('payment_method') or 'cash'
+    if payment_method not in PAYMENT_METHODS:
+        return checkout_error(f'Invalid payment method: {payment_method}', 400)
+
+    user_id = current_user.id
+    fingerprint = key and request_fingerprint(user_id, data)
+    try:
+        begin_write_transaction(db.session)
+        if key:
+            stored = find_response(key, fingerprint)
+            if stored:
+                db.session.rollback()
+                return replay_response(stored)
+
+        sale, products = checkout(lines, total_amount, customer_name, payment_method, user_id)
+        db.session.flush()
+        body = {'success': True, 'message': 'Sale completed successfully', **checkout_payload(sale, lines, products)}
+        if key:
+            save_response(key, fingerprint, 201, body)
+        db.session.commit()
+    except IdempotencyKeyReused:
+        db.session.rollback()
+        return checkout_error('Idempotency-Key was already used for a different request', 422)
+    except CheckoutError as e:
+        db.session.rollback()
+        return checkout_error(e.messages[0], 400, errors=e.messages)
+    except InsufficientStock as e:
+        db.session.rollback()
+        return checkout_error('Insufficient stock', 409, shortfalls=[s._asdict() for s in e.shortfalls])
+    except IntegrityError:
+        # A concurrent retry with the same key committed first: answer with its response
+        db.session.rollback()
+        stored = key and find_response(key, fingerprint)
+        if not stored:
+            raise
+        return replay_response(stored)
+    except Exception as e:
+        logger.error(f"Unexpected error in checkout API: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return checkout_error('Unexpected error processing sale', 500)
+
+    logger.info(f"API checkout completed: sale {body['sale']['id']}")
+    return jsonify(body), 201
+
+@bp.route('/api/pos/sync', methods=['POST'])
+@login_required
+def api_sync_sales():
+    """Ingest a batch of sales queued by a till while it was offline.
+
+    Takes ``{"sales": [{"client_uuid", "sale_date", "items", "total_amount",
+    "customer_name", "payment_method"}]}`` and answers with one result per
+    sale (``created``, ``duplicate`` or ``rejected``), in request order.
+    """
+    data = request.get_json(silent=True)
+    entries = data.get('sales') if isinstance(data, dict) else None
+    if not isinstance(entries, list):
+        return checkout_error('Request body must be a JSON object with a "sales" list', 400)
+    limit = current_app.config['POS_SYNC_MAX_SALES']
+    if len(entries) > limit:
+        return checkout_error(f'At most {limit} sales can be synced per request', 413)
+
+    user_id = current_user.id
+    try:
+        begin_write_transaction(db.session)
+        results = sync_sales(entries, user_id)
+        db.session.commit()
+    except IntegrityError:
+        # Another request ingested some of these sales first; a retry reports them as duplicates
+        db.session.rollback()
+        return checkout_error('Some of these sales were synced concurrently, please retry', 409)
+    except Exception as e:
+        logger.error(f"Unexpected error syncing offline sales: {str(e)}", exc_info=True)
+        db.session.rollback()
+        return checkout_error('Unexpected error syncing sales', 500)
+
+    counts = {status: 0 for status in ('created', 'duplicate', 'rejected')}
+    for result in results:
+        counts[result['status']] += 1
+    logger.info(f"Synced offline sales: {counts}")
+    return jsonify({'success': True, **counts, 'results': results})
+
+@bp.route('/api/pos/catalog')
+@login_required
+def api_catalog():
+    """Compact product catalog for tills, revalidated by version.
+
+    The ETag is the catalog version, so a till sending ``If-None-Match``
+    gets 304 until a product changes. ``?since=<version>`` lists only the
+    products changed after that version (see ``services.catalog``).
+    """
+    version, reset_version = catalog.current_version()
+    etag = f'catalog-{version}'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(catalog.catalog_payload(version, reset_version, request.args.get('since', type=int)))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+def sales_page(args):
+    """The page of sales asked for by the filters, sort and ``after``/``before``/``per_page`` in ``args``.
+
+    Returns ``(page, per_page, filters)``; raises ``InvalidSaleFilter`` or ``InvalidCursor``.
+    """
+    per_page = args.get('per_page', current_app.config['SALES_PAGE_SIZE'], type=int)
+    per_page = min(max(per_page, 1), current_app.config['SALES_MAX_PAGE_SIZE'])
+    filters = sale_filters(args)
+    query, sort_column, descending = filter_sales(select(Sale), filters)
+    page = keyset_paginate(query, sort_column, Sale.id, per_page, descending=descending,
+                           after=args.get('after'), before=args.get('before'))
+    return page, per_page, filters
+
+def sale_entry(sale):
+    return {
+        'id': sale.id,
+        'sale_date': sale.sale_date.isoformat() if sale.sale_date else None,
+        'customer_name': sale.customer_name,
+        'payment_method': sale.payment_method,
+        'payment_status': sale.payment_status,
+        'total_amount': sale.total_amount,
+        'amount_paid': sale.amount_paid,
+        'balance_due': sale.balance_due,
+    }
+
+@bp.route('/sales')
+@login_required
+def sale_list():
+    try:
+        page, per_page, filters = sales_page(request.args)
+    except (InvalidCursor, InvalidSaleFilter) as e:
+        flash(str(e), 'error')
+        return redirect(url_for('sales.sale_list'))
+    form = SaleForm()
+    return render_template('sale_list.html', sales=page.items, page=page, per_page=per_page,
+                           filters=filters, sorts=SALE_SORTS, payment_methods=PAYMENT_METHODS, form=form)
+
+@bp.route('/api/sales')
+@login_required
+def api_sales():
+    """Sales one page at a time: ``?per_page=50&after=<next_cursor>``.
+
+    Filters: ``date_from`` and ``date_to`` (inclusive dates), ``payment_status``,
+    ``payment_method`` and ``customer`` (case-insensitive name prefix); ``sort``
+    is ``newest`` (default), ``oldest``, ``largest`` or ``smallest``.
+    """
+    try:
+        page, per_page, filters = sales_page(request.args)
+    except (InvalidCursor, InvalidSaleFilter) as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'filters': filters,
+        'per_page': per_page,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        'sales': [sale_entry(sale) for sale in page.items],
+    })
+
+def receivables_page(args):
+    """Outstanding sales oldest first, one page per ``after``/``before``/``per_page`` in ``args``.
+
+    Returns ``(page, per_page, summary)``; raises ``InvalidCursor``.
+    """
+    per_page = args.get('per_page', current_app.config['SALES_PAGE_SIZE'], type=int)
+    per_page = min(max(per_page, 1), current_app.config['SALES_MAX_PAGE_SIZE'])
+    overdue_days = current_app.config['RECEIVABLES_OVERDUE_DAYS']
+    count, outstanding, overdue = receivables.receivables_summary(overdue_days)
+    page = keyset_paginate(select(Sale).where(receivables.OUTSTANDING), Sale.sale_date, Sale.id, per_page,
+                           descending=False, after=args.get('after'), before=args.get('before'))
+    summary = {'sales': count, 'outstanding': outstanding, 'overdue': overdue, 'overdue_days': overdue_days}
+    return page, per_page, summary
+
+@bp.route('/sales/receivables')
+@login_required
+def receivables_list():
+    try:
+        page, per_page, summary = receivables_page(request.args)
+    except InvalidCursor as e:
+        flash(str(e), 'error')
+        return redirect(url_for('sales.receivables_list'))
+    return render_template('receivables.html', sales=page.items, page=page, per_page=per_page,
+                           summary=summary, now=datetime.now(timezone.utc).replace(tzinfo=None))
+
+@bp.route('/api/receivables')
+@login_required
+def api_receivables():
+    """Sales with a balance due, oldest first: ``?per_page=50&after=<next_cursor>``.
+
+    ``summary`` totals every outstanding sale; ``overdue`` is what is owed on
+    sales older than ``RECEIVABLES_OVERDUE_DAYS`` days.
+    """
+    try:
+        page, per_page, summary = receivables_page(request.args)
+    except InvalidCursor as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    return jsonify({
+        'success': True,
+        'summary': summary,
+        'per_page': per_page,
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+        'sales': [sale_entry(sale) for sale in page.items],
+    })
+
+@bp.route('/sales/export')
+@login_required
+def export_sales():
+    """Sales with their items, streamed: ``?format=csv`` (default) or ``ndjson``.
+
+    Takes the filters of ``/api/sales``, typically ``date_from`` and ``date_to``.
+    """
+    export_format = request.args.get('format', 'csv')
+    filters = sale_filters(request.args)
+    try:
+        if export_format not in EXPORT_FORMATS:
+            raise InvalidSaleFilter(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        query = export_query(filters)
+    except InvalidSaleFilter as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    lines = csv_lines(query) if export_format == 'csv' else ndjson_lines(query)
+    period = '_'.join(filters[name] for name in ('date_from', 'date_to') if name in filters) or 'all'
+    logger.info(f"Sales export ({export_format}, {filters}) started by {current_user.username}")
+    return Response(stream_with_context(lines), mimetype=EXPORT_FORMATS[export_format], headers={
+        'Content-Disposition': f'attachment; filename=sales_{period}.{export_format}',
+        # Keep proxies from holding the stream back until it ends
+        'X-Accel-Buffering': 'no',
+    })
+
+@bp.route('/sales/<int:id>')
+@login_required
+def sale_detail(id):
+    # The key columns alone decide whether the cached receipt is still current
+    key = db.session.query(Sale.payment_status, Sale.updated_at).filter(Sale.id == id).first()
+    if key is None:
+        abort(404)
+    payment_status, updated_at = key
+    if payment_status != 'completed':
+        return render_template('sale_detail.html', receipt_html=render_receipt(id))
+
+    cache_key = f'sale:receipt:{id}:{updated_at.isoformat() if updated_at else ""}'
+    receipt_html = cache.get(cache_key)
+    if receipt_html is None:
+        receipt_html = render_receipt(id)
+        cache.set(cache_key, str(receipt_html), timeout=RECEIPT_CACHE_TIMEOUT)
+    return render_template('sale_detail.html', receipt_html=Markup(receipt_html))
+
+def render_receipt(sale_id):
+    """Sale details and receipt markup, with items and products loaded up front."""
+    sale = get_sale_or_404(sale_id, ITEMS_WITH_PRODUCTS)
+    if current_app.config['SALE_DEBUG_LOGGING']:
+        logger.info(f"Sale {sale.id} details: total amount {sale.total_amount}, {len(sale.items)} items")
+        for item in sale.items:
+            logger.info(f"- Product: {item.product.name}, quantity {item.quantity}, "
+                        f"unit price {item.unit_price}, total price {item.total_price}")
+    return Markup(render_template('sale_receipt.html', sale=sale))
+
+@bp.route('/sales/new', methods=['GET', 'POST'])
+@login_required
+def new_sale():
+    form = SaleForm()
+    
+    # Populate product choices
+    products = Product.query.filter_by(is_active=True).all()
+    product_choices = [(p.id, f"{p.name} (KES {p.price:.2f})") for p in products]
+    for item_form in form.items:
+        item_form.product_id.choices = product_choices
+    
+    if form.validate_on_submit():
+        lines = [
+            CartLine(item_form.product_id.data, item_form.quantity.data, item_form.unit_price.data)
+            for item_form in form.items
+        ]
+        total_amount = sum(line.price * line.quantity for line in lines)
+        
+        user_id = current_user.id
+        try:
+            begin_write_transaction(db.session)
+            sale, _ = checkout(lines, total_amount, form.customer_name.data or None, user_id=user_id)
+            sale_id = sale.id
+            db.session.commit()
+            flash('Sale completed successfully!', 'success')
+            return redirect(url_for('sales.process_payment', id=sale_id))
+        except CheckoutError:
+            db.session.rollback()
+            flash('Invalid product selected', 'error')
+            return redirect(url_for('sales.new_sale'))
+        except InsufficientStock as e:
+            db.session.rollback()
+            flash_shortfalls(e)
+            return redirect(url_for('sales.new_sale'))
+        except Exception as e:
+            logger.error(f"Unexpected error creating sale: {str(e)}", exc_info=True)
+            db.session.rollback()
+            flash('Error processing sale. Please try again.', 'error')
+            return redirect(url_for('sales.new_sale'))
+    
+    return render_template('sale_form.html', form=form)
+
+@bp.route('/sales/<int:id>/edit', methods=['GET', 'POST'])
+@login_required
+def edit_sale(id):
+    sale = get_sale_or_404(id, ITEMS_WITH_PRODUCTS)
+    form = SaleForm(obj=sale)
+    
+    # Populate product choices
+    products = Product.query.filter_by(is_active=True).all()
+    product_choices = [(p.id, f"{p.name} (KES {p.price:.2f})") for p in products]
+    
+    # Dynamically add existing sale items to the form
+    while len(form.items) < len(sale.items):
+        form.items.append_entry()
+    
+    # Populate existing sale items
+    for i, item in enumerate(sale.items):
+        form.items[i].product_id.choices = product_choices
+        form.items[i].product_id.data = item.product_id
+        form.items[i].quantity.data = item.quantity
+        form.items[i].unit_price.data = item.unit_price
+    
+    if form.validate_on_submit():
+        # What the sale contributed to the daily rollup before this edit
+        previous_contribution = sales_summary.sale_contribution(sale)
+
+        # Original quantities go back to stock
+        returned = {}
+        for item in sale.items:
+            returned[item.product_id] = returned.get(item.product_id, 0) + item.quantity
+        
+        # Remove existing sale items
+        SaleItem.query.filter_by(sale_id=sale.id).delete()
+        
+        # Update sale details
+        sale.customer_name = form.customer_name.data
+        sale.total_amount = 0  # Will be recalculated
+        
+        # Process updated sale items
+        total_amount = 0
+        requested = {}
+        chosen = {
+            product.id: product for product in
+            Product.query.filter(Product.id.in_({item_form.product_id.data for item_form in form.items}))
+        }
+        for item_form in form.items:
+            product = chosen.get(item_form.product_id.data)
+            if not product:
+                flash('Invalid product selected', 'error')
+                return redirect(url_for('sales.edit_sale', id=sale.id))
+            
+            # Create updated sale item
+            sale_item = SaleItem(
+                sale=sale,
+                product=product,
+                quantity=item_form.quantity.data,
+                unit_price=item_form.unit_price.data,
+                total_price=item_form.quantity.data * item_form.unit_price.data
+            )
+            db.session.add(sale_item)
+            requested[product.id] = requested.get(product.id, 0) + item_form.quantity.data
+            
+            # Add stock history entry
+            stock_history = StockHistory(
+                product=product,
+                quantity=-item_form.quantity.data,
+                type='sale_edit',
+                notes=f'Sale Edit #{sale.id}',
+                user=current_user
+            )
+            db.session.add(stock_history)
+            
+            total_amount += sale_item.total_price
+        
+        # Update sale total
+        sale.total_amount = total_amount
+        
+        try:
+            # Only the net change per product touches stock
+            product_ids = set(returned) | set(requested)
+            put_stock({pid: returned.get(pid, 0) - requested.get(pid, 0) for pid in product_ids
+                       if returned.get(pid, 0) > requested.get(pid, 0)})
+            take_stock({pid: requested.get(pid, 0) - returned.get(pid, 0) for pid in product_ids
+                        if requested.get(pid, 0) > returned.get(pid, 0)})
+            sales_summary.apply_contributions(
+                added=[sales_summary.sale_contribution(sale)],
+                removed=[previous_contribution]
+            )
+            db.session.commit()
+            flash('Sale updated successfully!', 'success')
+            return redirect(url_for('sales.sale_detail', id=sale.id))
+        except InsufficientStock as e:
+            db.session.rollback()
+            flash_shortfalls(e)
+            return redirect(url_for('sales.edit_sale', id=sale.id))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error updating sale: {str(e)}', 'error')
+            return redirect(url_for('sales.edit_sale', id=sale.id))
+    
+    return render_template('sale_form.html', form=form, title='Edit Sale', sale=sale)
+
+@bp.route('/sales/<int:id>/delete', methods=['POST'])
+@login_required
+def delete_sale(id):
+    sale = Sale.query.get_or_404(id)
+    
+    try:
+        # Restore stock quantities for all sale items
+        returned = {}
+        for item in sale.items:
+            returned[item.product_id] = returned.get(item.product_id, 0) + item.quantity
+        put_stock(returned)
+        
+        # Delete sale and its associated items
+        sales_summary.remove_sale(sale)
+        db.session.delete(sale)
+        db.session.commit()
+        
+        return jsonify({'success': True, 'message': 'Sale deleted successfully'})
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@bp.route('/sales/<int:id>/debug')
+@login_required
+def sale_debug(id):
+    sale = get_sale_or_404(id, ITEMS_WITH_PRODUCTS)
+    
+    # Detailed debug information
+    debug_info = {
+        'sale_id': sale.id,
+        'customer_name': sale.customer_name,
+        'total_amount': sale.total_amount,
+        'payment_method': sale.payment_method,
+        'payment_status': sale.payment_status,
+        'sale_date': sale.sale_date.isoformat(),
+        'items': []
+    }
+    
+    for item in sale.items:
+        debug_info['items'].append({
+            'id': item.id,
+            'product_id': item.product_id,
+            'product_name': item.product.name,
+            'quantity': item.quantity,
+            'unit_price': item.unit_price,
+            'total_price': item.total_price
+        })
+    
+    return jsonify(debug_info)
+
+@bp.route('/sales/<int:id>/payment', methods=['GET', 'POST'])
+@login_required
+def process_payment(id):
+    sale = get_sale_or_404(id, PAYMENTS)
+    form = PaymentForm()
+    
+    if form.validate_on_submit():
+        previous_contribution = sales_summary.sale_contribution(sale)
+
+        payment = Payment(
+            sale_id=sale.id,
+            amount=form.amount.data,
+            payment_method=form.payment_method.data,
+            transaction_id=form.transaction_id.data if form.payment_method.data in ['mpesa', 'card'] else None,
+            status='completed'
+        )
+        
+        db.session.add(payment)
+        # The flush brings the sale's stored amount paid up to date
+        db.session.flush()
+        sale.payment_status = receivables.settled_status(sale)
+
+        sales_summary.apply_contributions(
+            added=[sales_summary.sale_contribution(sale)],
+            removed=[previous_contribution]
+        )
+        db.session.commit()
+        
+        flash('Payment processed successfully!', 'success')
+        return redirect(url_for('sales.sale_detail', id=sale.id))
+    
+    return render_template('payment_form.html', sale=sale, form=form)
+
+@bp.route('/sales/<int:id>/payments')
+@login_required
+def sale_payments(id):
+    sale = get_sale_or_404(id, PAYMENTS)
+    return render_template('sale_payments.html', sale=sale, payments=sale.payments,
+                           total_paid=sale.amount_paid, balance=sale.balance_due)
+
+@bp.route('/payments/<int:id>/status', methods=['POST'])
+@login_required
+def update_payment_status(id):
+    payment = Payment.query.get_or_404(id)
+    data = request.get_json()
+    
+    if not data or 'status' not in data:
+        return jsonify({'success': False, 'error': 'Invalid request data'}), 400
+    
+    sale = db.session.get(Sale, payment.sale_id)
+    previous_contribution = sales_summary.sale_contribution(sale)
+
+    payment.status = data['status']
+    db.session.flush()
+    sale.payment_status = receivables.settled_status(sale)
+
+    sales_summary.apply_contributions(
+        added=[sales_summary.sale_contribution(sale)],
+        removed=[previous_contribution]
+    )
+    db.session.commit()
+    return jsonify({'success': True})
+
+@bp.route('/api/products/search')
+@login_required
+def api_search_products():
+    """Ranked product search for the POS: ``?q=<words>&page=1&per_page=20``.
+
+    Only active products are listed, in the catalog's shape, best match
+    first; ``has_more`` tells whether another page follows.
+    """
+    query = request.args.get('q', '').strip()
+    page = max(request.args.get('page', 1, type=int), 1)
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), search.MAX_PER_PAGE)
+    stmt = search.search_products(query)
+    products = [] if stmt is None else db.session.scalars(
+        stmt.limit(per_page + 1).offset((page - 1) * per_page)
+    ).all()
+    return jsonify({
+        'success': True,
+        'query': query,
+        'page': page,
+        'per_page': per_page,
+        'has_more': len(products) > per_page,
+        'products': [catalog.catalog_entry(product) for product in products[:per_page]],
+    })
+
+@bp.route('/api/products/by-code/<code>')
+@login_required
+def api_product_by_code(code):
+    """Active product with this SKU or barcode, for scanners on the till."""
+    product = find_by_code(code)
+    if product is None:
+        return jsonify({'success': False, 'message': f'No active product with code {code}'}), 404
+    return jsonify({'success': True, 'product': {**catalog.catalog_entry(product), 'barcode': product.barcode}})
+
+@bp.route('/api/products/<int:id>/price')
+@login_required
+def get_product_price(id):
+    product = Product.query.get_or_404(id)
+    return jsonify({'price': product.price})
@@ -0,0 +1,69 @@
+from flask import Blueprint, render_template, redirect, url_for, flash
+from flask_login import login_required
+
+from extensions import db
+from forms import SupplierForm
+from models import Supplier, Product
+
+bp = Blueprint('suppliers', __name__)
+
+@bp.route('/suppliers')
+@login_required
+def supplier_list():
+    suppliers = Supplier.query.all()
+    return render_template('supplier_list.html', suppliers=suppliers)
+
+@bp.route('/suppliers/new', methods=['GET', 'POST'])
+@login_required
+def new_supplier():
+    form = SupplierForm()
+    if form.validate_on_submit():
+        try:
+            supplier = Supplier(
+                name=form.name.data,
+                contact_person=form.contact_person.data,
+                phone=form.phone.data,
+                email=form.email.data,
+                address=form.address.data
+            )
+            db.session.add(supplier)
+            db.session.commit()
+            flash('Supplier added successfully', 'success')
+            return redirect(url_for('suppliers.supplier_list'))
+        except Exception as e:
+            db.session.rollback()
+            flash(f'Error adding supplier: {str(e)}', 'danger')
+    return render_template('supplier_form.html', form=form, title='New Supplier')
+
+@bp.route('/suppliers/<int:id>')
+@login_required
+def supplier_detail(id):
+    supplier = Supplier.query.get_or_404(id)
+    products = Product.query.filter_by(supplier_id=id).all()
+    return render_template('supplier_detail.html', supplier=supplier, products=products)
+
+@bp.route('/suppliers/<int:id>/edit', methods=['GET', 'POST'])
+@login_required
+def edit_supplier(id):
+    supplier = Supplier.query.get_or_404(id)
+    form = SupplierForm(obj=supplier)
+    if form.validate_on_submit():
+        supplier.name = form.name.data
+        supplier.contact_person = form.contact_person.data
+        supplier.phone = form.phone.data
+        supplier.email = form.email.data
+        supplier.address = form.address.data
+        supplier.is_active = form.is_active.data
+        db.session.commit()
+        flash('Supplier updated successfully')
+        return redirect(url_for('suppliers.supplier_list'))
+    return render_template('supplier_form.html', form=form, title='Edit Supplier', supplier=supplier)
+
+@bp.route('/suppliers/<int:id>/delete', methods=['POST'])
+@login_required
+def delete_supplier(id):
+    supplier = Supplier.query.get_or_404(id)
+    db.session.delete(supplier)
+    db.session.commit()
+    flash('Supplier deleted successfully')
+    return redirect(url_for('suppliers.supplier_list'))
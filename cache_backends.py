@@ -0,0 +1,313 @@
+"""Two-level cache backend for Flask-Caching.
+
+``TieredCache`` keeps a small per-worker in-memory LRU (L1) in front of a
+backend shared by every worker (L2). L1 hits cost a dict lookup and an
+unpickle instead of a file open; L1 entries live for at most
+``CACHE_L1_TIMEOUT`` seconds so deletes made by another worker in L2 are
+picked up quickly.
+
+Configuration (all optional):
+
+    CACHE_TYPE = 'cache_backends.TieredCache'
+    CACHE_L1_MAX_BYTES      size bound of the in-memory tier (default 16 MB)
+    CACHE_L1_MAX_ENTRIES    entry bound of the in-memory tier (default 5000)
+    CACHE_L1_TIMEOUT        max seconds an entry stays in memory (default 30)
+    CACHE_SHARED_BACKEND    'filesystem' (default), 'sqlite', 'simple', 'null'
+                            or a dotted path to a Flask-Caching backend class
+    CACHE_SHARED_PATH       database file for the 'sqlite' backend
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from flask_caching.backends.base import BaseCache
+from flask_caching.backends.filesystemcache import FileSystemCache
+from flask_caching.backends.nullcache import NullCache
+from flask_caching.backends.simplecache import SimpleCache
+from werkzeug.utils import import_string
+
+
+class MemoryLRUCache(BaseCache):
+    """Per-process LRU cache bounded by entry count and pickled size."""
+
+    def __init__(self, max_bytes=16 * 1024 * 1024, max_entries=5000, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, payload)
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def _expires_at(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.monotonic() + timeout if timeout > 0 else None
+
+    def _remove(self, key):
+        _, payload = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def _lookup(self, key):
+        """Return the payload for ``key`` or None, dropping it if expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, payload = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return payload
+
+    def get(self, key):
+        with self._lock:
+            payload = self._lookup(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return pickle.loads(payload)
+
+    def set(self, key, value, timeout=None):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes:
+            # Never let a single oversized value flush the whole tier
+            self.delete(key)
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while self._entries and (self._bytes + len(payload) > self.max_bytes
+                                     or len(self._entries) >= self.max_entries):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (self._expires_at(timeout), payload)
+            self._bytes += len(payload)
+        return True
+
+    def add(self, key, value, timeout=None):
+        with self._lock:
+            if self._lookup(key) is not None:
+                return False
+            return self.set(key, value, timeout)
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                return True
+        return False
+
+    def has(self, key):
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
+class SQLiteKVCache(BaseCache):
+    """Key-value cache in a single SQLite file shared by all local workers.
+
+    A local stand-in for a networked key-value store: one indexed lookup per
+    get instead of one file per key, and expired rows are pruned in bulk.
+    """
+
+    def __init__(self, path, default_timeout=300, threshold=10000):
+        super().__init__(default_timeout=default_timeout)
+        self.path = path
+        self.threshold = threshold
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entry ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)'
+            )
+
+    def _connection(self):
+        # One connection per thread and per process; forked workers reconnect
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _expires_at(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return time.time() + timeout if timeout > 0 else None
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value, expires_at FROM cache_entry WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return pickle.loads(value)
+
+    def set(self, key, value, timeout=None):
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires_at(timeout)),
+        )
+        self._prune(conn)
+        return True
+
+    def add(self, key, value, timeout=None):
+        conn = self._connection()
+        conn.execute('DELETE FROM cache_entry WHERE key = ? AND expires_at <= ?', (key, time.time()))
+        cursor = conn.execute(
+            'INSERT OR IGNORE INTO cache_entry (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), self._expires_at(timeout)),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key):
+        cursor = self._connection().execute('DELETE FROM cache_entry WHERE key = ?', (key,))
+        return cursor.rowcount == 1
+
+    def has(self, key):
+        row = self._connection().execute(
+            'SELECT 1 FROM cache_entry WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)',
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
+        return True
+
+    def _prune(self, conn):
+        if not self.threshold:
+            return
+        count = conn.execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        if count <= self.threshold:
+            return
+        conn.execute('DELETE FROM cache_entry WHERE expires_at <= ?', (time.time(),))
+        # Still too big: drop the entries closest to expiry
+        conn.execute(
+            'DELETE FROM cache_entry WHERE key IN ('
+            'SELECT key FROM cache_entry ORDER BY expires_at IS NULL, expires_at LIMIT ?)',
+            (max(count - self.threshold, 0),),
+        )
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        path = config.get('CACHE_SHARED_PATH') or os.path.join(config['CACHE_DIR'], 'cache.sqlite')
+        return cls(path, default_timeout=config['CACHE_DEFAULT_TIMEOUT'],
+                   threshold=config['CACHE_THRESHOLD'])
+
+
+SHARED_BACKENDS = {
+    'filesystem': FileSystemCache,
+    'sqlite': SQLiteKVCache,
+    'simple': SimpleCache,
+    'null': NullCache,
+}
+
+
+class TieredCache(BaseCache):
+    """In-memory LRU (L1) in front of a shared backend (L2)."""
+
+    def __init__(self, local, shared, local_timeout=30, default_timeout=300):
+        super().__init__(default_timeout=default_timeout)
+        self.local = local
+        self.shared = shared
+        self.local_timeout = local_timeout
+        self.l2_hits = 0
+        self.misses = 0
+
+    def _local_timeout(self, timeout):
+        timeout = self._normalize_timeout(timeout)
+        return min(timeout, self.local_timeout) if timeout > 0 else self.local_timeout
+
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        value = self.shared.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.l2_hits += 1
+        self.local.set(key, value, self.local_timeout)
+        return value
+
+    def set(self, key, value, timeout=None):
+        result = self.shared.set(key, value, timeout)
+        self.local.set(key, value, self._local_timeout(timeout))
+        return result
+
+    def add(self, key, value, timeout=None):
+        if not self.shared.add(key, value, timeout):
+            return False
+        self.local.set(key, value, self._local_timeout(timeout))
+        return True
+
+    def delete(self, key):
+        self.local.delete(key)
+        return self.shared.delete(key)
+
+    def has(self, key):
+        return self.local.has(key) or self.shared.has(key)
+
+    def clear(self):
+        self.local.clear()
+        return self.shared.clear()
+
+    def stats(self):
+        """Hit, miss and eviction counters for this worker."""
+        local = self.local.stats()
+        return {
+            'l1_hits': local['hits'],
+            'l2_hits': self.l2_hits,
+            'misses': self.misses,
+            'l1_evictions': local['evictions'],
+            'l1_expirations': local['expirations'],
+            'l1_entries': local['entries'],
+            'l1_bytes': local['bytes'],
+        }
+
+    @classmethod
+    def factory(cls, app, config, args, kwargs):
+        backend = config.get('CACHE_SHARED_BACKEND', 'filesystem')
+        shared_cls = SHARED_BACKENDS.get(backend) or import_string(backend)
+        shared = shared_cls.factory(app, config, list(args), dict(kwargs))
+        local = MemoryLRUCache(
+            max_bytes=config.get('CACHE_L1_MAX_BYTES', 16 * 1024 * 1024),
+            max_entries=config.get('CACHE_L1_MAX_ENTRIES', 5000),
+            default_timeout=config['CACHE_DEFAULT_TIMEOUT'],
+        )
+        return cls(local, shared,
+                   local_timeout=config.get('CACHE_L1_TIMEOUT', 30),
+                   default_timeout=config['CACHE_DEFAULT_TIMEOUT'])
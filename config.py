@@ -0,0 +1,124 @@
+import os
+import secrets
+from datetime import timedelta
+
+
+def _env_list(name, default):
+    """Read a comma separated list from the environment."""
+    value = os.environ.get(name)
+    if not value:
+        return default
+    return tuple(item.strip() for item in value.split(',') if item.strip())
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def _database_url(default):
+    """Read DATABASE_URL, accepting the legacy postgres:// scheme used by some hosts."""
+    url = os.environ.get('DATABASE_URL', default)
+    if url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+class Config:
+    """Base configuration shared by every deployment."""
+    SECRET_KEY = os.environ.get('SECRET_KEY') or secrets.token_hex(16)
+    SQLALCHEMY_DATABASE_URI = _database_url('sqlite:///barkery.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool, used to build SQLALCHEMY_ENGINE_OPTIONS (see database.py)
+    DB_POOL_SIZE = _env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = _env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = _env_int('DB_POOL_TIMEOUT', 30)
+    DB_POOL_RECYCLE = _env_int('DB_POOL_RECYCLE', 1800)
+    DB_POOL_PRE_PING = _env_bool('DB_POOL_PRE_PING', True)
+
+    # Pragmas applied to every SQLite connection
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_BUSY_TIMEOUT_MS = _env_int('SQLITE_BUSY_TIMEOUT_MS', 5000)
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_CACHE_SIZE = _env_int('SQLITE_CACHE_SIZE', -20000)  # negative means KiB, so ~20 MB
+    SQLITE_MMAP_SIZE = _env_int('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)
+
+    PERMANENT_SESSION_LIFETIME = timedelta(minutes=30)
+    SESSION_COOKIE_SECURE = True
+    SESSION_COOKIE_HTTPONLY = True
+    SESSION_COOKIE_SAMESITE = 'Lax'
+
+    # Per-worker in-memory LRU in front of a shared backend (see cache_backends.py)
+    CACHE_TYPE = 'cache_backends.TieredCache'
+    CACHE_SHARED_BACKEND = os.environ.get('CACHE_SHARED_BACKEND', 'filesystem')
+    CACHE_DIR = os.environ.get('CACHE_DIR', 'cache')
+    CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
+    CACHE_L1_MAX_BYTES = _env_int('CACHE_L1_MAX_BYTES', 16 * 1024 * 1024)
+    CACHE_L1_MAX_ENTRIES = _env_int('CACHE_L1_MAX_ENTRIES', 5000)
+    CACHE_L1_TIMEOUT = _env_int('CACHE_L1_TIMEOUT', 30)
+
+    # Per-request SQL instrumentation (see sql_profiling.py), on in development
+    SQL_PROFILING = _env_bool('SQL_PROFILING', False)
+    SQL_SERVER_TIMING = _env_bool('SQL_SERVER_TIMING', False)
+    SQL_REPEAT_THRESHOLD = _env_int('SQL_REPEAT_THRESHOLD', 10)
+
+    # How long /api/pos/checkout replays the response for a repeated Idempotency-Key
+    IDEMPOTENCY_KEY_TTL_HOURS = _env_int('IDEMPOTENCY_KEY_TTL_HOURS', 24)
+
+    # Largest batch of offline sales /api/pos/sync accepts in one request
+    POS_SYNC_MAX_SALES = _env_int('POS_SYNC_MAX_SALES', 1000)
+
+    # Sales list and /api/sales page sizes (keyset pagination, see services/pagination.py)
+    SALES_PAGE_SIZE = _env_int('SALES_PAGE_SIZE', 50)
+    SALES_MAX_PAGE_SIZE = _env_int('SALES_MAX_PAGE_SIZE', 200)
+
+    # Receivables older than this many days count as overdue
+    RECEIVABLES_OVERDUE_DAYS = _env_int('RECEIVABLES_OVERDUE_DAYS', 30)
+
+    # Log every line of a sale when its detail page is rendered
+    SALE_DEBUG_LOGGING = _env_bool('SALE_DEBUG_LOGGING', False)
+
+    UPLOAD_FOLDER = 'uploads'
+    LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
+
+    # Blueprints to register, e.g. BAKERY_BLUEPRINTS=sales for a till-only POS node.
+    # The 'main' blueprint (login, dashboard) is always registered.
+    ENABLED_BLUEPRINTS = _env_list('BAKERY_BLUEPRINTS', (
+        'sales', 'inventory', 'suppliers', 'finance', 'employees', 'production', 'imports',
+    ))
+
+
+class DevelopmentConfig(Config):
+    DEBUG = True
+    SESSION_COOKIE_SECURE = False
+    SQL_PROFILING = _env_bool('SQL_PROFILING', True)
+    SQL_SERVER_TIMING = _env_bool('SQL_SERVER_TIMING', True)
+
+
+class TestingConfig(Config):
+    TESTING = True
+    SECRET_KEY = 'test_secret_key'
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    WTF_CSRF_ENABLED = False
+    SESSION_COOKIE_SECURE = False
+    CACHE_SHARED_BACKEND = 'simple'
+
+
+class ProductionConfig(Config):
+    pass
+
+
+config_by_name = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+    'default': Config,
+}
@@ -0,0 +1,106 @@
+"""Database engine configuration.
+
+Builds ``SQLALCHEMY_ENGINE_OPTIONS`` from the app config and, for SQLite,
+applies concurrency and performance pragmas to every new connection. WAL mode
+lets readers run alongside a writer and ``busy_timeout`` makes concurrent
+writers from several gunicorn workers wait for the lock instead of failing
+with "database is locked".
+
+SQLite connections also take over transaction control from the pysqlite
+driver (which otherwise defers BEGIN until the first write), so a checkout can
+start its transaction with ``BEGIN IMMEDIATE`` through
+``begin_write_transaction``.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from extensions import db
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def build_engine_options(config):
+    """Return engine options suited to the configured database."""
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+    if is_memory_sqlite(uri):
+        # In-memory SQLite uses a single static connection; pool sizing does not apply
+        return options
+
+    options['pool_recycle'] = config['DB_POOL_RECYCLE']
+    options['pool_size'] = config['DB_POOL_SIZE']
+    options['max_overflow'] = config['DB_MAX_OVERFLOW']
+    options['pool_timeout'] = config['DB_POOL_TIMEOUT']
+    return options
+
+
+def sqlite_pragmas(config):
+    """Pragmas applied to every SQLite connection, in execution order."""
+    return [
+        ('journal_mode', config['SQLITE_JOURNAL_MODE']),
+        ('busy_timeout', config['SQLITE_BUSY_TIMEOUT_MS']),
+        ('synchronous', config['SQLITE_SYNCHRONOUS']),
+        ('cache_size', config['SQLITE_CACHE_SIZE']),
+        ('mmap_size', config['SQLITE_MMAP_SIZE']),
+    ]
+
+
+def _attach_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        # Let SQLAlchemy's 'begin' event below issue BEGIN instead of the driver
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, 'begin')
+    def begin_sqlite_transaction(conn):
+        mode = conn.get_execution_options().get('sqlite_begin')
+        conn.exec_driver_sql(f'BEGIN {mode}' if mode else 'BEGIN')
+
+
+def begin_write_transaction(session):
+    """Start a transaction that holds the write lock from its first statement.
+
+    On SQLite the read transaction the session may hold (e.g. from loading the
+    current user) is rolled back and the next one begins with ``BEGIN
+    IMMEDIATE``, so concurrent checkouts queue on ``busy_timeout`` instead of
+    reading the same stock and failing when they upgrade to a write lock.
+    Other dialects lock the rows they read with ``SELECT ... FOR UPDATE``;
+    there this only makes sure a transaction is open. Call it before making
+    changes in the session: it never commits on the caller's behalf, and
+    raises ``RuntimeError`` if the session already holds pending changes.
+    """
+    if session.get_bind().dialect.name != 'sqlite':
+        return session.connection()
+    if session.new or session.dirty or session.deleted:
+        raise RuntimeError('begin_write_transaction called with pending changes in the session')
+    session.rollback()
+    return session.connection(execution_options={'sqlite_begin': 'IMMEDIATE'})
+
+
+def init_database(app):
+    """Initialise Flask-SQLAlchemy on ``app`` with tuned engine settings."""
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(app.config)
+
+    db.init_app(app)
+
+    with app.app_context():
+        pragmas = sqlite_pragmas(app.config)
+        for engine in db.engines.values():
+            if engine.dialect.name == 'sqlite':
+                _attach_sqlite_pragmas(engine, pragmas)
@@ -2,11 +2,13 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect
 from flask_login import LoginManager
+from flask_caching import Cache
 
 # Initialize extensions
 db = SQLAlchemy()
 migrate = Migrate()
 csrf = CSRFProtect()
+cache = Cache()
 login_manager = LoginManager()
-login_manager.login_view = 'login'
-login_manager.login_message_category = 'info' 
\ No newline at end of file
+login_manager.login_view = 'main.login'
+login_manager.login_message_category = 'info'
@@ -37,7 +37,7 @@ class RegistrationForm(FlaskForm):
         from models import User
         try:
             # Ensure database is initialized
-            from app import db
+            from extensions import db
             db.create_all()
             
             # Check for existing username
@@ -54,7 +54,7 @@ class RegistrationForm(FlaskForm):
         from models import User
         try:
             # Ensure database is initialized
-            from app import db
+            from extensions import db
             db.create_all()
             
             # Check for existing email
@@ -69,6 +69,7 @@ class RegistrationForm(FlaskForm):
 
 class ProductForm(FlaskForm):
     name = StringField('Name', validators=[DataRequired()])
+    barcode = StringField('SKU / Barcode', validators=[Optional(), Length(max=64)])
     description = TextAreaField('Description')
     price = FloatField('Price', validators=[DataRequired(), NumberRange(min=0)])
     category = SelectField('Category', choices=[
@@ -85,6 +86,18 @@ class ProductForm(FlaskForm):
     is_active = BooleanField('Active', default=True)
     submit = SubmitField('Submit')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The product being edited, which may keep its own barcode
+        self.product = kwargs.get('obj')
+
+    def validate_barcode(self, barcode):
+        from models import Product
+        code = barcode.data.strip()
+        existing = Product.query.filter_by(barcode=code).first() if code else None
+        if existing is not None and existing is not self.product:
+            raise ValidationError(f'Barcode already used by {existing.name}.')
+
 class SupplierForm(FlaskForm):
     name = StringField('Name', validators=[DataRequired()])
     contact_person = StringField('Contact Person')
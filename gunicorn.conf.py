@@ -0,0 +1,21 @@
+"""Gunicorn settings.
+
+The application is built once in the master (``preload_app``) so the imported
+code and templates are shared copy-on-write between workers. Database
+connections must not be shared across the fork, so each worker drops the
+pool it inherited and opens its own connections.
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+preload_app = True
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,81 @@
+"""Deferred imports for heavy third-party libraries.
+
+pandas, numpy, matplotlib and seaborn together add seconds of import time and
+tens of MB of memory to every worker. Only the import/export and analytics code
+paths need them, so they are exposed here as lazy proxies that import the real
+module the first time an attribute is accessed.
+
+Usage:
+    from lazy_imports import pd
+
+    df = pd.read_csv(file)  # pandas is imported here, not at startup
+"""
+import importlib
+import sys
+import threading
+
+
+class LazyModule:
+    """Proxy that imports ``name`` on first attribute access."""
+
+    def __init__(self, name, on_load=None):
+        self.__dict__['_name'] = name
+        self.__dict__['_on_load'] = on_load
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is not None:
+            return module
+        with self.__dict__['_lock']:
+            if self.__dict__['_module'] is None:
+                on_load = self.__dict__['_on_load']
+                if on_load is not None:
+                    on_load()
+                self.__dict__['_module'] = importlib.import_module(self._name)
+            return self.__dict__['_module']
+
+    @property
+    def is_loaded(self):
+        return self.__dict__['_module'] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f'<LazyModule {self._name} ({state})>'
+
+
+def _use_headless_backend():
+    """Select a non-interactive matplotlib backend before pyplot is imported."""
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def lazy_import(name, on_load=None):
+    """Return the module if it is already imported, otherwise a lazy proxy."""
+    if name in sys.modules and on_load is None:
+        return sys.modules[name]
+    return LazyModule(name, on_load=on_load)
+
+
+def is_loaded(name):
+    """Check whether a module has actually been imported in this process."""
+    return name in sys.modules
+
+
+# Heavy libraries used by import, export and analytics code paths
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
+plt = lazy_import('matplotlib.pyplot', on_load=_use_headless_backend)
+sns = lazy_import('seaborn')
+
+HEAVY_MODULES = ('pandas', 'numpy', 'matplotlib', 'seaborn')
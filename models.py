@@ -2,12 +2,22 @@ from extensions import db
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timezone
-from sqlalchemy import event, Index
+from sqlalchemy import DDL, event, func, Index, text
 from sqlalchemy.orm import validates
 
+from money import Money
+
 def get_current_time():
     return datetime.now(timezone.utc)
 
+def initial_amount_paid(context):
+    # A sale rung up as completed was settled at the till; any other starts unpaid
+    params = context.get_current_parameters()
+    return params['total_amount'] if (params.get('payment_status') or 'completed') == 'completed' else 0
+
+def initial_balance_due(context):
+    return context.get_current_parameters()['total_amount'] - initial_amount_paid(context)
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -55,8 +65,10 @@ class Supplier(db.Model):
 class Product(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False, index=True)
+    # SKU or scannable barcode (EAN/UPC or an in-store code)
+    barcode = db.Column(db.String(64), unique=True, index=True)
     description = db.Column(db.Text)
-    price = db.Column(db.Float, nullable=False, index=True)
+    price = db.Column(Money, nullable=False, index=True)
     category = db.Column(db.String(50), index=True)
     unit = db.Column(db.String(20), nullable=False)
     supplier_id = db.Column(db.Integer, db.ForeignKey('supplier.id'), index=True)
@@ -65,11 +77,19 @@ class Product(db.Model):
     reorder_quantity = db.Column(db.Integer, default=20)
     image_path = db.Column(db.String(200))
     is_active = db.Column(db.Boolean, default=True, index=True)
+    # Catalog version of the last change, stamped by services.catalog
+    catalog_version = db.Column(db.Integer, nullable=False, default=0, server_default='0', index=True)
     created_at = db.Column(db.DateTime, default=get_current_time, index=True)
     updated_at = db.Column(db.DateTime, default=get_current_time, onupdate=get_current_time)
 
     supplier = db.relationship('Supplier', backref='products', lazy=True)
 
+    @validates('barcode')
+    def validate_barcode(self, key, barcode):
+        # Blank codes are stored as NULL so they do not collide on the unique index
+        barcode = str(barcode).strip() if barcode is not None else None
+        return barcode or None
+
     @validates('price')
     def validate_price(self, key, price):
         if price < 0:
@@ -90,15 +110,26 @@ class Product(db.Model):
 
 class Sale(db.Model):
     id = db.Column(db.Integer, primary_key=True)
+    # Set by tills for sales rung up offline; identifies them when they sync
+    client_uuid = db.Column(db.String(36), unique=True)
     customer_name = db.Column(db.String(100))
-    total_amount = db.Column(db.Float, nullable=False)
+    total_amount = db.Column(Money, nullable=False)
     payment_method = db.Column(db.String(20), default='cash')
     payment_status = db.Column(db.String(20), default='completed')
-    sale_date = db.Column(db.DateTime, default=get_current_time, index=True)
+    # Kept in step with the payments by services/receivables.py: the sum of the
+    # completed payments or, for a sale without payment records, its total when
+    # it is marked completed. idx_sale_outstanding indexes the sales with a balance.
+    amount_paid = db.Column(Money, nullable=False, default=initial_amount_paid, server_default='0')
+    balance_due = db.Column(Money, nullable=False, default=initial_balance_due, server_default='0')
+    # Indexed by idx_sale_date_status, whose leading column serves date range scans,
+    # and by idx_sale_date_id, the sales list's keyset pagination order
+    sale_date = db.Column(db.DateTime, default=get_current_time)
     created_at = db.Column(db.DateTime, default=get_current_time)
     updated_at = db.Column(db.DateTime, default=get_current_time, onupdate=get_current_time)
 
     items = db.relationship('SaleItem', backref='sale', lazy=True, cascade='all, delete-orphan')
+    payments = db.relationship('Payment', backref='sale', lazy=True, cascade='all, delete-orphan',
+                               order_by='Payment.payment_date.desc()')
 
     def __repr__(self):
         return f'<Sale {self.id}>'
@@ -108,8 +139,8 @@ class SaleItem(db.Model):
     sale_id = db.Column(db.Integer, db.ForeignKey('sale.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
-    unit_price = db.Column(db.Float, nullable=False)
-    total_price = db.Column(db.Float, nullable=False)
+    unit_price = db.Column(Money, nullable=False)
+    total_price = db.Column(Money, nullable=False)
     created_at = db.Column(db.DateTime, default=get_current_time)
 
     product = db.relationship('Product', backref='sale_items', lazy=True)
@@ -129,7 +160,7 @@ class Purchase(db.Model):
     order_date = db.Column(db.DateTime, default=get_current_time)
     delivery_date = db.Column(db.DateTime)
     status = db.Column(db.String(20), default='pending')
-    total_amount = db.Column(db.Float, default=0)
+    total_amount = db.Column(Money, default=0)
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, default=get_current_time)
 
@@ -142,7 +173,7 @@ class Expense(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     date = db.Column(db.Date, nullable=False)
     type = db.Column(db.String(50), nullable=False)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     description = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=get_current_time)
 
@@ -175,7 +206,7 @@ class Employee(db.Model):
     email = db.Column(db.String(120))
     role = db.Column(db.String(50), nullable=False)  # baker, sales, cleaning, manager, inventory_manager, accountant, system_admin
     department = db.Column(db.String(50))  # production, sales, management, inventory, finance, IT
-    salary = db.Column(db.Float)
+    salary = db.Column(Money)
     hire_date = db.Column(db.Date, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=get_current_time)
@@ -272,7 +303,7 @@ class StockHistory(db.Model):
 class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     sale_id = db.Column(db.Integer, db.ForeignKey('sale.id'), nullable=False, index=True)
-    amount = db.Column(db.Float, nullable=False)
+    amount = db.Column(Money, nullable=False)
     payment_method = db.Column(db.String(50), nullable=False, index=True)
     transaction_id = db.Column(db.String(100), index=True)
     payment_date = db.Column(db.DateTime, default=get_current_time, index=True)
@@ -283,6 +314,47 @@ class Payment(db.Model):
     def __repr__(self):
         return f'<Payment {self.id}>'
 
+class DailySalesSummary(db.Model):
+    """Per-day, per-payment-method sales totals maintained alongside the sales."""
+    __tablename__ = 'daily_sales_summary'
+
+    summary_date = db.Column(db.Date, primary_key=True)
+    payment_method = db.Column(db.String(20), primary_key=True)
+    revenue = db.Column(Money, nullable=False, default=0)
+    transactions = db.Column(db.Integer, nullable=False, default=0)
+    items_sold = db.Column(db.Integer, nullable=False, default=0)
+    amount_paid = db.Column(Money, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<DailySalesSummary {self.summary_date} {self.payment_method}>'
+
+class IdempotencyKey(db.Model):
+    """Stored response of an API request made with an ``Idempotency-Key`` header."""
+    __tablename__ = 'idempotency_key'
+
+    key = db.Column(db.String(255), primary_key=True)
+    request_hash = db.Column(db.String(64), nullable=False)
+    response_status = db.Column(db.Integer, nullable=False)
+    response_body = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<IdempotencyKey {self.key}>'
+
+class CatalogState(db.Model):
+    """Single-row catalog version state (see services.catalog)."""
+    __tablename__ = 'catalog_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Bumped by every commit that changes products
+    version = db.Column(db.Integer, nullable=False, default=0)
+    # Version of the last hard delete; deltas from before it must refetch everything
+    reset_version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CatalogState {self.version}>'
+
 class StockAdjustment(db.Model):
     """Model to track stock adjustments for products."""
     __tablename__ = 'stock_adjustments'
@@ -307,11 +379,24 @@ def receive_before_update(mapper, connection, target):
     if hasattr(target, 'updated_at'):
         target.updated_at = get_current_time()
 
+# The catalog counter row exists from the start, so bumping it is a plain UPDATE
+event.listen(CatalogState.__table__, 'after_create',
+             DDL('INSERT INTO catalog_state (id, version, reset_version) VALUES (1, 0, 0)'))
+
 # Add composite indexes for common queries
 Index('idx_sale_date_status', Sale.sale_date, Sale.payment_status)
+Index('idx_sale_date_id', Sale.sale_date, Sale.id)
+# Sales list filters (see services/sale_queries.py)
+Index('idx_sale_method_date', Sale.payment_method, Sale.sale_date, Sale.id)
+Index('idx_sale_customer_date', func.lower(Sale.customer_name), Sale.sale_date, Sale.id)
+# Receivables: only sales with a balance are indexed, oldest first
+Index('idx_sale_outstanding', Sale.sale_date, Sale.id, Sale.balance_due,
+      sqlite_where=text('balance_due > 0'), postgresql_where=text('balance_due > 0'))
 Index('idx_product_category_active', Product.category, Product.is_active)
 Index('idx_stock_history_product_date', StockHistory.product_id, StockHistory.created_at)
 Index('idx_payment_sale_date', Payment.sale_id, Payment.payment_date)
+# A sale's items, in id order (sale views and the sales export)
+Index('idx_sale_item_sale', SaleItem.sale_id, SaleItem.id)
 
 if __name__ == '__main__':
     # This is for testing the models
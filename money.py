@@ -0,0 +1,127 @@
+"""Money stored as integer cents.
+
+Amounts are kept in the database as whole cents (KES minor units) in
+``Money`` columns, so ``SUM()`` and the rollup increments are exact integer
+arithmetic in SQL. The type converts at the edges: Python code and templates
+keep working with shillings as floats, which are rounded half-up to the cent
+on the way in and come back as ``cents / 100``, the float closest to the
+exact amount.
+
+Databases created before the switch stored these columns as floats;
+``migrate_money_columns`` (``flask migrate-money``) converts them in place.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from sqlalchemy import BigInteger, MetaData, Numeric, inspect, text
+from sqlalchemy.schema import CreateTable
+from sqlalchemy.types import TypeDecorator
+
+from extensions import db
+
+CENT = Decimal(1)
+
+
+def to_cents(amount):
+    """Shillings (float, int, Decimal or numeric string) to whole cents, rounding half-up."""
+    if not isinstance(amount, Decimal):
+        # str() gives the shortest repr, so 1.005 rounds as written rather than as 1.00499...
+        amount = Decimal(str(amount))
+    return int(amount.scaleb(2).quantize(CENT, rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    return cents / 100
+
+
+class Money(TypeDecorator):
+    """An amount in shillings stored as integer cents."""
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else to_cents(value)
+
+    def process_literal_param(self, value, dialect):
+        return 'NULL' if value is None else str(to_cents(value))
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else from_cents(value)
+
+
+def money_columns():
+    """``{table: [Money column names]}`` for every mapped table."""
+    return {
+        table: [column.name for column in table.columns if isinstance(column.type, Money)]
+        for table in db.metadata.sorted_tables
+        if any(isinstance(column.type, Money) for column in table.columns)
+    }
+
+
+def pending_money_columns(conn):
+    """Money columns that the database still stores as floating point."""
+    inspector = inspect(conn)
+    pending = {}
+    for table, names in money_columns().items():
+        if not inspector.has_table(table.name):
+            continue
+        stored = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        floats = [name for name in names if isinstance(stored.get(name), Numeric)]
+        if floats:
+            pending[table] = floats
+    return pending
+
+
+def migrate_money_columns():
+    """Convert float money columns of an existing database to integer cents.
+
+    Returns the converted columns as ``table.column`` strings; already
+    converted columns are left alone, so running it twice is harmless.
+    SQLite cannot change a column type, so each affected table is rebuilt
+    (create a copy, move the rows over, drop, rename, recreate indexes) in
+    one transaction; PostgreSQL converts the columns with ``ALTER TABLE``.
+    Other databases raise ``RuntimeError`` before anything is changed.
+    """
+    with db.engine.begin() as conn:
+        pending = pending_money_columns(conn)
+        dialect = conn.dialect.name
+        if pending and dialect not in ('sqlite', 'postgresql'):
+            raise RuntimeError(f'Money columns can only be migrated on SQLite or PostgreSQL, not {dialect}')
+        for table, names in pending.items():
+            if dialect == 'sqlite':
+                _rebuild_sqlite_table(conn, table, names)
+            else:
+                for name in names:
+                    conn.execute(text(
+                        f'ALTER TABLE "{table.name}" ALTER COLUMN "{name}" TYPE BIGINT '
+                        f'USING ROUND("{name}" * 100)::BIGINT'
+                    ))
+    return [f'{table.name}.{name}' for table, names in pending.items() for name in names]
+
+
+def _rebuild_sqlite_table(conn, table, names):
+    inspector = inspect(conn)
+    existing = [column['name'] for column in inspector.get_columns(table.name)]
+    for index in inspector.get_indexes(table.name):
+        conn.execute(text(f'DROP INDEX "{index["name"]}"'))
+
+    # Copy the whole schema so the new table's foreign keys resolve
+    metadata = MetaData()
+    for other in db.metadata.sorted_tables:
+        if other is not table:
+            other.to_metadata(metadata)
+    staging = table.to_metadata(metadata, name=f'_{table.name}_cents')
+    conn.execute(CreateTable(staging))
+
+    columns = [column.name for column in table.columns if column.name in existing]
+    selected = [
+        f'CAST(ROUND("{name}" * 100) AS INTEGER)' if name in names else f'"{name}"'
+        for name in columns
+    ]
+    quoted = ', '.join(f'"{name}"' for name in columns)
+    conn.execute(text(
+        f'INSERT INTO "{staging.name}" ({quoted}) SELECT {", ".join(selected)} FROM "{table.name}"'
+    ))
+    conn.execute(text(f'DROP TABLE "{table.name}"'))
+    conn.execute(text(f'ALTER TABLE "{staging.name}" RENAME TO "{table.name}"'))
+    for index in table.indexes:
+        index.create(conn)
@@ -1,4 +1,7 @@
-from app import app, init_db, db
+from app import create_app, init_db
+from extensions import db
+
+app = create_app('development')
 
 if __name__ == '__main__':
     # Initialize the database
@@ -10,4 +13,4 @@ if __name__ == '__main__':
         init_db()
     
     # Run the application
-    app.run(debug=True, host='0.0.0.0', port=5000) 
\ No newline at end of file
+    app.run(debug=True, host='0.0.0.0', port=5000)
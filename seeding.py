@@ -0,0 +1,298 @@
+"""Synthetic data generator for load testing.
+
+Every column is generated as a numpy array and the rows go into the database
+through chunked Core ``insert()`` executemany calls, skipping the ORM unit of
+work entirely. New rows are appended after the existing ones (ids continue
+from the current maximum), so seeding never drops data; run ``flask init-db``
+first for a clean database.
+
+    flask seed --scale 10 --days 730
+
+At ``--scale 1`` a :class:`SeedPlan` produces 1k products, 100k sales with
+about 300k items and 200k stock history rows; the other tables scale with it.
+"""
+import logging
+import time
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from itertools import repeat
+
+from sqlalchemy import func, insert, select
+
+from extensions import db
+from lazy_imports import np
+from models import (Employee, Expense, Payment, Product, ProductionBatch, Recipe, Sale,
+                    SaleItem, StockHistory, Supplier, User)
+
+logger = logging.getLogger('barkery_system')
+
+CATEGORIES = ['bread', 'cake', 'pastry', 'cookies', 'other']
+UNITS = ['piece', 'loaf', 'dozen', 'kg']
+PAYMENT_METHODS = ['cash', 'mpesa', 'card']
+PAYMENT_METHOD_WEIGHTS = [0.5, 0.35, 0.15]
+ROLES = {
+    'baker': 'production',
+    'sales': 'sales',
+    'cleaning': 'production',
+    'manager': 'management',
+    'inventory_manager': 'inventory',
+    'accountant': 'finance',
+}
+EXPENSE_TYPES = ['rent', 'utilities', 'salaries', 'ingredients', 'maintenance', 'transport']
+STOCK_TYPES = ['addition', 'sale', 'adjustment']
+
+
+@dataclass(frozen=True)
+class SeedPlan:
+    """How many rows to generate for each table."""
+    suppliers: int = 50
+    products: int = 1_000
+    employees: int = 40
+    recipes: int = 200
+    production_batches: int = 20_000
+    sales: int = 100_000
+    items_per_sale: int = 3  # average; each sale gets 1 to 2 * items_per_sale - 1 items
+    expenses: int = 5_000
+    stock_history: int = 200_000
+    days: int = 365
+
+    @classmethod
+    def scaled(cls, scale, **overrides):
+        """The default plan with every row count multiplied by ``scale``."""
+        base = cls()
+        counts = {
+            f.name: max(int(getattr(base, f.name) * scale), 1)
+            for f in fields(cls) if f.name not in ('items_per_sale', 'days')
+        }
+        counts.update({k: v for k, v in overrides.items() if v is not None})
+        return replace(base, **counts)
+
+
+def _next_id(conn, model):
+    return (conn.execute(select(func.max(model.__table__.c.id))).scalar() or 0) + 1
+
+
+def _column_chunk(column, start, stop):
+    if isinstance(column, np.ndarray):
+        return column[start:stop].tolist()
+    return repeat(column, stop - start)
+
+
+def insert_columns(conn, model, columns, chunk_size=50_000):
+    """Insert rows given as {column: array or constant} in executemany chunks."""
+    names = list(columns)
+    size = max(len(c) for c in columns.values() if isinstance(c, np.ndarray))
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        values = [_column_chunk(columns[name], start, stop) for name in names]
+        conn.execute(insert(model.__table__), [dict(zip(names, row)) for row in zip(*values)])
+    return size
+
+
+def _timestamps(rng, count, start, seconds, sort=True):
+    offsets = rng.integers(0, seconds, size=count)
+    if sort:
+        offsets.sort()
+    return (np.datetime64(start, 's') + offsets.astype('timedelta64[s]')).astype('datetime64[us]').astype(object)
+
+
+def _labels(prefix, ids):
+    return np.char.add(prefix, ids.astype(str)).astype(object)
+
+
+def seed_database(plan, random_seed=None, chunk_size=50_000, now=None):
+    """Append ``plan``'s rows to the database of the current app.
+
+    Returns {table name: rows inserted}. The daily sales rollup is rebuilt at
+    the end so dashboard and period totals include the new sales.
+    """
+    from services.catalog import next_catalog_version
+    from services.sales_summary import rebuild_daily_sales_summary
+    from services.search import rebuild_search_index
+
+    rng = np.random.default_rng(random_seed)
+    now = (now or datetime.now(timezone.utc)).replace(tzinfo=None, microsecond=0)
+    start = now - timedelta(days=plan.days)
+    seconds = plan.days * 24 * 3600
+    inserted = {}
+
+    with db.engine.begin() as conn:
+        user_id = conn.execute(select(func.min(User.__table__.c.id))).scalar()
+
+        # Suppliers and products
+        first = _next_id(conn, Supplier)
+        supplier_ids = np.arange(first, first + plan.suppliers)
+        inserted['supplier'] = insert_columns(conn, Supplier, {
+            'id': supplier_ids,
+            'name': _labels('Supplier ', supplier_ids),
+            'phone': _labels('+2547', rng.integers(10_000_000, 99_999_999, plan.suppliers)),
+            'is_active': rng.random(plan.suppliers) < 0.9,
+            'created_at': start,
+            'updated_at': start,
+        }, chunk_size)
+
+        first = _next_id(conn, Product)
+        product_ids = np.arange(first, first + plan.products)
+        prices = np.round(rng.lognormal(mean=5, sigma=0.8, size=plan.products), 2) + 10
+        inserted['product'] = insert_columns(conn, Product, {
+            'id': product_ids,
+            'name': _labels('Product ', product_ids),
+            'price': prices,
+            'category': rng.choice(np.array(CATEGORIES, dtype=object), plan.products),
+            'unit': rng.choice(np.array(UNITS, dtype=object), plan.products),
+            'supplier_id': rng.choice(supplier_ids, plan.products),
+            'stock_quantity': rng.integers(0, 500, plan.products),
+            'minimum_stock_level': 10,
+            'reorder_quantity': 20,
+            'is_active': rng.random(plan.products) < 0.95,
+            'catalog_version': next_catalog_version(conn),
+            'created_at': start,
+            'updated_at': start,
+        }, chunk_size)
+        rebuild_search_index(conn)
+
+        # Staff and production
+        first = _next_id(conn, Employee)
+        employee_ids = np.arange(first, first + plan.employees)
+        roles = rng.choice(np.array(list(ROLES), dtype=object), plan.employees)
+        inserted['employee'] = insert_columns(conn, Employee, {
+            'id': employee_ids,
+            'name': _labels('Employee ', employee_ids),
+            'role': roles,
+            'department': np.array([ROLES[r] for r in roles], dtype=object),
+            'salary': np.round(rng.uniform(15_000, 120_000, plan.employees), -2),
+            'hire_date': np.array([d.date() for d in _timestamps(
+                rng, plan.employees, start - timedelta(days=3 * 365), seconds, sort=False)], dtype=object),
+            'is_active': rng.random(plan.employees) < 0.9,
+            'can_process_sales': roles == 'sales',
+            'can_manage_production': roles == 'baker',
+            'created_at': start,
+            'updated_at': start,
+        }, chunk_size)
+
+        first = _next_id(conn, Recipe)
+        recipe_ids = np.arange(first, first + plan.recipes)
+        inserted['recipe'] = insert_columns(conn, Recipe, {
+            'id': recipe_ids,
+            'name': _labels('Recipe ', recipe_ids),
+            'preparation_time': rng.integers(15, 240, plan.recipes),
+            'yield_quantity': rng.integers(6, 120, plan.recipes),
+            'yield_unit': 'pieces',
+            'is_active': True,
+            'created_at': start,
+            'updated_at': start,
+        }, chunk_size)
+
+        first = _next_id(conn, ProductionBatch)
+        batch_ids = np.arange(first, first + plan.production_batches)
+        batch_start = _timestamps(rng, plan.production_batches, start, seconds)
+        inserted['production_batch'] = insert_columns(conn, ProductionBatch, {
+            'id': batch_ids,
+            'recipe_id': rng.choice(recipe_ids, plan.production_batches),
+            'employee_id': rng.choice(employee_ids, plan.production_batches),
+            'batch_number': _labels('B', batch_ids),
+            'start_time': batch_start,
+            'end_time': batch_start + np.array(
+                [timedelta(hours=h) for h in rng.integers(1, 6, plan.production_batches).tolist()]),
+            'quantity_produced': rng.integers(10, 500, plan.production_batches),
+            'created_at': batch_start,
+        }, chunk_size)
+
+        # Sales, their items and payments. A few products sell far more than
+        # the rest, as in a real shop.
+        first = _next_id(conn, Sale)
+        sale_ids = np.arange(first, first + plan.sales)
+        sale_dates = _timestamps(rng, plan.sales, start, seconds)
+        item_counts = rng.integers(1, 2 * plan.items_per_sale, plan.sales)
+        item_sale_index = np.repeat(np.arange(plan.sales), item_counts)
+        popularity = 1.0 / np.arange(1, plan.products + 1) ** 0.8
+        item_product_index = rng.choice(plan.products, item_sale_index.size, p=popularity / popularity.sum())
+        quantities = rng.integers(1, 6, item_sale_index.size)
+        unit_prices = prices[item_product_index]
+        line_totals = np.round(unit_prices * quantities, 2)
+        sale_totals = np.round(np.bincount(item_sale_index, weights=line_totals, minlength=plan.sales), 2)
+
+        methods = rng.choice(np.array(PAYMENT_METHODS, dtype=object), plan.sales, p=PAYMENT_METHOD_WEIGHTS)
+        paid_share = rng.choice([1.0, 0.5, 0.0], plan.sales, p=[0.85, 0.05, 0.10])
+        paid_share[methods == 'cash'] = 1.0
+        statuses = np.where(paid_share == 1.0, 'completed',
+                            np.where(paid_share > 0, 'partial', 'pending')).astype(object)
+        amounts_paid = np.round(sale_totals * paid_share, 2)
+
+        inserted['sale'] = insert_columns(conn, Sale, {
+            'id': sale_ids,
+            'customer_name': _labels('Customer ', rng.integers(1, max(plan.sales // 20, 2), plan.sales)),
+            'total_amount': sale_totals,
+            'payment_method': methods,
+            'payment_status': statuses,
+            'amount_paid': amounts_paid,
+            'balance_due': np.round(sale_totals - amounts_paid, 2),
+            'sale_date': sale_dates,
+            'created_at': sale_dates,
+            'updated_at': sale_dates,
+        }, chunk_size)
+
+        first = _next_id(conn, SaleItem)
+        inserted['sale_item'] = insert_columns(conn, SaleItem, {
+            'id': np.arange(first, first + item_sale_index.size),
+            'sale_id': sale_ids[item_sale_index],
+            'product_id': product_ids[item_product_index],
+            'quantity': quantities,
+            'unit_price': unit_prices,
+            'total_price': line_totals,
+            'created_at': sale_dates[item_sale_index],
+        }, chunk_size)
+
+        # Cash is settled at the till; other methods get a payment record
+        paid = np.flatnonzero((methods != 'cash') & (paid_share > 0))
+        payment_dates = sale_dates[paid] + np.array(
+            [timedelta(minutes=m) for m in rng.integers(0, 120, paid.size).tolist()])
+        first = _next_id(conn, Payment)
+        payment_ids = np.arange(first, first + paid.size)
+        inserted['payment'] = insert_columns(conn, Payment, {
+            'id': payment_ids,
+            'sale_id': sale_ids[paid],
+            'amount': amounts_paid[paid],
+            'payment_method': methods[paid],
+            'transaction_id': _labels('TX', payment_ids),
+            'payment_date': payment_dates,
+            'status': 'completed',
+            'created_at': payment_dates,
+            'updated_at': payment_dates,
+        }, chunk_size) if paid.size else 0
+
+        # Expenses and stock movements
+        expense_dates = _timestamps(rng, plan.expenses, start, seconds)
+        inserted['expense'] = insert_columns(conn, Expense, {
+            'date': np.array([d.date() for d in expense_dates], dtype=object),
+            'type': rng.choice(np.array(EXPENSE_TYPES, dtype=object), plan.expenses),
+            'amount': np.round(rng.lognormal(mean=8, sigma=1, size=plan.expenses), 2),
+            'description': 'Seeded expense',
+            'created_at': expense_dates,
+        }, chunk_size)
+
+        stock_types = rng.choice(np.array(STOCK_TYPES, dtype=object), plan.stock_history)
+        stock_quantities = rng.integers(1, 50, plan.stock_history)
+        stock_quantities[stock_types != 'addition'] *= -1
+        inserted['stock_history'] = insert_columns(conn, StockHistory, {
+            'product_id': rng.choice(product_ids, plan.stock_history),
+            'quantity': stock_quantities,
+            'type': stock_types,
+            'notes': 'Seeded',
+            'user_id': user_id,
+            'created_at': _timestamps(rng, plan.stock_history, start, seconds),
+        }, chunk_size)
+
+    rebuild_daily_sales_summary(start.date(), now.date())
+    db.session.commit()
+    return inserted
+
+
+def run_seed(plan, random_seed=None, chunk_size=50_000):
+    """Seed the database and log how long it took."""
+    started = time.perf_counter()
+    inserted = seed_database(plan, random_seed, chunk_size)
+    elapsed = time.perf_counter() - started
+    total = sum(inserted.values())
+    logger.info(f"Seeded {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+    return inserted, elapsed
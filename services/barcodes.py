@@ -0,0 +1,60 @@
+"""Barcode and SKU lookups for scanners on the till.
+
+Each worker keeps a ``{code: product_id}`` map of every active product with
+a barcode, so a scan resolves with a dict lookup and one primary-key read.
+The map is tagged with the catalog version it was built at (see
+``services.catalog``) and is never trusted blindly:
+
+* a hit is confirmed against the product it points to, so a code that was
+  moved to another product or a deactivated product falls through;
+* a miss, or a failed confirmation, rebuilds the map only if the catalog
+  version moved since it was built, which is how changes made by other
+  workers reach this one.
+
+Sales move the catalog version too, but they never cause a rebuild on
+their own: only a scan that the current map cannot answer does.
+"""
+from extensions import db
+from models import Product
+from services.catalog import current_version
+
+# (catalog version, {code: product_id}); replaced whole, never mutated
+_codes = (None, {})
+
+
+def _build():
+    version, _ = current_version()
+    mapping = dict(
+        db.session.query(Product.barcode, Product.id)
+        .filter(Product.barcode.isnot(None), Product.is_active.is_(True))
+    )
+    return version, mapping
+
+
+def _confirmed(code, product_id):
+    product = db.session.get(Product, product_id) if product_id is not None else None
+    if product is not None and product.barcode == code and product.is_active:
+        return product
+    return None
+
+
+def find_by_code(code):
+    """The active product with barcode ``code``, or None."""
+    global _codes
+    code = (code or '').strip()
+    if not code:
+        return None
+    version, mapping = _codes
+    product = _confirmed(code, mapping.get(code))
+    if product is not None:
+        return product
+    if version is not None and current_version()[0] == version:
+        return None
+    _codes = version, mapping = _build()
+    return _confirmed(code, mapping.get(code))
+
+
+def clear_code_map():
+    """Drop this worker's map; the next scan rebuilds it."""
+    global _codes
+    _codes = (None, {})
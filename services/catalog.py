@@ -0,0 +1,140 @@
+"""Versioned POS product catalog.
+
+Every committed change to a product stamps it with the next catalog version
+(``catalog_version``), taken from the ``catalog_state.version`` counter.
+The counter is the catalog's ETag, so a till asking ``/api/pos/catalog``
+with ``If-None-Match`` gets a 304 from one primary-key read while nothing
+changed, and a till passing ``?since=<version>`` gets only the products
+stamped after the version it holds.
+
+Versions are taken when the transaction commits, not when the change is
+made: a ``before_commit`` hook bumps the counter and stamps the products
+the transaction changed, then the commit releases the counter row. Versions
+are therefore handed out in commit order, so a till that has seen version
+42 can never miss a change committed later as 41, and the counter row is
+held only for the commit itself rather than for the whole transaction
+(on SQLite the database write lock already serialises writers).
+
+The products to stamp are collected in ``session.info``: an ``after_flush``
+hook records products added or modified through the ORM, and
+``services.stock`` records the rows its bulk stock updates touch. A hard
+delete leaves nothing to stamp, so it also records its version as
+``catalog_state.reset_version``; deltas asked from before it return the
+full catalog instead.
+"""
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import CatalogState, Product
+
+_STATE = CatalogState.__table__
+_STATE_ID = 1
+_CHANGED = 'catalog_changed_products'
+_RESET = 'catalog_reset'
+
+
+def next_catalog_version(executor=None, reset=False):
+    """Bump the catalog counter and return the new version.
+
+    ``executor`` is a Session or Connection (the app session by default);
+    the counter row stays locked until its transaction ends, so call this
+    just before committing. ``reset`` records the version as a hard delete.
+    """
+    executor = executor or db.session
+    values = {'version': _STATE.c.version + 1}
+    if reset:
+        values['reset_version'] = _STATE.c.version + 1
+    version = executor.execute(
+        update(_STATE).where(_STATE.c.id == _STATE_ID).values(values).returning(_STATE.c.version)
+    ).scalar()
+    if version is None:
+        # Databases created before the counter existed
+        version = 1
+        executor.execute(insert(_STATE).values(id=_STATE_ID, version=version, reset_version=version))
+    return version
+
+
+def mark_changed(product_ids, session=None):
+    """Have the products ``product_ids`` stamped when ``session`` (the app session) commits."""
+    session = session or db.session
+    session.info.setdefault(_CHANGED, set()).update(product_ids)
+
+
+def current_version():
+    """``(version, reset_version)`` of the catalog."""
+    row = db.session.execute(
+        select(_STATE.c.version, _STATE.c.reset_version).where(_STATE.c.id == _STATE_ID)
+    ).one_or_none()
+    return (row.version, row.reset_version) if row else (0, 0)
+
+
+def catalog_payload(version, reset_version, since=None):
+    """The catalog as a JSON-ready dict.
+
+    With ``since`` at or after ``reset_version`` only products changed after
+    it are listed, deactivated ones included with ``active: false`` so the
+    till can drop them; otherwise every active product is listed and
+    ``full`` is true.
+    """
+    full = since is None or since < reset_version
+    query = select(Product.id, Product.name, Product.price, Product.stock_quantity,
+                   Product.category, Product.is_active)
+    if full:
+        query = query.where(Product.is_active.is_(True))
+    else:
+        query = query.where(Product.catalog_version > since)
+    return {
+        'version': version,
+        'full': full,
+        'products': [catalog_entry(row) for row in db.session.execute(query.order_by(Product.id))],
+    }
+
+
+def catalog_entry(product):
+    """The catalog fields of a ``Product`` (or a row with its columns)."""
+    return {'id': product.id, 'name': product.name, 'price': product.price, 'stock': product.stock_quantity,
+            'category': product.category, 'active': bool(product.is_active)}
+
+
+def _after_flush(session, flush_context):
+    changed = [
+        obj.id for obj in session.new if isinstance(obj, Product)
+    ] + [
+        obj.id for obj in session.dirty if isinstance(obj, Product) and session.is_modified(obj)
+    ]
+    if changed:
+        mark_changed(changed, session)
+    if any(isinstance(obj, Product) for obj in session.deleted):
+        session.info[_RESET] = True
+
+
+def _before_commit(session):
+    # Savepoint releases fire this too; only the real commit takes a version
+    if session.in_nested_transaction():
+        return
+    # Flush first, so the last changes are recorded before the version is taken
+    session.flush()
+    changed = session.info.pop(_CHANGED, None)
+    reset = session.info.pop(_RESET, False)
+    if not (changed or reset):
+        return
+    version = next_catalog_version(session, reset=reset)
+    if changed:
+        products = Product.__table__
+        session.execute(update(products).where(products.c.id.in_(sorted(changed))).values(catalog_version=version))
+
+
+def _after_transaction_end(session, transaction):
+    # A rolled back transaction stamps nothing
+    if transaction.parent is None:
+        session.info.pop(_CHANGED, None)
+        session.info.pop(_RESET, None)
+
+
+def register_catalog_versioning():
+    """Install the session hooks once per process."""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'before_commit', _before_commit)
+        event.listen(Session, 'after_transaction_end', _after_transaction_end)
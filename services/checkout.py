@@ -0,0 +1,125 @@
+"""Point-of-sale checkout shared by the POS form and the JSON checkout API.
+
+``checkout`` turns a validated cart into a sale: it loads every product in
+one query, takes the whole cart from stock with one conditional update
+(see ``services.stock``), flushes the sale once for its id, writes the
+items and stock ledger rows with one executemany insert each and updates
+the daily rollup. It runs in the caller's write transaction, which the
+caller starts with ``begin_write_transaction`` and commits or rolls back.
+"""
+from collections import namedtuple
+from datetime import datetime, timezone
+import logging
+
+from sqlalchemy import insert
+
+from extensions import db
+from models import Product, Sale, SaleItem, StockHistory
+from services import sales_summary
+from services.stock import take_stock
+
+logger = logging.getLogger('barkery_system')
+
+CartLine = namedtuple('CartLine', 'product_id quantity price')
+
+PAYMENT_METHODS = ('cash', 'mpesa', 'card')
+
+
+class CheckoutError(Exception):
+    """The cart was rejected before any stock was taken."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        super().__init__('; '.join(self.messages))
+
+
+def parse_cart(items):
+    """Validate raw ``{'id', 'quantity', 'price'}`` dicts into ``CartLine``s."""
+    if not items:
+        raise CheckoutError(['No items in the sale'])
+    lines = []
+    for item in items:
+        try:
+            line = CartLine(int(item['id']), int(item['quantity']), float(item['price']))
+        except (KeyError, TypeError, ValueError):
+            logger.error(f"Invalid item data: {item}")
+            raise CheckoutError(['Invalid item data'])
+        if line.quantity <= 0 or line.price < 0:
+            logger.error(f"Invalid item data: {item}")
+            raise CheckoutError(['Invalid item data'])
+        lines.append(line)
+    return lines
+
+
+def checkout(lines, total_amount, customer_name='', payment_method='cash', user_id=None):
+    """Sell ``lines`` and return ``(sale, products)`` with products keyed by id.
+
+    Raises ``CheckoutError`` for unknown products and
+    ``services.stock.InsufficientStock`` when any line is short.
+    """
+    requested = {}
+    for line in lines:
+        requested[line.product_id] = requested.get(line.product_id, 0) + line.quantity
+
+    # Load the whole cart in one query, holding the product row locks (FOR
+    # UPDATE; SQLite already holds the write lock) until the sale commits
+    products = {
+        product.id: product
+        for product in Product.query.filter(Product.id.in_(requested)).with_for_update()
+    }
+    missing = [product_id for product_id in requested if product_id not in products]
+    if missing:
+        for product_id in missing:
+            logger.error(f"Product not found: {product_id}")
+        raise CheckoutError([f"Product with ID {product_id} not found" for product_id in missing])
+
+    # Take the whole cart in one conditional UPDATE
+    take_stock(requested)
+
+    sale = Sale(
+        customer_name=customer_name,
+        total_amount=total_amount,
+        payment_method=payment_method,
+        sale_date=datetime.now(timezone.utc),
+        payment_status='completed' if payment_method == 'cash' else 'pending'
+    )
+    db.session.add(sale)
+    # One flush assigns the sale id the items and ledger rows refer to
+    db.session.flush()
+    insert_sale_lines([(sale.id, lines, f'Sale #{sale.id}')], user_id)
+    db.session.expire(sale, ['items'])
+
+    sales_summary.record_sale(sale)
+    return sale, products
+
+
+def insert_sale_lines(sales, user_id=None):
+    """Write the items and stock ledger rows of already flushed sales.
+
+    ``sales`` is a list of ``(sale_id, lines, notes)``; all items go in with
+    one executemany insert and all ledger rows with another, bypassing the
+    ORM unit of work. Stock itself is moved separately with ``take_stock``.
+    """
+    now = datetime.now(timezone.utc)
+    items, history = [], []
+    for sale_id, lines, notes in sales:
+        for line in lines:
+            items.append({
+                'sale_id': sale_id,
+                'product_id': line.product_id,
+                'quantity': line.quantity,
+                'unit_price': line.price,
+                'total_price': line.price * line.quantity,
+                'created_at': now,
+            })
+            history.append({
+                'product_id': line.product_id,
+                'quantity': -line.quantity,
+                'type': 'sale',
+                'notes': notes,
+                'user_id': user_id,
+                'created_at': now,
+            })
+    if items:
+        db.session.execute(insert(SaleItem.__table__), items)
+        db.session.execute(insert(StockHistory.__table__), history)
@@ -0,0 +1,151 @@
+"""Cached dashboard metrics.
+
+Metrics are cached under a key that includes a data version token. The token
+lives in the shared cache tier and is replaced by an ``after_commit`` session
+hook whenever a commit touched ``Sale``, ``Product``, ``StockHistory``,
+``Payment`` or ``DailySalesSummary`` rows, so every gunicorn worker stops using
+the old metrics as soon as the commit lands. Routes no longer need to
+invalidate anything by hand.
+
+Revenue figures come from the daily sales rollup (``services.sales_summary``),
+so a month costs at most a few dozen summary rows however many sales it had.
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import chain
+
+from flask import has_app_context
+from sqlalchemy import case, event, func
+from sqlalchemy.orm import Session
+
+from extensions import db, cache
+from models import DailySalesSummary, Product, Sale, StockHistory, Payment
+
+WATCHED_MODELS = (Sale, Product, StockHistory, Payment, DailySalesSummary)
+WATCHED_TABLES = {model.__table__.name for model in WATCHED_MODELS}
+
+VERSION_KEY = 'dashboard:version'
+METRICS_TIMEOUT = 300  # seconds; also bounds staleness from writes outside the ORM
+_DIRTY_FLAG = 'dashboard_metrics_dirty'
+
+
+def _shared_cache():
+    """The cache tier shared by all workers (skips the per-worker L1)."""
+    backend = cache.cache
+    return getattr(backend, 'shared', backend)
+
+
+def data_version():
+    shared = _shared_cache()
+    version = shared.get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        if not shared.add(VERSION_KEY, version, timeout=0):
+            version = shared.get(VERSION_KEY) or version
+    return version
+
+
+def invalidate_dashboard_metrics():
+    """Make every worker recompute the metrics on its next dashboard load."""
+    _shared_cache().set(VERSION_KEY, uuid.uuid4().hex, timeout=0)
+
+
+@dataclass(frozen=True)
+class DashboardMetrics:
+    total_products: int
+    active_products: int
+    today_revenue: float
+    today_transactions: int
+    month_revenue: float
+    month_transactions: int
+
+
+def month_range(day):
+    """Half-open [start, end) date range covering the month of ``day``."""
+    start = day.replace(day=1)
+    if start.month == 12:
+        end = start.replace(year=start.year + 1, month=1)
+    else:
+        end = start.replace(month=start.month + 1)
+    return start, end
+
+
+def compute_dashboard_metrics(today):
+    month_start, month_end = month_range(today)
+    is_today = DailySalesSummary.summary_date == today
+
+    # At most (days in month x payment methods) rollup rows; today's figures
+    # are conditional aggregates over the same rows
+    month_transactions, month_revenue, today_transactions, today_revenue = db.session.query(
+        func.coalesce(func.sum(DailySalesSummary.transactions), 0),
+        func.coalesce(func.sum(DailySalesSummary.revenue), 0),
+        func.coalesce(func.sum(case((is_today, DailySalesSummary.transactions), else_=0)), 0),
+        func.coalesce(func.sum(case((is_today, DailySalesSummary.revenue), else_=0)), 0),
+    ).filter(
+        DailySalesSummary.summary_date >= month_start,
+        DailySalesSummary.summary_date < month_end,
+    ).one()
+
+    total_products, active_products = db.session.query(
+        func.count(Product.id),
+        func.coalesce(func.sum(case((Product.is_active.is_(True), 1), else_=0)), 0),
+    ).one()
+
+    return DashboardMetrics(
+        total_products=total_products,
+        active_products=active_products,
+        today_revenue=float(today_revenue),
+        today_transactions=today_transactions,
+        month_revenue=float(month_revenue),
+        month_transactions=month_transactions,
+    )
+
+
+def get_dashboard_metrics(today=None):
+    """Return the dashboard metrics, computing them at most once per data version."""
+    today = today or datetime.now(timezone.utc).date()
+    key = f'dashboard:metrics:{data_version()}:{today.isoformat()}'
+    metrics = cache.get(key)
+    if metrics is None:
+        metrics = compute_dashboard_metrics(today)
+        cache.set(key, metrics, timeout=METRICS_TIMEOUT)
+    return metrics
+
+
+# Session hooks: remember whether a transaction touched watched rows and
+# invalidate once it commits.
+
+def _after_flush(session, flush_context):
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, WATCHED_MODELS):
+            session.info[_DIRTY_FLAG] = True
+            return
+
+
+def _do_orm_execute(orm_execute_state):
+    # Bulk UPDATE/DELETE and Core inserts run through the session bypass the flush
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is not None and table.name in WATCHED_TABLES:
+        orm_execute_state.session.info[_DIRTY_FLAG] = True
+
+
+def _after_commit(session):
+    if session.info.pop(_DIRTY_FLAG, False) and has_app_context():
+        invalidate_dashboard_metrics()
+
+
+def _after_rollback(session):
+    session.info.pop(_DIRTY_FLAG, None)
+
+
+def register_cache_invalidation():
+    """Install the session hooks once per process."""
+    for name, listener in (('after_flush', _after_flush),
+                           ('do_orm_execute', _do_orm_execute),
+                           ('after_commit', _after_commit),
+                           ('after_rollback', _after_rollback)):
+        if not event.contains(Session, name, listener):
+            event.listen(Session, name, listener)
@@ -0,0 +1,77 @@
+"""Idempotency keys for API writes.
+
+A till that loses its connection after posting a checkout cannot tell
+whether the sale went through, so it retries with the same
+``Idempotency-Key`` header. The first successful response is stored under
+that key in the same transaction as the sale, and later requests with the
+key get the stored response back instead of selling the cart again.
+
+Keys expire after ``IDEMPOTENCY_KEY_TTL_HOURS``; expired keys are ignored
+and can be deleted with ``flask purge-idempotency-keys``. A key reused
+with a different request body is rejected with ``IdempotencyKeyReused``.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import delete
+
+from extensions import db
+from models import IdempotencyKey
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyKeyReused(Exception):
+    """The key was already used for a different request."""
+
+
+def _utcnow():
+    # Stored naive, in UTC, so comparisons behave the same on every backend
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def request_fingerprint(*parts):
+    """Hash of the JSON-serialisable ``parts`` that identify a request."""
+    payload = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def find_response(key, fingerprint):
+    """Return ``(status, body)`` stored for ``key``, or None if there is none.
+
+    An expired key is deleted so the request can run again under it.
+    """
+    record = db.session.get(IdempotencyKey, key)
+    if record is None:
+        return None
+    if record.expires_at <= _utcnow():
+        db.session.delete(record)
+        db.session.flush()
+        return None
+    if record.request_hash != fingerprint:
+        raise IdempotencyKeyReused(key)
+    return record.response_status, json.loads(record.response_body)
+
+
+def save_response(key, fingerprint, status, body):
+    """Store the response for ``key`` in the current transaction."""
+    now = _utcnow()
+    db.session.add(IdempotencyKey(
+        key=key,
+        request_hash=fingerprint,
+        response_status=status,
+        response_body=json.dumps(body),
+        created_at=now,
+        expires_at=now + timedelta(hours=current_app.config['IDEMPOTENCY_KEY_TTL_HOURS']),
+    ))
+    db.session.flush()
+
+
+def purge_expired(now=None):
+    """Delete expired keys and return how many were removed. The caller commits."""
+    result = db.session.execute(
+        delete(IdempotencyKey).where(IdempotencyKey.expires_at <= (now or _utcnow()))
+    )
+    return result.rowcount
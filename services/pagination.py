@@ -0,0 +1,91 @@
+"""Keyset (cursor) pagination.
+
+Pages are cut on a unique sort key, ``(sort column, id)``, instead of an
+``OFFSET``: the next page is the rows that sort after the last row shown,
+so every page is an index range scan of ``per_page + 1`` rows and page
+1000 costs the same as page 1. Rows inserted or deleted while a user pages
+never shift later pages.
+
+Cursors are opaque URL-safe strings holding the key of the row a page
+starts or ends at. ``after`` asks for the page following a cursor (older
+rows, for a newest-first list) and ``before`` for the page preceding it.
+"""
+import base64
+from collections import namedtuple
+from datetime import datetime
+import json
+
+from sqlalchemy import DateTime, literal, tuple_
+
+from extensions import db
+
+KeysetPage = namedtuple('KeysetPage', 'items next_cursor prev_cursor')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_column, value, row_id):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = json.dumps([sort_column.key, value, row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor, sort_column):
+    """``(value, row_id)`` from ``cursor``, which must have been cut on ``sort_column``."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        # A cursor from a list sorted another way cannot be compared with this one
+        if key != sort_column.key or not isinstance(row_id, int):
+            raise ValueError(cursor)
+        if isinstance(sort_column.type, DateTime) and value is not None:
+            value = datetime.fromisoformat(value)
+        elif isinstance(value, str):
+            raise ValueError(cursor)
+    except (ValueError, TypeError):
+        raise InvalidCursor(f'Invalid cursor: {cursor}') from None
+    return value, row_id
+
+
+def keyset_paginate(query, sort_column, id_column, per_page, after=None, before=None, descending=True):
+    """One page of ``query`` ordered by ``(sort_column, id_column)``.
+
+    ``query`` is an ORM ``select()`` without ordering or limits. Returns a
+    ``KeysetPage`` with the rows in display order and the cursors of the
+    neighbouring pages (None at either end). Raises ``InvalidCursor`` for a
+    malformed cursor.
+    """
+    key = tuple_(sort_column, id_column)
+    # Walking backwards (towards the start of the list) flips the order
+    backwards = bool(before)
+    cursor = decode_cursor(before if backwards else after, sort_column) if (after or before) else None
+    ascending = descending == backwards
+    if cursor is not None:
+        # Typed binds, so the cursor compares exactly as the stored values do
+        bound = tuple_(literal(cursor[0], sort_column.type), literal(cursor[1], id_column.type))
+        query = query.where(key > bound if ascending else key < bound)
+    order = (sort_column.asc(), id_column.asc()) if ascending else (sort_column.desc(), id_column.desc())
+    rows = db.session.scalars(query.order_by(*order).limit(per_page + 1)).all()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backwards:
+        rows.reverse()
+    if not rows:
+        # Past either end (the rows around the cursor were deleted): offer the way back
+        return KeysetPage([], before if backwards else None, None if backwards else after)
+
+    def cursor_of(row):
+        return encode_cursor(sort_column, getattr(row, sort_column.key), getattr(row, id_column.key))
+
+    has_next = more if not backwards else True
+    has_prev = more if backwards else cursor is not None
+    return KeysetPage(
+        rows,
+        cursor_of(rows[-1]) if has_next else None,
+        cursor_of(rows[0]) if has_prev else None,
+    )
+
@@ -0,0 +1,182 @@
+"""Batch ingestion of sales queued by tills while they were offline.
+
+Each queued sale carries a ``client_uuid`` generated on the till and the
+time it was rung up. ``sync_sales`` ingests a whole batch in the caller's
+write transaction with a fixed number of statements, however many sales it
+holds:
+
+* sales whose ``client_uuid`` is already stored (or repeated in the batch)
+  are reported as duplicates with the id of the stored sale, so a till can
+  resend a batch whose response it never received; a repeat of a sale
+  rejected earlier in the batch is rejected the same way;
+* the remaining sales are checked, oldest first, against the stock of
+  their products, read with one query; a sale that would take a product
+  below zero is rejected with its shortfalls and the rest go through;
+* the accepted sales, their items and stock history rows are written with
+  executemany inserts, stock is taken with one conditional update and the
+  daily rollup gets one upsert per (day, payment method).
+"""
+from collections import namedtuple
+from datetime import datetime, timezone
+import uuid
+
+from sqlalchemy import insert
+
+from extensions import db
+from models import Product, Sale
+from services import sales_summary
+from services.checkout import PAYMENT_METHODS, CheckoutError, insert_sale_lines, parse_cart
+from services.stock import take_stock
+
+QueuedSale = namedtuple('QueuedSale', 'index client_uuid sale_date lines total_amount customer_name payment_method')
+
+
+def _result(client_uuid, status, sale_id=None, **extra):
+    return {'client_uuid': client_uuid, 'status': status, 'sale_id': sale_id, **extra}
+
+
+def _parse_timestamp(value):
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise CheckoutError(['Invalid sale_date'])
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+
+def parse_queued_sale(index, entry):
+    """Validate one queued sale dict into a ``QueuedSale``."""
+    if not isinstance(entry, dict):
+        raise CheckoutError(['Sale must be a JSON object'])
+    try:
+        client_uuid = str(uuid.UUID(str(entry['client_uuid'])))
+    except (KeyError, ValueError):
+        raise CheckoutError(['Missing or invalid client_uuid'])
+    lines = parse_cart(entry.get('items'))
+    try:
+        total_amount = float(entry.get('total_amount', sum(line.price * line.quantity for line in lines)))
+    except (TypeError, ValueError):
+        raise CheckoutError(['Invalid total amount'])
+    payment_method = entry.get('payment_method') or 'cash'
+    if payment_method not in PAYMENT_METHODS:
+        raise CheckoutError([f'Invalid payment method: {payment_method}'])
+    return QueuedSale(index, client_uuid, _parse_timestamp(entry.get('sale_date')), lines,
+                      total_amount, entry.get('customer_name') or '', payment_method)
+
+
+def sync_sales(entries, user_id=None):
+    """Ingest ``entries`` (queued sale dicts) and return one result dict per entry.
+
+    Results keep the order of ``entries``; their ``status`` is ``created``,
+    ``duplicate`` or ``rejected`` (with ``errors`` and, for stock, ``shortfalls``).
+    The caller starts the write transaction and commits.
+    """
+    results = [None] * len(entries)
+    queued = []
+    for index, entry in enumerate(entries):
+        try:
+            queued.append(parse_queued_sale(index, entry))
+        except CheckoutError as e:
+            client_uuid = entry.get('client_uuid') if isinstance(entry, dict) else None
+            results[index] = _result(client_uuid, 'rejected', errors=e.messages)
+
+    # Drop sales that were already ingested, by an earlier sync or earlier in this batch
+    stored = dict(
+        db.session.query(Sale.client_uuid, Sale.id)
+        .filter(Sale.client_uuid.in_({sale.client_uuid for sale in queued}))
+    ) if queued else {}
+    fresh, repeats, first = [], [], {}
+    for sale in queued:
+        if sale.client_uuid in stored:
+            results[sale.index] = _result(sale.client_uuid, 'duplicate', stored[sale.client_uuid])
+        elif sale.client_uuid in first:
+            repeats.append(sale)
+        else:
+            first[sale.client_uuid] = sale.index
+            fresh.append(sale)
+
+    # Accept sales oldest first while their products have stock left
+    product_ids = {line.product_id for sale in fresh for line in sale.lines}
+    products = {
+        product.id: product
+        for product in Product.query.filter(Product.id.in_(product_ids)).with_for_update()
+    } if product_ids else {}
+    available = {product_id: product.stock_quantity for product_id, product in products.items()}
+    accepted, taken = [], {}
+    for sale in sorted(fresh, key=lambda s: s.sale_date):
+        requested = {}
+        for line in sale.lines:
+            requested[line.product_id] = requested.get(line.product_id, 0) + line.quantity
+        missing = [product_id for product_id in requested if product_id not in products]
+        if missing:
+            results[sale.index] = _result(sale.client_uuid, 'rejected', errors=[
+                f"Product with ID {product_id} not found" for product_id in missing])
+            continue
+        shortfalls = [
+            {'product_id': product_id, 'name': products[product_id].name,
+             'requested': quantity, 'available': available[product_id]}
+            for product_id, quantity in requested.items() if quantity > available[product_id]
+        ]
+        if shortfalls:
+            results[sale.index] = _result(sale.client_uuid, 'rejected',
+                                          errors=['Insufficient stock'], shortfalls=shortfalls)
+            continue
+        for product_id, quantity in requested.items():
+            available[product_id] -= quantity
+            taken[product_id] = taken.get(product_id, 0) + quantity
+        accepted.append(sale)
+
+    if accepted:
+        # The rows are locked, so this cannot fall short
+        take_stock(taken)
+        sale_ids = _insert_sales(accepted, user_id)
+        for sale, sale_id in zip(accepted, sale_ids):
+            results[sale.index] = _result(sale.client_uuid, 'created', sale_id)
+            stored[sale.client_uuid] = sale_id
+
+    # A repeat gets the outcome of its first copy: a duplicate of the stored sale, or the same rejection
+    for sale in repeats:
+        if sale.client_uuid in stored:
+            results[sale.index] = _result(sale.client_uuid, 'duplicate', stored[sale.client_uuid])
+        else:
+            results[sale.index] = dict(results[first[sale.client_uuid]])
+    return results
+
+
+def _insert_sales(accepted, user_id):
+    now = datetime.now(timezone.utc)
+    statuses = ['completed' if sale.payment_method == 'cash' else 'pending' for sale in accepted]
+    # RETURNING order is not guaranteed for multi-row inserts, so map ids back by uuid
+    table = Sale.__table__
+    inserted = dict(db.session.execute(
+        insert(table).returning(table.c.client_uuid, table.c.id),
+        [{
+            'client_uuid': sale.client_uuid,
+            'customer_name': sale.customer_name,
+            'total_amount': sale.total_amount,
+            'payment_method': sale.payment_method,
+            'payment_status': status,
+            'sale_date': sale.sale_date,
+            'created_at': now,
+            'updated_at': now,
+        } for sale, status in zip(accepted, statuses)],
+    ).all())
+    sale_ids = [inserted[sale.client_uuid] for sale in accepted]
+
+    insert_sale_lines([
+        (sale_id, sale.lines, f'Sale #{sale_id} (offline {sale.client_uuid})')
+        for sale, sale_id in zip(accepted, sale_ids)
+    ], user_id)
+    sales_summary.apply_contributions(added=[
+        sales_summary.SaleContribution(
+            summary_date=sale.sale_date.date(),
+            payment_method=sale.payment_method,
+            revenue=sale.total_amount,
+            transactions=1,
+            items_sold=sum(line.quantity for line in sale.lines),
+            amount_paid=sale.total_amount if status == 'completed' else 0.0,
+        )
+        for sale, status in zip(accepted, statuses)
+    ])
+    return sale_ids
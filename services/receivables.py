@@ -0,0 +1,127 @@
+"""What each sale has been paid, and what is still owed.
+
+``Sale.amount_paid`` and ``Sale.balance_due`` are stored on the sale so the
+receivables view reads them from ``idx_sale_outstanding``, a partial index
+holding only the sales with a balance, instead of summing every sale's
+payments. A sale's amount paid is the sum of its completed payments or,
+while it has no payment records, its total when it is marked completed
+(a sale settled at the till) — the rule ``services/sales_summary.py``
+uses for the daily rollup.
+
+New sales get their amounts from the column defaults. After that a session
+hook recomputes them in SQL, in the flush that writes the change, for every
+sale whose payments were added, changed or deleted or whose total or
+status changed, so they commit or roll back with it. The sale rows are
+locked first (``SELECT ... FOR UPDATE``; SQLite already holds the write
+lock), so concurrent payments on one sale cannot each sum without the
+other's. Code that writes payments with Core statements calls
+``rebuild_sale_balances``.
+"""
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+
+from sqlalchemy import case, event, exists, func, inspect, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from extensions import db
+from models import Payment, Sale
+
+# A literal rather than a bound 0, so SQLite can match it to the partial index
+OUTSTANDING = Sale.balance_due > literal_column('0')
+
+_PAYMENT_CHANGES = ('sale_id', 'amount', 'status')
+_SALE_CHANGES = ('total_amount', 'payment_status')
+
+
+def _amount_paid():
+    completed = (
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.sale_id == Sale.id, Payment.status == 'completed')
+        .scalar_subquery()
+    )
+    return case(
+        (exists().where(Payment.sale_id == Sale.id), completed),
+        (Sale.payment_status == 'completed', Sale.total_amount),
+        else_=0,
+    )
+
+
+def rebuild_sale_balances(sale_ids=None, executor=None):
+    """Recompute ``amount_paid`` and ``balance_due`` of ``sale_ids`` (all sales if None).
+
+    Runs on ``executor`` (a session or connection, by default the current
+    session); the caller commits. Returns the number of sales updated.
+    """
+    executor = executor if executor is not None else db.session
+    table = Sale.__table__
+    stmt = update(table)
+    if sale_ids is not None:
+        if not sale_ids:
+            return 0
+        sale_ids = sorted(sale_ids)
+        # Lock the sales, so the sums below see payments committed while waiting
+        executor.execute(select(table.c.id).where(table.c.id.in_(sale_ids)).with_for_update())
+        stmt = stmt.where(table.c.id.in_(sale_ids))
+    amount_paid = _amount_paid()
+    return executor.execute(stmt.values(
+        amount_paid=amount_paid, balance_due=table.c.total_amount - amount_paid
+    )).rowcount
+
+
+def settled_status(sale):
+    """The payment status ``sale``'s stored amounts call for."""
+    if sale.balance_due <= 0:
+        return 'completed'
+    return 'partial' if sale.amount_paid > 0 else 'pending'
+
+
+def _changed(obj, names):
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in names)
+
+
+def _after_flush(session, flush_context):
+    sale_ids = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Payment) and (obj not in session.dirty or _changed(obj, _PAYMENT_CHANGES)):
+            sale_ids.add(obj.sale_id)
+            # A payment moved to another sale changes both
+            sale_ids.update(inspect(obj).attrs.sale_id.history.deleted)
+        elif isinstance(obj, Sale) and obj in session.dirty and _changed(obj, _SALE_CHANGES):
+            sale_ids.add(obj.id)
+    sale_ids.discard(None)
+    sale_ids.difference_update(obj.id for obj in session.deleted if isinstance(obj, Sale))
+    if sale_ids:
+        rebuild_sale_balances(sale_ids, session.connection())
+        session.info.setdefault('stale_sale_balances', set()).update(sale_ids)
+
+
+def _after_flush_postexec(session, flush_context):
+    # The UPDATE bypassed the loaded sales; reload their amounts on next access
+    for sale_id in session.info.pop('stale_sale_balances', ()):
+        sale = session.identity_map.get(inspect(Sale).identity_key_from_primary_key((sale_id,)))
+        if sale is not None:
+            session.expire(sale, ['amount_paid', 'balance_due', 'updated_at'])
+
+
+def register_balance_tracking():
+    """Install the session hooks once per process."""
+    if not event.contains(Session, 'after_flush', _after_flush):
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'after_flush_postexec', _after_flush_postexec)
+
+
+def receivables_summary(overdue_days):
+    """``(sales, outstanding, overdue)`` over the sales with a balance.
+
+    ``overdue`` is the part owed on sales older than ``overdue_days`` days.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=overdue_days)
+    count, outstanding, overdue = db.session.execute(
+        select(
+            func.count(Sale.id),
+            func.coalesce(func.sum(Sale.balance_due), 0),
+            func.coalesce(func.sum(case((Sale.sale_date < cutoff, Sale.balance_due), else_=0)), 0),
+        ).where(OUTSTANDING)
+    ).one()
+    return count, outstanding, overdue
@@ -0,0 +1,114 @@
+"""Loading sales together with what their views walk.
+
+The sale views loop over ``sale.items`` and then ``item.product`` (and
+``sale.payments``); left to lazy loading that is one query for the items
+plus one per line. Views instead load the sale through ``get_sale_or_404``
+with the named loader options they need, which keeps the number of
+queries fixed however many lines a sale has:
+
+* ``ITEMS_WITH_PRODUCTS``: one ``SELECT ... WHERE sale_id IN (...)`` for
+  the items, with their products joined in;
+* ``PAYMENTS``: one ``SELECT ... WHERE sale_id IN (...)`` for the payments.
+
+``filter_sales`` narrows a sales query by the filters of the sales list and
+``/api/sales``. Each filter is shaped to use an index: the date range
+``idx_sale_date_status`` (or the date column of the two below), the
+payment method ``idx_sale_method_date`` and the customer, a
+case-insensitive prefix turned into a range on ``lower(customer_name)``,
+``idx_sale_customer_date``.
+"""
+from datetime import date, datetime, time, timedelta
+import sys
+
+from flask import abort
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from extensions import db
+from models import Sale, SaleItem
+
+# sort option -> (sort column, descending)
+SALE_SORTS = {
+    'newest': (Sale.sale_date, True),
+    'oldest': (Sale.sale_date, False),
+    'largest': (Sale.total_amount, True),
+    'smallest': (Sale.total_amount, False),
+}
+DEFAULT_SALE_SORT = 'newest'
+SALE_FILTERS = ('date_from', 'date_to', 'payment_status', 'payment_method', 'customer')
+
+ITEMS_WITH_PRODUCTS = selectinload(Sale.items).joinedload(SaleItem.product)
+PAYMENTS = selectinload(Sale.payments)
+
+
+def sale_query(*options):
+    """``select(Sale)`` with ``options`` applied."""
+    return select(Sale).options(*options)
+
+
+def get_sale_or_404(sale_id, *options):
+    """The sale with ``options`` applied, or a 404."""
+    sale = db.session.scalars(sale_query(*options).where(Sale.id == sale_id)).first()
+    if sale is None:
+        abort(404)
+    return sale
+
+
+class InvalidSaleFilter(ValueError):
+    pass
+
+
+def _parse_date(name, value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise InvalidSaleFilter(f'{name} must be a date (YYYY-MM-DD)') from None
+
+
+def sale_filters(args):
+    """The non-empty sales filters and sort option in ``args`` (request args), as strings."""
+    filters = {name: args.get(name, '').strip() for name in SALE_FILTERS + ('sort',)}
+    return {name: value for name, value in filters.items() if value}
+
+
+def _prefix_upper_bound(prefix):
+    """The smallest string above every string starting with ``prefix``, or None if none is."""
+    # The last code point cannot be incremented; drop it and increment the one before
+    prefix = prefix.rstrip(chr(sys.maxunicode))
+    if not prefix:
+        return None
+    following = ord(prefix[-1]) + 1
+    if 0xD800 <= following <= 0xDFFF:
+        # Surrogates are not characters the database can store
+        following = 0xE000
+    return prefix[:-1] + chr(following)
+
+
+def filter_sales(query, filters):
+    """Apply ``filters`` (from ``sale_filters``) to ``query``.
+
+    Returns ``(query, sort column, descending)``; raises ``InvalidSaleFilter``.
+    """
+    if 'date_from' in filters:
+        start = _parse_date('date_from', filters['date_from'])
+        query = query.where(Sale.sale_date >= datetime.combine(start, time.min))
+    if 'date_to' in filters:
+        end = _parse_date('date_to', filters['date_to'])
+        query = query.where(Sale.sale_date < datetime.combine(end + timedelta(days=1), time.min))
+    if 'payment_status' in filters:
+        query = query.where(Sale.payment_status == filters['payment_status'])
+    if 'payment_method' in filters:
+        query = query.where(Sale.payment_method == filters['payment_method'])
+    if 'customer' in filters:
+        prefix = filters['customer'].lower()
+        # A range rather than LIKE, so the expression index can serve it
+        upper = _prefix_upper_bound(prefix)
+        customer = func.lower(Sale.customer_name)
+        query = query.where(customer >= prefix)
+        if upper is not None:
+            query = query.where(customer < upper)
+    sort = filters.get('sort', DEFAULT_SALE_SORT)
+    if sort not in SALE_SORTS:
+        raise InvalidSaleFilter(f"sort must be one of {', '.join(SALE_SORTS)}")
+    sort_column, descending = SALE_SORTS[sort]
+    return query, sort_column, descending
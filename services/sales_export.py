@@ -0,0 +1,105 @@
+"""Streaming sales exports.
+
+``/sales/export`` writes the sales matching the sales list filters (usually
+a date range) together with their lines, as CSV (one row per sale item) or
+NDJSON (one object per sale, its items nested). Nothing is built up front:
+the header goes out before the query runs, then rows come off the cursor
+``EXPORT_BATCH_SIZE`` at a time (``yield_per``) and are formatted and handed
+to the response as they arrive, so memory stays flat however many rows the
+range holds.
+
+The rows are read in ``(sale_date, sale.id, item id)`` order, which
+``idx_sale_date_id`` and ``idx_sale_item_sale`` produce without a sort, so
+the first rows are ready as soon as the scan starts and the lines of a sale
+are always adjacent.
+"""
+import csv
+from itertools import groupby
+import json
+from operator import attrgetter
+
+from sqlalchemy import select
+
+from extensions import db
+from models import Product, Sale, SaleItem
+from services.sale_queries import filter_sales
+
+EXPORT_FORMATS = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+# Rows fetched from the cursor at a time, and rows (CSV) or sales (NDJSON) per chunk written
+EXPORT_BATCH_SIZE = 1000
+
+SALE_COLUMNS = ('sale_id', 'sale_date', 'customer_name', 'payment_method', 'payment_status', 'total_amount',
+                'amount_paid', 'balance_due')
+ITEM_COLUMNS = ('item_id', 'product_id', 'product_name', 'quantity', 'unit_price', 'total_price')
+
+
+class _Line:
+    """A file that hands back what is written to it, so ``csv.writer`` formats without buffering."""
+
+    def write(self, value):
+        return value
+
+
+def export_query(filters):
+    """The sales matching ``filters`` (from ``sale_filters``) joined to their items.
+
+    One row per item (a sale without items gives one row with the item
+    columns None). Raises ``InvalidSaleFilter``.
+    """
+    query = (
+        select(
+            Sale.id.label('sale_id'), Sale.sale_date, Sale.customer_name, Sale.payment_method,
+            Sale.payment_status, Sale.total_amount, Sale.amount_paid, Sale.balance_due,
+            SaleItem.id.label('item_id'), SaleItem.product_id, Product.name.label('product_name'),
+            SaleItem.quantity, SaleItem.unit_price, SaleItem.total_price,
+        )
+        .select_from(Sale)
+        .outerjoin(SaleItem, SaleItem.sale_id == Sale.id)
+        .outerjoin(Product, Product.id == SaleItem.product_id)
+    )
+    # The export always runs oldest first, whatever the list was sorted by
+    query, _, _ = filter_sales(query, {name: value for name, value in filters.items() if name != 'sort'})
+    return query.order_by(Sale.sale_date, Sale.id, SaleItem.id)
+
+
+def _stream(query):
+    return db.session.execute(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+
+def _money(value):
+    return None if value is None else f'{value:.2f}'
+
+
+def csv_lines(query):
+    """CSV text for ``query`` (from ``export_query``): the header, then chunks of rows."""
+    writer = csv.writer(_Line())
+    yield writer.writerow(SALE_COLUMNS + ITEM_COLUMNS)
+    for batch in _stream(query).partitions():
+        yield ''.join(writer.writerow((
+            row.sale_id, row.sale_date.isoformat() if row.sale_date else None, row.customer_name,
+            row.payment_method, row.payment_status, _money(row.total_amount),
+            _money(row.amount_paid), _money(row.balance_due),
+            row.item_id, row.product_id, row.product_name, row.quantity,
+            _money(row.unit_price), _money(row.total_price),
+        )) for row in batch)
+
+
+def ndjson_lines(query):
+    """NDJSON for ``query`` (from ``export_query``): one object per sale, its ``items`` nested."""
+    chunk, started = [], False
+    for _, lines in groupby(_stream(query), key=attrgetter('sale_id')):
+        first = next(lines)
+        sale = {name: getattr(first, name) for name in SALE_COLUMNS}
+        sale['sale_date'] = first.sale_date.isoformat() if first.sale_date else None
+        sale['items'] = [
+            {'id': line.item_id, 'product_id': line.product_id, 'product_name': line.product_name,
+             'quantity': line.quantity, 'unit_price': line.unit_price, 'total_price': line.total_price}
+            for line in ([first] if first.item_id is not None else []) + list(lines)
+        ]
+        chunk.append(json.dumps(sale, separators=(',', ':')) + '\n')
+        # The first sale goes out on its own, so the client sees data straight away
+        if len(chunk) >= EXPORT_BATCH_SIZE or not started:
+            yield ''.join(chunk)
+            chunk, started = [], True
+    if chunk:
+        yield ''.join(chunk)
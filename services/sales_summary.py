@@ -0,0 +1,200 @@
+"""Daily sales rollup.
+
+``DailySalesSummary`` holds one row per (day, payment method) with revenue,
+transaction count, items sold and amount paid. The sales routes apply each
+sale's contribution inside their own transaction, so the rollup commits or
+rolls back together with the sale, and period reports read O(days) rows
+instead of O(sales).
+
+A sale contributes to the row of its ``sale_date`` day and payment method.
+Its amount paid is the sum of its completed payments or, when it has no
+payment records (cash sales settled at the till), its total if the sale is
+marked completed. ``rebuild_daily_sales_summary`` applies the same rules in
+SQL to backfill or repair the table.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from extensions import db
+from models import DailySalesSummary, Payment, Sale, SaleItem
+
+TOTALS = ('revenue', 'transactions', 'items_sold', 'amount_paid')
+DEFAULT_PAYMENT_METHOD = 'cash'
+
+
+@dataclass(frozen=True)
+class SaleContribution:
+    summary_date: date
+    payment_method: str
+    revenue: float
+    transactions: int
+    items_sold: int
+    amount_paid: float
+
+    @property
+    def key(self):
+        return self.summary_date, self.payment_method
+
+
+def sale_contribution(sale):
+    """What ``sale`` currently adds to the rollup, as seen by this transaction."""
+    # Pending sales, items and payments must be in the database to be counted
+    db.session.flush()
+    items_sold, payment_count, paid = db.session.execute(select(
+        select(func.coalesce(func.sum(SaleItem.quantity), 0))
+        .where(SaleItem.sale_id == sale.id).scalar_subquery(),
+        select(func.count(Payment.id))
+        .where(Payment.sale_id == sale.id).scalar_subquery(),
+        select(func.coalesce(func.sum(case((Payment.status == 'completed', Payment.amount), else_=0)), 0))
+        .where(Payment.sale_id == sale.id).scalar_subquery(),
+    )).one()
+
+    if payment_count:
+        amount_paid = float(paid)
+    else:
+        amount_paid = sale.total_amount if sale.payment_status == 'completed' else 0.0
+
+    return SaleContribution(
+        summary_date=sale.sale_date.date(),
+        payment_method=sale.payment_method or DEFAULT_PAYMENT_METHOD,
+        revenue=sale.total_amount,
+        transactions=1,
+        items_sold=int(items_sold),
+        amount_paid=amount_paid,
+    )
+
+
+def apply_contributions(added=(), removed=()):
+    """Add ``added`` and subtract ``removed`` from the rollup in the current transaction."""
+    deltas = defaultdict(lambda: dict.fromkeys(TOTALS, 0))
+    for contribution, sign in [(c, 1) for c in added] + [(c, -1) for c in removed]:
+        row = deltas[contribution.key]
+        for column in TOTALS:
+            row[column] += sign * getattr(contribution, column)
+
+    for (summary_date, payment_method), values in deltas.items():
+        if any(values.values()):
+            _increment(summary_date, payment_method, values)
+
+
+def record_sale(sale):
+    """Add a new sale to the rollup. Call after its items have been added."""
+    apply_contributions(added=[sale_contribution(sale)])
+
+
+def remove_sale(sale):
+    """Subtract a sale that is about to be deleted from the rollup."""
+    apply_contributions(removed=[sale_contribution(sale)])
+
+
+def _increment(summary_date, payment_method, values):
+    # Increments are applied in SQL, so concurrent transactions never overwrite
+    # each other's totals with a stale read
+    table = DailySalesSummary.__table__
+    row = dict(values, summary_date=summary_date, payment_method=payment_method)
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = dialect_insert(table).values(**row)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.summary_date, table.c.payment_method],
+            set_={column: table.c[column] + stmt.excluded[column] for column in TOTALS},
+        )
+        db.session.execute(stmt)
+        return
+
+    result = db.session.execute(
+        update(table)
+        .where(table.c.summary_date == summary_date, table.c.payment_method == payment_method)
+        .values({column: table.c[column] + values[column] for column in TOTALS})
+    )
+    if result.rowcount == 0:
+        db.session.execute(insert(table).values(**row))
+
+
+def rebuild_daily_sales_summary(start=None, end=None):
+    """Recompute the rollup from the sales tables for days in [start, end].
+
+    Both bounds are optional dates; without them the whole table is rebuilt.
+    The caller commits. Returns the number of summary rows written.
+    """
+    db.session.flush()
+    table = DailySalesSummary.__table__
+    summary_filter, sale_filter = [], []
+    if start is not None:
+        summary_filter.append(table.c.summary_date >= start)
+        sale_filter.append(Sale.sale_date >= datetime.combine(start, time.min))
+    if end is not None:
+        summary_filter.append(table.c.summary_date <= end)
+        sale_filter.append(Sale.sale_date < datetime.combine(end + timedelta(days=1), time.min))
+
+    items = (
+        select(SaleItem.sale_id, func.sum(SaleItem.quantity).label('items_sold'))
+        .group_by(SaleItem.sale_id)
+        .subquery()
+    )
+    payments = (
+        select(
+            Payment.sale_id,
+            func.count(Payment.id).label('payment_count'),
+            func.sum(case((Payment.status == 'completed', Payment.amount), else_=0)).label('paid'),
+        )
+        .group_by(Payment.sale_id)
+        .subquery()
+    )
+    summary_date = func.date(Sale.sale_date)
+    payment_method = func.coalesce(Sale.payment_method, DEFAULT_PAYMENT_METHOD)
+    amount_paid = case(
+        (payments.c.payment_count > 0, payments.c.paid),
+        (Sale.payment_status == 'completed', Sale.total_amount),
+        else_=0,
+    )
+    aggregate = (
+        select(
+            summary_date,
+            payment_method,
+            func.sum(Sale.total_amount),
+            func.count(Sale.id),
+            func.coalesce(func.sum(items.c.items_sold), 0),
+            func.coalesce(func.sum(amount_paid), 0),
+        )
+        .outerjoin(items, items.c.sale_id == Sale.id)
+        .outerjoin(payments, payments.c.sale_id == Sale.id)
+        .where(*sale_filter)
+        .group_by(summary_date, payment_method)
+    )
+
+    db.session.execute(delete(table).where(*summary_filter))
+    result = db.session.execute(insert(table).from_select(
+        ['summary_date', 'payment_method', *TOTALS], aggregate
+    ))
+    return result.rowcount
+
+
+def period_totals(start, end):
+    """Per-day totals for days in the half-open range [start, end)."""
+    rows = db.session.query(
+        DailySalesSummary.summary_date,
+        func.sum(DailySalesSummary.revenue),
+        func.sum(DailySalesSummary.transactions),
+        func.sum(DailySalesSummary.items_sold),
+        func.sum(DailySalesSummary.amount_paid),
+    ).filter(
+        DailySalesSummary.summary_date >= start,
+        DailySalesSummary.summary_date < end,
+    ).group_by(DailySalesSummary.summary_date).order_by(DailySalesSummary.summary_date).all()
+    return [
+        {
+            'date': day,
+            'revenue': float(revenue),
+            'transactions': transactions,
+            'items_sold': items_sold,
+            'amount_paid': float(amount_paid),
+        }
+        for day, revenue, transactions, items_sold, amount_paid in rows
+    ]
@@ -0,0 +1,137 @@
+"""Product search.
+
+On SQLite products are indexed in an FTS5 table, ``product_search``, over
+``name``, ``description`` and ``category`` with the product id as rowid.
+Queries match every typed word as a prefix (``choc cak`` finds "Chocolate
+Cake") and rank by BM25 with name matches weighted above category and
+description matches, answering from the index rather than scanning
+``product``.
+
+The index is created with the ``product`` table and kept in step by mapper
+events on ``Product``, which cover everything written through the ORM.
+Rows written with Core statements that touch the indexed columns (the
+seeder) rebuild it with ``rebuild_search_index`` afterwards; so can
+``flask rebuild-search-index`` for databases created before it existed.
+Other databases fall back to ``ILIKE`` matching ordered by name.
+"""
+import re
+
+from sqlalchemy import DDL, and_, column, event, func, inspect, literal_column, or_, select, table, text
+
+from extensions import db
+from models import Product
+
+SEARCH_TABLE = 'product_search'
+INDEXED_COLUMNS = ('name', 'description', 'category')
+# BM25 weights, in INDEXED_COLUMNS order
+RANK_WEIGHTS = (10.0, 1.0, 4.0)
+MAX_PER_PAGE = 50
+
+_index = table(SEARCH_TABLE, column('rowid'))
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+_CREATE = DDL(
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+    f"{', '.join(INDEXED_COLUMNS)}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+)
+_DROP = DDL(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+_CREATE_ON_SQLITE = _CREATE.execute_if(dialect='sqlite')
+_DROP_ON_SQLITE = _DROP.execute_if(dialect='sqlite')
+
+
+def _indexed_values(product):
+    return {name: getattr(product, name) or '' for name in INDEXED_COLUMNS}
+
+
+def _delete_entry(connection, product_id):
+    connection.execute(text(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = :id'), {'id': product_id})
+
+
+def _insert_entry(connection, product_id, values):
+    connection.execute(
+        text(f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(INDEXED_COLUMNS)}) "
+             f"VALUES (:id, {', '.join(':' + name for name in INDEXED_COLUMNS)})"),
+        {'id': product_id, **values},
+    )
+
+
+def _after_insert(mapper, connection, target):
+    if connection.dialect.name == 'sqlite':
+        _insert_entry(connection, target.id, _indexed_values(target))
+
+
+def _after_update(mapper, connection, target):
+    if connection.dialect.name != 'sqlite':
+        return
+    # Stock and price changes leave the index alone
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in INDEXED_COLUMNS):
+        _delete_entry(connection, target.id)
+        _insert_entry(connection, target.id, _indexed_values(target))
+
+
+def _after_delete(mapper, connection, target):
+    if connection.dialect.name == 'sqlite':
+        _delete_entry(connection, target.id)
+
+
+def register_search_index():
+    """Create the index along with ``product`` and install the sync events, once per process."""
+    product_table = Product.__table__
+    for target, name, listener in ((product_table, 'after_create', _CREATE_ON_SQLITE),
+                                   (product_table, 'before_drop', _DROP_ON_SQLITE),
+                                   (Product, 'after_insert', _after_insert),
+                                   (Product, 'after_update', _after_update),
+                                   (Product, 'after_delete', _after_delete)):
+        if not event.contains(target, name, listener):
+            event.listen(target, name, listener)
+
+
+def rebuild_search_index(connection=None):
+    """Recreate the index from ``product``. Returns the number of products indexed."""
+    connection = connection or db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        return 0
+    connection.execute(_CREATE)
+    connection.execute(text(f'DELETE FROM {SEARCH_TABLE}'))
+    columns = ', '.join(INDEXED_COLUMNS)
+    coalesced = ', '.join(f"coalesce({name}, '')" for name in INDEXED_COLUMNS)
+    return connection.execute(text(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, {columns}) SELECT id, {coalesced} FROM product'
+    )).rowcount
+
+
+def match_expression(query):
+    """FTS5 query matching every word of ``query`` as a prefix, or None if it has no words."""
+    tokens = _TOKEN.findall(query or '')
+    if not tokens:
+        return None
+    return ' AND '.join(f'"{token}"*' for token in tokens)
+
+
+def search_products(query, active_only=True):
+    """``select(Product)`` for ``query``, best match first, or None for an empty query.
+
+    Callers add ``limit``/``offset`` and may swap the selected columns.
+    """
+    if db.session.get_bind().dialect.name == 'sqlite':
+        expression = match_expression(query)
+        if expression is None:
+            return None
+        stmt = (
+            select(Product)
+            .join(_index, _index.c.rowid == Product.id)
+            .where(literal_column(SEARCH_TABLE).op('MATCH')(expression))
+            .order_by(func.bm25(literal_column(SEARCH_TABLE), *RANK_WEIGHTS), Product.id)
+        )
+    else:
+        tokens = _TOKEN.findall(query or '')
+        if not tokens:
+            return None
+        stmt = select(Product).where(and_(*(
+            or_(*(getattr(Product, name).ilike(f'%{token}%') for name in INDEXED_COLUMNS))
+            for token in tokens
+        ))).order_by(Product.name, Product.id)
+    if active_only:
+        stmt = stmt.where(Product.is_active.is_(True))
+    return stmt
@@ -0,0 +1,106 @@
+"""Atomic stock movements.
+
+Stock is never changed as a read-modify-write of ``product.stock_quantity``
+in Python, because two workers selling the last loaf would both see it in
+stock. Instead a whole cart is taken with one conditional statement::
+
+    UPDATE product
+       SET stock_quantity = stock_quantity - CASE id WHEN :id1 THEN :q1 ... END
+     WHERE id IN (:id1, ...)
+       AND stock_quantity >= CASE id WHEN :id1 THEN :q1 ... END
+
+and the affected row count tells whether every product had enough. The
+database applies the check and the decrement under its own row (or, on SQLite,
+database) write lock, so concurrent checkouts can never drive stock negative.
+The rows are also marked for a new catalog version at commit, so tills pick
+up the new stock levels (see ``services.catalog``).
+"""
+from collections import namedtuple
+
+from sqlalchemy import case, update
+
+from extensions import db
+from models import Product
+from services.catalog import mark_changed
+
+Shortfall = namedtuple('Shortfall', 'product_id name requested available')
+
+
+class InsufficientStock(Exception):
+    """A stock movement would take one or more products below zero."""
+
+    def __init__(self, shortfalls):
+        self.shortfalls = shortfalls
+        super().__init__('; '.join(
+            f'{s.name or f"Product {s.product_id}"}: {s.requested} requested, {s.available} available'
+            for s in shortfalls
+        ))
+
+
+class _Rejected(Exception):
+    pass
+
+
+def _positive(quantities):
+    if any(quantity < 0 for quantity in quantities.values()):
+        raise ValueError('Stock movement quantities must not be negative')
+    return {product_id: quantity for product_id, quantity in quantities.items() if quantity}
+
+
+def _update(quantities, sign, only_if_available):
+    delta = case(quantities, value=Product.id)
+    stmt = (
+        update(Product)
+        .where(Product.id.in_(quantities))
+        .values(stock_quantity=Product.stock_quantity + sign * delta)
+        .execution_options(synchronize_session='fetch')
+    )
+    if only_if_available:
+        stmt = stmt.where(Product.stock_quantity >= delta)
+    return db.session.execute(stmt).rowcount
+
+
+def take_stock(quantities):
+    """Remove ``{product_id: quantity}`` from stock in one statement.
+
+    Either every product has enough stock and all are decremented, or nothing
+    changes and ``InsufficientStock`` lists every product that fell short
+    (unknown product ids are reported with no name and nothing available).
+    Runs in the caller's transaction; the caller commits.
+    """
+    quantities = _positive(quantities)
+    if not quantities:
+        return
+    try:
+        # A savepoint undoes the rows that did match when others did not
+        with db.session.begin_nested():
+            if _update(quantities, -1, only_if_available=True) != len(quantities):
+                raise _Rejected()
+    except _Rejected:
+        raise InsufficientStock(_shortfalls(quantities)) from None
+    mark_changed(quantities)
+
+
+def put_stock(quantities):
+    """Add ``{product_id: quantity}`` to stock. Returns the number of products updated."""
+    quantities = _positive(quantities)
+    if not quantities:
+        return 0
+    updated = _update(quantities, 1, only_if_available=False)
+    mark_changed(quantities)
+    return updated
+
+
+def _shortfalls(quantities):
+    # populate_existing also refreshes Product objects already in the session
+    products = {
+        product.id: product
+        for product in Product.query.filter(Product.id.in_(quantities)).populate_existing()
+    }
+    shortfalls = []
+    for product_id, requested in quantities.items():
+        product = products.get(product_id)
+        available = product.stock_quantity if product else 0
+        if available < requested:
+            shortfalls.append(Shortfall(product_id, product.name if product else None, requested, available))
+    return shortfalls
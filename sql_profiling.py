@@ -0,0 +1,119 @@
+"""Per-request SQL instrumentation.
+
+Cursor execute events on every engine record, for the current request, how
+many statements ran, how long the database took and how often each statement
+shape (the SQL text with bound-parameter lists collapsed) repeated. The totals
+go out in a ``Server-Timing`` header, visible in the browser's network panel,
+and a shape that runs more than ``SQL_REPEAT_THRESHOLD`` times in one request
+is logged as a likely N+1 query.
+
+Configuration:
+
+    SQL_PROFILING           install the instrumentation (default on in development only)
+    SQL_SERVER_TIMING       add the Server-Timing header (default on in development only)
+    SQL_REPEAT_THRESHOLD    repeats of one shape before warning (default 10)
+"""
+import logging
+import re
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from extensions import db
+
+logger = logging.getLogger('barkery_system')
+
+_PLACEHOLDER = r'(?:\?|%s|%\([^)]+\)s|:\w+)'
+_PARAM_LIST = re.compile(r'\(\s*' + _PLACEHOLDER + r'(?:\s*,\s*' + _PLACEHOLDER + r')*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def statement_shape(statement):
+    """Normalise SQL so the same query with different IN-list sizes compares equal."""
+    return _PARAM_LIST.sub('(?)', _WHITESPACE.sub(' ', statement).strip())
+
+
+class QueryStats:
+    """Statements executed while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.shapes = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold):
+        """Shapes that ran more than ``threshold`` times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self):
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries"'
+
+
+def current_query_stats():
+    """The stats of the request being handled, or None outside a profiled request."""
+    if not has_request_context():
+        return None
+    return g.get('sql_stats')
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('sql_profiling_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['sql_profiling_start'].pop()
+    stats = current_query_stats()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements
+    conn = exception_context.connection
+    if conn is not None and exception_context.cursor is not None:
+        starts = conn.info.get('sql_profiling_start')
+        if starts:
+            starts.pop()
+
+
+def _start_request():
+    g.sql_stats = QueryStats()
+
+
+def _finish_request(response):
+    stats = g.pop('sql_stats', None)
+    if stats is None:
+        return response
+
+    threshold = current_app.config['SQL_REPEAT_THRESHOLD']
+    for shape, count in stats.repeated(threshold):
+        logger.warning(f"Possible N+1 query in {request.endpoint}: statement ran {count} times: {shape[:300]}")
+
+    if current_app.config['SQL_SERVER_TIMING']:
+        existing = response.headers.get('Server-Timing')
+        timing = stats.server_timing()
+        response.headers['Server-Timing'] = f'{existing}, {timing}' if existing else timing
+    return response
+
+
+def init_sql_profiling(app):
+    """Instrument the app's engines and requests if ``SQL_PROFILING`` is on."""
+    if not app.config['SQL_PROFILING']:
+        return
+
+    with app.app_context():
+        for engine in db.engines.values():
+            if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+                event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+                event.listen(engine, 'handle_error', _handle_error)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
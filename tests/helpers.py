@@ -0,0 +1,9 @@
+"""Shared helpers for the test modules."""
+from config import TestingConfig
+
+
+def testing_config(**overrides):
+    """``TestingConfig`` as a dict for ``create_app``, with ``overrides`` applied."""
+    config = {k: getattr(TestingConfig, k) for k in dir(TestingConfig) if k.isupper()}
+    config.update(overrides)
+    return config
@@ -0,0 +1,49 @@
+import unittest
+from app import create_app
+from extensions import db
+from models import User
+
+
+class TestAppFactory(unittest.TestCase):
+    def test_default_app_registers_all_blueprints(self):
+        """Test the default configuration serves every module"""
+        app = create_app('testing')
+        self.assertIn('main', app.blueprints)
+        self.assertIn('sales', app.blueprints)
+        self.assertIn('inventory', app.blueprints)
+        self.assertIn('employees', app.blueprints)
+
+    def test_unknown_blueprint_rejected(self):
+        """Test a typo in the blueprint list fails loudly"""
+        with self.assertRaises(ValueError):
+            create_app('testing', blueprints=['sales', 'payroll'])
+
+    def test_till_only_node(self):
+        """Test a POS-only node serves sales but not the back office"""
+        app = create_app('testing', blueprints=['sales'])
+        self.assertEqual(set(app.blueprints), {'main', 'sales'})
+
+        client = app.test_client()
+        with app.app_context():
+            db.create_all()
+            user = User(username='till', email='till@example.com', is_active=True)
+            user.set_password('tillpassword')
+            db.session.add(user)
+            db.session.commit()
+
+            client.post('/login', data={'username': 'till', 'password': 'tillpassword'})
+
+            response = client.get('/pos')
+            self.assertEqual(response.status_code, 200)
+            # Navigation only links to the blueprints this node serves
+            self.assertNotIn(b'href="/inventory"', response.data)
+            self.assertNotIn(b'href="/employees"', response.data)
+
+            self.assertEqual(client.get('/inventory').status_code, 404)
+
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+from app import create_app
+from extensions import db
+from models import Product, User
+from services.barcodes import clear_code_map
+
+app = create_app('testing')
+
+
+class TestBarcodeLookup(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        clear_code_map()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        self.bread = Product(name='Bread', barcode=' 5901234123457 ', price=50.0, unit='loaf', stock_quantity=10)
+        self.cake = Product(name='Cake', barcode='', price=500.0, unit='piece', stock_quantity=2)
+        db.session.add_all([user, self.bread, self.cake])
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def scan(self, code):
+        return self.client.get(f'/api/products/by-code/{code}')
+
+    def test_lookup(self):
+        self.assertEqual(self.bread.barcode, '5901234123457')
+        self.assertIsNone(self.cake.barcode)
+
+        response = self.scan('5901234123457')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['product']['id'], self.bread.id)
+        self.assertEqual(response.get_json()['product']['stock'], 10)
+        self.assertEqual(self.scan('0000000000000').status_code, 404)
+
+    def test_code_changes_are_picked_up(self):
+        self.assertEqual(self.scan('5901234123457').status_code, 200)
+        self.assertEqual(self.scan('CAKE-1').status_code, 404)
+
+        bread = db.session.get(Product, self.bread.id)
+        cake = db.session.get(Product, self.cake.id)
+        bread.barcode = None
+        db.session.flush()
+        cake.barcode = '5901234123457'
+        db.session.add(Product(name='Scone', barcode='CAKE-1', price=30.0, unit='piece'))
+        db.session.commit()
+
+        self.assertEqual(self.scan('5901234123457').get_json()['product']['id'], self.cake.id)
+        self.assertEqual(self.scan('CAKE-1').get_json()['product']['name'], 'Scone')
+
+        cake.is_active = False
+        db.session.commit()
+        self.assertEqual(self.scan('5901234123457').status_code, 404)
+
+    def test_form_rejects_duplicate_code(self):
+        data = {'name': 'Rye', 'price': 80, 'category': 'bread', 'unit': 'loaf', 'min_stock': 1,
+                'stock_quantity': 5, 'supplier_id': 0, 'is_active': 'y'}
+        response = self.client.post('/products/new', data={**data, 'barcode': '5901234123457'})
+        self.assertIn(b'Barcode already used by Bread', response.data)
+
+        self.client.post('/products/new', data={**data, 'barcode': 'RYE-1'})
+        self.assertEqual(Product.query.filter_by(name='Rye').one().barcode, 'RYE-1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from app import create_app
+from cache_backends import MemoryLRUCache, SQLiteKVCache, TieredCache
+from extensions import cache
+from flask_caching.backends.simplecache import SimpleCache
+
+
+class TestMemoryLRUCache(unittest.TestCase):
+    def test_lru_eviction_by_entries(self):
+        """The least recently used entry is evicted first"""
+        lru = MemoryLRUCache(max_entries=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.stats()['evictions'], 1)
+
+    def test_byte_bound(self):
+        """The tier never holds more than max_bytes of pickled data"""
+        lru = MemoryLRUCache(max_bytes=1000)
+        for i in range(20):
+            lru.set(f'key{i}', 'x' * 200)
+        self.assertLessEqual(lru.stats()['bytes'], 1000)
+        self.assertGreater(lru.stats()['evictions'], 0)
+        # Values larger than the whole tier are not stored
+        self.assertFalse(lru.set('huge', 'x' * 5000))
+
+    def test_ttl_expiry(self):
+        """Entries expire after their timeout"""
+        lru = MemoryLRUCache()
+        lru.set('a', 1, timeout=1)
+        lru._entries['a'] = (time.monotonic() - 1, lru._entries['a'][1])
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(lru.stats()['expirations'], 1)
+
+
+class TestTieredCache(unittest.TestCase):
+    def setUp(self):
+        self.shared = SimpleCache()
+        self.cache = TieredCache(MemoryLRUCache(), self.shared)
+
+    def test_counters(self):
+        """Hits are counted per tier and misses overall"""
+        self.assertIsNone(self.cache.get('a'))
+        self.cache.set('a', {'total': 10})
+        self.assertEqual(self.cache.get('a'), {'total': 10})
+
+        # A value written by another worker is found in the shared tier
+        self.shared.set('b', 5)
+        self.assertEqual(self.cache.get('b'), 5)
+        self.assertEqual(self.cache.get('b'), 5)
+
+        stats = self.cache.stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['l1_hits'], 2)
+        self.assertEqual(stats['l2_hits'], 1)
+
+    def test_delete_removes_both_tiers(self):
+        self.cache.set('a', 1)
+        self.cache.delete('a')
+        self.assertIsNone(self.cache.get('a'))
+        self.assertIsNone(self.shared.get('a'))
+
+
+class TestSQLiteKVCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'cache.sqlite')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_shared_between_instances(self):
+        """Two workers pointing at the same file see each other's writes"""
+        worker_a = SQLiteKVCache(self.path)
+        worker_b = SQLiteKVCache(self.path)
+        worker_a.set('a', [1, 2, 3])
+        self.assertEqual(worker_b.get('a'), [1, 2, 3])
+        self.assertFalse(worker_b.add('a', 'other'))
+        worker_b.delete('a')
+        self.assertIsNone(worker_a.get('a'))
+
+    def test_threshold(self):
+        kv = SQLiteKVCache(self.path, threshold=5)
+        for i in range(10):
+            kv.set(f'key{i}', i)
+        count = kv._connection().execute('SELECT COUNT(*) FROM cache_entry').fetchone()[0]
+        self.assertLessEqual(count, 5)
+
+
+class TestAppCache(unittest.TestCase):
+    def test_app_uses_tiered_cache(self):
+        """The shared cache object is backed by the tiered backend"""
+        app = create_app('testing')
+        with app.app_context():
+            self.assertIsInstance(cache.cache, TieredCache)
+            cache.set('greeting', 'hello')
+            self.assertEqual(cache.get('greeting'), 'hello')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+from app import create_app
+from extensions import db
+from models import Product, User
+from services.catalog import current_version
+from services.stock import take_stock
+
+app = create_app('testing')
+
+
+class TestCatalog(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        self.bread = Product(name='Bread', price=50.0, unit='loaf', category='bread', stock_quantity=100)
+        self.cake = Product(name='Cake', price=500.0, unit='piece', category='cakes', stock_quantity=5)
+        db.session.add_all([user, self.bread, self.cake])
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def catalog(self, since=None, etag=None):
+        headers = {'If-None-Match': etag} if etag else {}
+        url = '/api/pos/catalog' + (f'?since={since}' if since is not None else '')
+        return self.client.get(url, headers=headers)
+
+    def test_full_catalog_and_not_modified(self):
+        response = self.catalog()
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertTrue(data['full'])
+        self.assertEqual(data['products'][0], {'id': self.bread.id, 'name': 'Bread', 'price': 50.0, 'stock': 100,
+                                               'category': 'bread', 'active': True})
+        self.assertEqual(response.headers['ETag'], f'"catalog-{data["version"]}"')
+
+        repeat = self.catalog(etag=response.headers['ETag'])
+        self.assertEqual(repeat.status_code, 304)
+        self.assertEqual(repeat.get_data(), b'')
+
+    def test_changes_are_sent_as_deltas(self):
+        version = self.catalog().get_json()['version']
+        self.client.post('/api/pos/checkout', json={
+            'items': [{'id': self.bread.id, 'quantity': 3, 'price': 50.0}], 'total_amount': 150.0})
+
+        response = self.catalog(since=version, etag=f'"catalog-{version}"')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertGreater(data['version'], version)
+        self.assertFalse(data['full'])
+        self.assertEqual([(p['id'], p['stock']) for p in data['products']], [(self.bread.id, 97)])
+
+        cake = db.session.get(Product, self.cake.id)
+        cake.price = 550.0
+        cake.is_active = False
+        db.session.commit()
+        delta = self.catalog(since=data['version']).get_json()['products']
+        self.assertEqual([(p['id'], p['price'], p['active']) for p in delta], [(self.cake.id, 550.0, False)])
+        self.assertNotIn(self.cake.id, [p['id'] for p in self.catalog().get_json()['products']])
+
+    def test_delete_forces_full_catalog(self):
+        version = self.catalog().get_json()['version']
+        db.session.delete(db.session.get(Product, self.cake.id))
+        db.session.commit()
+        data = self.catalog(since=version).get_json()
+        self.assertTrue(data['full'])
+        self.assertEqual([p['id'] for p in data['products']], [self.bread.id])
+
+    def test_versions_follow_commit_order(self):
+        """A change made before a version is served but committed after it is still sent"""
+        served = self.catalog().get_json()['version']
+        cake = db.session.get(Product, self.cake.id)
+        cake.price = 550.0
+        take_stock({self.bread.id: 1})
+        db.session.flush()
+        # Nothing has taken a version yet, so no version can be handed out ahead of this commit
+        self.assertEqual(current_version(), (served, 0))
+        db.session.commit()
+
+        self.assertEqual(self.catalog(etag=f'"catalog-{served}"').status_code, 200)
+        data = self.catalog(since=served).get_json()
+        self.assertEqual(data['version'], served + 1)
+        self.assertEqual([(p['id'], p['price'], p['stock']) for p in data['products']],
+                         [(self.bread.id, 50.0, 99), (self.cake.id, 550.0, 5)])
+
+        # A rolled back change takes no version
+        cake.price = 600.0
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        self.assertEqual(current_version(), (served + 1, 0))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import unittest
+from sqlalchemy import event
+from app import create_app
+from extensions import db
+from models import Product, Sale, StockHistory, User
+
+app = create_app('testing')
+
+
+class TestCheckout(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        self.products = [
+            Product(name=f'Tray {i}', price=100.0, unit='tray', stock_quantity=5)
+            for i in range(40)
+        ]
+        db.session.add(user)
+        db.session.add_all(self.products)
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def checkout(self, lines, **kwargs):
+        return self.client.post('/pos/process', data={
+            'items': json.dumps([{'id': product_id, 'quantity': quantity, 'price': 100.0}
+                                 for product_id, quantity in lines]),
+            'total_amount': sum(100.0 * quantity for _, quantity in lines),
+            'payment_method': 'cash',
+        }, **kwargs)
+
+    def test_cart_loaded_in_one_query(self):
+        """A 40-line catering order reads its products with a single IN query"""
+        lines = [(product.id, 1) for product in self.products]
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            self.checkout(lines)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        product_reads = [s for s in statements if s.lstrip().startswith('SELECT') and 'FROM product' in s]
+        self.assertEqual(len(product_reads), 1)
+        self.assertIn(' IN (', product_reads[0])
+        self.assertEqual(Sale.query.count(), 1)
+
+    def test_lines_written_in_one_insert_each(self):
+        """Items and ledger rows go in with one executemany each and name their sale"""
+        lines = [(product.id, 2) for product in self.products]
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            self.checkout(lines)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        inserts = [s.split('(')[0].strip() for s in statements if s.lstrip().startswith('INSERT')]
+        self.assertEqual(inserts.count('INSERT INTO sale_item'), 1)
+        self.assertEqual(inserts.count('INSERT INTO stock_history'), 1)
+        sale = Sale.query.one()
+        self.assertEqual(len(sale.items), 40)
+        self.assertEqual({h.notes for h in StockHistory.query}, {f'Sale #{sale.id}'})
+
+    def test_every_shortfall_reported(self):
+        """All short lines are reported together and nothing is sold"""
+        first, second, third = self.products[:3]
+        response = self.checkout([(first.id, 6), (second.id, 1), (third.id, 3), (third.id, 3)],
+                                 follow_redirects=True)
+        page = response.get_data(as_text=True)
+        self.assertIn('Insufficient stock for Tray 0: 6 requested, 5 available', page)
+        self.assertIn('Insufficient stock for Tray 2: 6 requested, 5 available', page)
+        self.assertNotIn('Tray 1:', page)
+        self.assertEqual(Sale.query.count(), 0)
+        self.assertEqual(db.session.get(Product, second.id).stock_quantity, 5)
+
+    def test_string_ids_from_pos_page(self):
+        """The POS page sends product ids as strings, read from data-id"""
+        first, second = self.products[:2]
+        response = self.client.post('/pos/process', data={
+            'items': json.dumps([{'id': str(first.id), 'quantity': 2, 'price': 100.0},
+                                 {'id': str(second.id), 'quantity': 1, 'price': 100.0}]),
+            'total_amount': 300.0,
+            'payment_method': 'cash',
+        }, follow_redirects=True)
+        self.assertNotIn('not found', response.get_data(as_text=True))
+        self.assertEqual(Sale.query.count(), 1)
+        self.assertEqual(db.session.get(Product, first.id).stock_quantity, 3)
+        self.assertEqual(db.session.get(Product, second.id).stock_quantity, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
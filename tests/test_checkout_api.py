@@ -0,0 +1,110 @@
+import unittest
+from datetime import datetime, timedelta
+from app import create_app
+from extensions import db
+from models import IdempotencyKey, Product, Sale, StockHistory, User
+from services.idempotency import purge_expired
+
+app = create_app('testing')
+
+
+class TestCheckoutApi(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        self.bread = Product(name='Bread', price=50.0, unit='loaf', stock_quantity=10)
+        self.cake = Product(name='Cake', price=500.0, unit='piece', stock_quantity=2)
+        db.session.add_all([user, self.bread, self.cake])
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+        self.cart = {
+            'items': [{'id': self.bread.id, 'quantity': 3, 'price': 50.0},
+                      {'id': self.cake.id, 'quantity': 1, 'price': 500.0}],
+            'total_amount': 650.0,
+            'customer_name': 'Amina',
+            'payment_method': 'mpesa',
+        }
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def stock(self, product):
+        db.session.expire_all()
+        return db.session.get(Product, product.id).stock_quantity
+
+    def test_checkout_returns_sale_and_stock(self):
+        response = self.client.post('/api/pos/checkout', json=self.cart)
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertTrue(data['success'])
+        self.assertEqual(data['sale']['total_amount'], 650.0)
+        self.assertEqual(data['sale']['payment_status'], 'pending')
+        self.assertEqual([(i['name'], i['total_price']) for i in data['sale']['items']],
+                         [('Bread', 150.0), ('Cake', 500.0)])
+        self.assertEqual({s['name']: s['stock_quantity'] for s in data['stock']}, {'Bread': 7, 'Cake': 1})
+        self.assertEqual(Sale.query.count(), 1)
+        self.assertEqual(StockHistory.query.count(), 2)
+
+    def test_retry_with_key_is_replayed(self):
+        """A retried request returns the first response and sells nothing more"""
+        headers = {'Idempotency-Key': 'till-1-0001'}
+        first = self.client.post('/api/pos/checkout', json=self.cart, headers=headers)
+        second = self.client.post('/api/pos/checkout', json=self.cart, headers=headers)
+        self.assertEqual(second.status_code, 201)
+        self.assertEqual(second.headers.get('Idempotent-Replayed'), 'true')
+        self.assertEqual(second.get_json(), first.get_json())
+        self.assertEqual(Sale.query.count(), 1)
+        self.assertEqual(self.stock(self.bread), 7)
+
+    def test_key_reused_for_other_cart(self):
+        headers = {'Idempotency-Key': 'till-1-0002'}
+        self.client.post('/api/pos/checkout', json=self.cart, headers=headers)
+        self.cart['items'][0]['quantity'] = 1
+        response = self.client.post('/api/pos/checkout', json=self.cart, headers=headers)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Sale.query.count(), 1)
+
+    def test_expired_key_runs_again(self):
+        headers = {'Idempotency-Key': 'till-1-0003'}
+        self.client.post('/api/pos/checkout', json=self.cart, headers=headers)
+        record = db.session.get(IdempotencyKey, 'till-1-0003')
+        record.expires_at = datetime.utcnow() - timedelta(minutes=1)
+        db.session.commit()
+
+        response = self.client.post('/api/pos/checkout', json=self.cart, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertIsNone(response.headers.get('Idempotent-Replayed'))
+        self.assertEqual(Sale.query.count(), 2)
+
+    def test_shortfall_is_conflict(self):
+        self.cart['items'][1]['quantity'] = 3
+        response = self.client.post('/api/pos/checkout', json=self.cart,
+                                    headers={'Idempotency-Key': 'till-1-0004'})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.get_json()['shortfalls'],
+                         [{'product_id': self.cake.id, 'name': 'Cake', 'requested': 3, 'available': 2}])
+        self.assertEqual(Sale.query.count(), 0)
+        self.assertEqual(self.stock(self.bread), 10)
+        self.assertIsNone(db.session.get(IdempotencyKey, 'till-1-0004'))
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.client.post('/api/pos/checkout', data='not json').status_code, 400)
+        self.assertEqual(self.client.post('/api/pos/checkout', json={'items': []}).status_code, 400)
+        response = self.client.post('/api/pos/checkout', json={'items': [{'id': 999, 'quantity': 1, 'price': 1}]})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.get_json()['message'], 'Product with ID 999 not found')
+
+    def test_purge_expired(self):
+        self.client.post('/api/pos/checkout', json=self.cart, headers={'Idempotency-Key': 'till-1-0005'})
+        self.assertEqual(purge_expired(), 0)
+        self.assertEqual(purge_expired(datetime.utcnow() + timedelta(days=2)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import unittest
+from unittest import mock
+from datetime import date, datetime, timezone
+from sqlalchemy import event
+from app import create_app
+from extensions import db
+from models import Product, Sale
+from services import dashboard, sales_summary
+
+app = create_app('testing')
+
+
+class TestDashboardMetrics(unittest.TestCase):
+    def setUp(self):
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.product = Product(name='Test Bread', price=50.0, unit='loaf', stock_quantity=20)
+        db.session.add(self.product)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_sale(self, amount):
+        sale = Sale(total_amount=amount, sale_date=datetime.now(timezone.utc))
+        db.session.add(sale)
+        db.session.flush()
+        sales_summary.record_sale(sale)
+        db.session.commit()
+
+    def test_metrics_cached_between_commits(self):
+        """Metrics are computed once until watched data changes"""
+        with mock.patch.object(dashboard, 'compute_dashboard_metrics',
+                               wraps=dashboard.compute_dashboard_metrics) as compute:
+            first = dashboard.get_dashboard_metrics()
+            second = dashboard.get_dashboard_metrics()
+        self.assertEqual(first, second)
+        self.assertEqual(compute.call_count, 1)
+
+    def test_commit_invalidates_metrics(self):
+        """Committing a sale makes the next read see the new revenue"""
+        before = dashboard.get_dashboard_metrics()
+        self.add_sale(150.0)
+        after = dashboard.get_dashboard_metrics()
+        self.assertEqual(after.today_revenue, before.today_revenue + 150.0)
+        self.assertEqual(after.today_transactions, before.today_transactions + 1)
+
+    def test_half_open_ranges(self):
+        """Sales are bucketed by [start, end) day and month ranges"""
+        for sale_date, amount in [
+            (datetime(2024, 3, 14, 23, 59, 59), 1.0),   # day before
+            (datetime(2024, 3, 15, 0, 0, 0), 10.0),     # start of the day
+            (datetime(2024, 3, 15, 18, 30, 0), 100.0),
+            (datetime(2024, 3, 16, 0, 0, 0), 1000.0),   # next day, same month
+            (datetime(2024, 4, 1, 0, 0, 0), 5000.0),    # next month
+            (datetime(2024, 2, 29, 12, 0, 0), 7.0),     # previous month
+        ]:
+            db.session.add(Sale(total_amount=amount, sale_date=sale_date))
+        sales_summary.rebuild_daily_sales_summary()
+        db.session.commit()
+
+        metrics = dashboard.compute_dashboard_metrics(date(2024, 3, 15))
+        self.assertEqual(metrics.today_revenue, 110.0)
+        self.assertEqual(metrics.today_transactions, 2)
+        self.assertEqual(metrics.month_revenue, 1111.0)
+        self.assertEqual(metrics.month_transactions, 4)
+        self.assertEqual(metrics.total_products, 1)
+        self.assertEqual(metrics.active_products, 1)
+
+    def test_revenue_query_reads_rollup(self):
+        """Revenue comes from a key range scan on the daily rollup, not from sales"""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            dashboard.compute_dashboard_metrics(date(2024, 3, 15))
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+
+        self.assertFalse([s for s in statements if 'FROM sale ' in s[0] + ' '])
+        statement, parameters = next(s for s in statements if 'FROM daily_sales_summary' in s[0])
+        plan = db.session.connection().exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+        self.assertIn('USING INDEX sqlite_autoindex_daily_sales_summary_1', ' '.join(row[-1] for row in plan))
+
+    def test_rollback_keeps_cache(self):
+        """A rolled back transaction does not invalidate the metrics"""
+        version = dashboard.data_version()
+        db.session.add(Sale(total_amount=10.0))
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(dashboard.data_version(), version)
+
+    def test_unwatched_commit_keeps_cache(self):
+        """Commits that touch no watched model leave the cache alone"""
+        from models import Supplier
+        version = dashboard.data_version()
+        db.session.add(Supplier(name='Flour Mill'))
+        db.session.commit()
+        self.assertEqual(dashboard.data_version(), version)
+
+    def test_bulk_update_invalidates(self):
+        """Bulk statements issued through the session are detected too"""
+        version = dashboard.data_version()
+        Product.query.filter_by(id=self.product.id).update({'stock_quantity': 5})
+        db.session.commit()
+        self.assertNotEqual(dashboard.data_version(), version)
+
+
+if __name__ == '__main__':
+    unittest.main()
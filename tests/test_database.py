@@ -0,0 +1,80 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from sqlalchemy import text
+from app import create_app
+from database import begin_write_transaction, build_engine_options
+from extensions import db
+from helpers import testing_config
+from models import Supplier
+
+
+class TestDatabaseConfig(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+    def test_sqlite_file_pragmas(self):
+        """Every SQLite connection runs in WAL mode with a busy timeout"""
+        app = create_app(testing_config(
+            SQLALCHEMY_DATABASE_URI='sqlite:///' + os.path.join(self.tmpdir, 'test.db')
+        ))
+        with app.app_context():
+            with db.engine.connect() as conn:
+                self.assertEqual(conn.execute(text('PRAGMA journal_mode')).scalar(), 'wal')
+                self.assertEqual(conn.execute(text('PRAGMA busy_timeout')).scalar(), 5000)
+                # 1 == NORMAL
+                self.assertEqual(conn.execute(text('PRAGMA synchronous')).scalar(), 1)
+                self.assertEqual(conn.execute(text('PRAGMA cache_size')).scalar(), -20000)
+            db.engine.dispose()
+
+    def test_write_transaction_holds_lock(self):
+        """begin_write_transaction takes the SQLite write lock up front"""
+        path = os.path.join(self.tmpdir, 'test.db')
+        app = create_app(testing_config(SQLALCHEMY_DATABASE_URI='sqlite:///' + path))
+        with app.app_context():
+            db.create_all()
+            begin_write_transaction(db.session)
+            db.session.execute(text('SELECT 1'))
+            other = sqlite3.connect(path, timeout=0)
+            try:
+                with self.assertRaises(sqlite3.OperationalError):
+                    other.execute('BEGIN IMMEDIATE')
+            finally:
+                other.close()
+            db.session.rollback()
+            db.engine.dispose()
+
+    def test_write_transaction_never_commits_pending_changes(self):
+        """begin_write_transaction refuses a session with pending changes instead of committing them"""
+        app = create_app(testing_config())
+        with app.app_context():
+            db.create_all()
+            db.session.add(Supplier(name='Flour Mill'))
+            with self.assertRaises(RuntimeError):
+                begin_write_transaction(db.session)
+            db.session.rollback()
+            self.assertEqual(Supplier.query.count(), 0)
+            db.session.remove()
+            db.drop_all()
+
+    def test_pool_options_for_server_databases(self):
+        """Pool sizing and pre-ping are passed through for non-memory databases"""
+        config = testing_config(SQLALCHEMY_DATABASE_URI='postgresql://bakery@localhost/bakery')
+        options = build_engine_options(config)
+        self.assertEqual(options['pool_size'], config['DB_POOL_SIZE'])
+        self.assertEqual(options['pool_recycle'], config['DB_POOL_RECYCLE'])
+        self.assertTrue(options['pool_pre_ping'])
+
+    def test_memory_database_has_no_pool_sizing(self):
+        """In-memory SQLite keeps a single connection, so no pool size is set"""
+        options = build_engine_options(testing_config())
+        self.assertNotIn('pool_size', options)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,13 @@
 import unittest
 import uuid
 from datetime import datetime, timezone
-from app import app, db
+from app import create_app
+from extensions import db
 from models import Product, StockHistory, User, Supplier, PurchaseOrder, PurchaseOrderItem
 from flask_login import login_user, current_user, login_manager
 
+app = create_app('testing')
+
 class InventoryTestCase(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
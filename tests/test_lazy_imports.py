@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import unittest
+
+from lazy_imports import LazyModule, HEAVY_MODULES
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyImports(unittest.TestCase):
+    def test_module_loaded_on_first_attribute_access(self):
+        """The proxy should only import the module when it is used"""
+        proxy = LazyModule('colorsys')
+        self.assertFalse(proxy.is_loaded)
+        self.assertEqual(proxy.rgb_to_hsv(0, 0, 0), (0, 0, 0))
+        self.assertTrue(proxy.is_loaded)
+
+    def test_on_load_hook_runs_once(self):
+        """The on_load hook runs before the first import only"""
+        calls = []
+        proxy = LazyModule('colorsys', on_load=lambda: calls.append(1))
+        proxy.rgb_to_hls(0, 0, 0)
+        proxy.hls_to_rgb(0, 0, 0)
+        self.assertEqual(calls, [1])
+
+    def test_app_import_does_not_load_heavy_modules(self):
+        """Importing the WSGI entry point must not pull in pandas and friends"""
+        script = (
+            'import sys, wsgi; '
+            f'print("loaded:" + ",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+        )
+        result = subprocess.run([sys.executable, '-c', script], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip().splitlines()[-1], 'loaded:')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,11 @@
 import unittest
 from datetime import datetime, timedelta
-from app import app, db
+from app import create_app
+from extensions import db
 from models import User, Product, Expense, Sale, Supplier
 
+app = create_app('testing')
+
 class TestModels(unittest.TestCase):
     def setUp(self):
         app.config['TESTING'] = True
@@ -0,0 +1,76 @@
+import unittest
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import Float, MetaData, func, inspect, text
+from app import create_app
+from extensions import db
+from models import Expense, Product, Sale
+from money import Money, migrate_money_columns, to_cents
+
+app = create_app('testing')
+
+
+class TestMoney(unittest.TestCase):
+    def setUp(self):
+        self.app_context = app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_to_cents(self):
+        self.assertEqual(to_cents(19.99), 1999)
+        self.assertEqual(to_cents(1.005), 101)
+        self.assertEqual(to_cents(Decimal('0.125')), 13)
+        self.assertEqual(to_cents('250'), 25000)
+
+    def test_stored_as_cents_and_summed_exactly(self):
+        db.create_all()
+        db.session.add(Product(name='Bun', price=19.99, unit='piece'))
+        db.session.add_all(Sale(total_amount=0.1) for _ in range(10))
+        db.session.commit()
+
+        self.assertEqual(db.session.execute(text('SELECT price FROM product')).scalar(), 1999)
+        self.assertEqual(Product.query.one().price, 19.99)
+        # Ten float 0.1s add up to 0.9999999999999999; ten cents add up to 100
+        self.assertEqual(db.session.query(func.sum(Sale.total_amount)).scalar(), 1.0)
+        self.assertEqual(Sale.query.filter(Sale.total_amount >= 0.1).count(), 10)
+
+    def test_migrate_float_columns(self):
+        # Recreate the schema as it was before money moved to cents
+        legacy = MetaData()
+        for table in db.metadata.sorted_tables:
+            copy = table.to_metadata(legacy)
+            for column in copy.columns:
+                if isinstance(column.type, Money):
+                    column.type = Float()
+        legacy.create_all(db.engine)
+        with db.engine.begin() as conn:
+            conn.execute(text("INSERT INTO product (name, price, unit) VALUES ('Bun', 19.99, 'piece')"))
+            conn.execute(text("INSERT INTO expense (date, type, amount, description) "
+                              "VALUES ('2024-03-01', 'rent', 1234.565, 'March')"))
+
+        converted = migrate_money_columns()
+        self.assertIn('product.price', converted)
+        self.assertIn('sale_item.unit_price', converted)
+        self.assertEqual(migrate_money_columns(), [])
+
+        self.assertEqual(Product.query.one().price, 19.99)
+        self.assertEqual(Expense.query.one().amount, 1234.57)
+        self.assertEqual(Expense.query.one().date, date(2024, 3, 1))
+        inspector = inspect(db.engine)
+        self.assertIn('ix_product_price', {index['name'] for index in inspector.get_indexes('product')})
+        self.assertEqual(str(next(c['type'] for c in inspector.get_columns('product') if c['name'] == 'price')),
+                         'BIGINT')
+
+    def test_migrate_command(self):
+        db.create_all()
+        result = app.test_cli_runner().invoke(args=['migrate-money'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('0 money columns converted', result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
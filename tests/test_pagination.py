@@ -0,0 +1,79 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from app import create_app
+from extensions import db
+from models import Sale, User
+from services.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+app = create_app('testing')
+
+
+class TestSalesPagination(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        db.session.add(user)
+        start = datetime(2024, 3, 1, 8, 0)
+        # Pairs of sales share a timestamp, so only the id breaks the tie
+        db.session.add_all(Sale(total_amount=10.0 * i, sale_date=start + timedelta(minutes=i // 2))
+                           for i in range(25))
+        db.session.commit()
+        self.expected = [sale.id for sale in db.session.scalars(
+            select(Sale).order_by(Sale.sale_date.desc(), Sale.id.desc()))]
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def page(self, **params):
+        response = self.client.get('/api/sales', query_string={'per_page': 7, **params})
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_cursor_round_trip(self):
+        moment = datetime(2024, 3, 1, 8, 0)
+        self.assertEqual(decode_cursor(encode_cursor(Sale.sale_date, moment, 42), Sale.sale_date), (moment, 42))
+        with self.assertRaises(InvalidCursor):
+            decode_cursor('not-a-cursor', Sale.sale_date)
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(encode_cursor(Sale.sale_date, moment, 42), Sale.total_amount)
+
+    def test_walk_forwards_and_back(self):
+        pages = [self.page()]
+        self.assertIsNone(pages[0]['prev_cursor'])
+        while pages[-1]['next_cursor']:
+            pages.append(self.page(after=pages[-1]['next_cursor']))
+        self.assertEqual([len(page['sales']) for page in pages], [7, 7, 7, 4])
+        self.assertEqual([sale['id'] for page in pages for sale in page['sales']], self.expected)
+
+        back = [pages[-1]]
+        while back[-1]['prev_cursor']:
+            back.append(self.page(before=back[-1]['prev_cursor']))
+        self.assertEqual([[s['id'] for s in page['sales']] for page in reversed(back)],
+                         [[s['id'] for s in page['sales']] for page in pages])
+
+    def test_html_view(self):
+        response = self.client.get('/sales?per_page=10')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Older', response.data)
+        self.assertNotIn(b'Newer', response.data)
+        self.assertEqual(self.client.get('/api/sales?after=garbage').status_code, 400)
+        self.assertEqual(self.client.get('/sales?after=garbage').status_code, 302)
+
+    def test_pages_use_the_index(self):
+        plan = db.session.execute(text(
+            'EXPLAIN QUERY PLAN SELECT id FROM sale WHERE (sale_date, id) < (:d, :id) '
+            'ORDER BY sale_date DESC, id DESC LIMIT 8'
+        ), {'d': '2024-03-01 08:05:00.000000', 'id': 12}).all()
+        self.assertTrue(any('idx_sale_date_id' in row[-1] for row in plan), plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
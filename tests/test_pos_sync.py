@@ -0,0 +1,127 @@
+import unittest
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from sqlalchemy import event
+from app import create_app
+from extensions import db
+from models import DailySalesSummary, Product, Sale, SaleItem, StockHistory, User
+
+app = create_app('testing')
+
+
+class TestPosSync(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        self.bread = Product(name='Bread', price=50.0, unit='loaf', stock_quantity=10_000)
+        self.cake = Product(name='Cake', price=500.0, unit='piece', stock_quantity=3)
+        db.session.add_all([user, self.bread, self.cake])
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+        self.start = datetime(2024, 3, 1, 8, 0, tzinfo=timezone.utc)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def queued_sale(self, minutes, product=None, quantity=1, payment_method='cash'):
+        product = product or self.bread
+        return {
+            'client_uuid': str(uuid.uuid4()),
+            'sale_date': (self.start + timedelta(minutes=minutes)).isoformat(),
+            'items': [{'id': product.id, 'quantity': quantity, 'price': product.price}],
+            'total_amount': product.price * quantity,
+            'payment_method': payment_method,
+        }
+
+    def sync(self, sales):
+        response = self.client.post('/api/pos/sync', json={'sales': sales})
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_batch_is_ingested(self):
+        sales = [self.queued_sale(i, quantity=2, payment_method='mpesa' if i % 2 else 'cash')
+                 for i in range(500)]
+        data = self.sync(sales)
+        self.assertEqual(data['created'], 500)
+        self.assertEqual([r['client_uuid'] for r in data['results']], [s['client_uuid'] for s in sales])
+        self.assertEqual(Sale.query.count(), 500)
+        self.assertEqual(SaleItem.query.count(), 500)
+        self.assertEqual(StockHistory.query.count(), 500)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Product, self.bread.id).stock_quantity, 9_000)
+
+        sale = db.session.get(Sale, data['results'][0]['sale_id'])
+        self.assertEqual(sale.client_uuid, sales[0]['client_uuid'])
+        self.assertEqual(sale.sale_date, self.start.replace(tzinfo=None))
+        rollup = {row.payment_method: row for row in DailySalesSummary.query.filter_by(summary_date=date(2024, 3, 1))}
+        self.assertEqual(rollup['cash'].transactions, 250)
+        self.assertEqual(rollup['cash'].amount_paid, 25_000.0)
+        self.assertEqual(rollup['mpesa'].amount_paid, 0.0)
+
+    def test_statement_count_does_not_grow(self):
+        """Syncing 200 sales issues as many statements as syncing 20"""
+        def count_statements(size):
+            sales = [self.queued_sale(i) for i in range(size)]
+            statements = []
+
+            def capture(conn, cursor, statement, parameters, context, executemany):
+                statements.append(statement)
+
+            event.listen(db.engine, 'before_cursor_execute', capture)
+            try:
+                self.sync(sales)
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', capture)
+            return len(statements)
+
+        count_statements(1)  # the first request also loads the session state
+        self.assertEqual(count_statements(20), count_statements(200))
+
+    def test_resent_sales_are_duplicates(self):
+        sales = [self.queued_sale(i) for i in range(3)]
+        first = self.sync(sales[:2])
+        data = self.sync(sales + [sales[2]])
+        self.assertEqual([r['status'] for r in data['results']], ['duplicate', 'duplicate', 'created', 'duplicate'])
+        self.assertEqual(data['results'][0]['sale_id'], first['results'][0]['sale_id'])
+        self.assertEqual(data['results'][3]['sale_id'], data['results'][2]['sale_id'])
+        self.assertEqual(Sale.query.count(), 3)
+
+    def test_oldest_sales_win_scarce_stock(self):
+        late = self.queued_sale(30, self.cake, 2)
+        early = self.queued_sale(10, self.cake, 2)
+        invalid = {'client_uuid': 'not-a-uuid', 'items': [], 'sale_date': self.start.isoformat()}
+        data = self.sync([late, early, invalid])
+        statuses = [r['status'] for r in data['results']]
+        self.assertEqual(statuses, ['rejected', 'created', 'rejected'])
+        self.assertEqual(data['results'][0]['shortfalls'],
+                         [{'product_id': self.cake.id, 'name': 'Cake', 'requested': 2, 'available': 1}])
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Product, self.cake.id).stock_quantity, 1)
+
+    def test_repeat_of_rejected_sale_is_rejected(self):
+        too_many = self.queued_sale(0, self.cake, 5)
+        data = self.sync([too_many, self.queued_sale(1), too_many])
+        self.assertEqual([r['status'] for r in data['results']], ['rejected', 'created', 'rejected'])
+        self.assertEqual(data['results'][2], data['results'][0])
+        self.assertIsNone(data['results'][2]['sale_id'])
+        self.assertEqual(data['results'][2]['shortfalls'],
+                         [{'product_id': self.cake.id, 'name': 'Cake', 'requested': 5, 'available': 3}])
+        self.assertEqual(Sale.query.count(), 1)
+
+    def test_batch_limit(self):
+        app.config['POS_SYNC_MAX_SALES'] = 2
+        try:
+            response = self.client.post('/api/pos/sync', json={'sales': [self.queued_sale(i) for i in range(3)]})
+        finally:
+            app.config['POS_SYNC_MAX_SALES'] = 1000
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, select, text
+from app import create_app
+from extensions import db
+from models import Payment, Sale, User
+from services.receivables import OUTSTANDING, rebuild_sale_balances
+
+app = create_app('testing')
+
+
+class TestReceivables(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        self.cash = Sale(total_amount=150.0, payment_method='cash', sale_date=now - timedelta(days=60))
+        self.old = Sale(total_amount=300.0, payment_method='mpesa', payment_status='pending',
+                        sale_date=now - timedelta(days=45))
+        self.recent = Sale(total_amount=80.5, payment_method='card', payment_status='pending',
+                           sale_date=now - timedelta(days=2))
+        db.session.add_all([user, self.cash, self.old, self.recent])
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def amounts(self, sale):
+        db.session.refresh(sale)
+        return sale.amount_paid, sale.balance_due, sale.payment_status
+
+    def test_balances_follow_payments(self):
+        self.assertEqual(self.amounts(self.cash), (150.0, 0.0, 'completed'))
+        self.assertEqual(self.amounts(self.old), (0.0, 300.0, 'pending'))
+
+        self.client.post(f'/sales/{self.old.id}/payment', data={
+            'amount': 100.1, 'payment_method': 'mpesa', 'transaction_id': 'QX1'})
+        self.assertEqual(self.amounts(self.old), (100.1, 199.9, 'partial'))
+        self.client.post(f'/sales/{self.old.id}/payment', data={'amount': 199.9, 'payment_method': 'cash'})
+        self.assertEqual(self.amounts(self.old), (300.0, 0.0, 'completed'))
+
+        payment = Payment.query.filter_by(sale_id=self.old.id, amount=199.9).one()
+        response = self.client.post(f'/payments/{payment.id}/status', json={'status': 'failed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.amounts(self.old), (100.1, 199.9, 'partial'))
+
+        # Rolled back with the payment
+        db.session.add(Payment(sale_id=self.recent.id, amount=80.5, payment_method='card', status='completed'))
+        db.session.flush()
+        self.assertEqual(db.session.get(Sale, self.recent.id).balance_due, 0.0)
+        db.session.rollback()
+        self.assertEqual(self.amounts(self.recent), (0.0, 80.5, 'pending'))
+
+    def test_receivables(self):
+        data = self.client.get('/api/receivables').get_json()
+        self.assertEqual(data['summary'], {'sales': 2, 'outstanding': 380.5, 'overdue': 300.0, 'overdue_days': 30})
+        self.assertEqual([s['id'] for s in data['sales']], [self.old.id, self.recent.id])
+
+        first = self.client.get('/api/receivables?per_page=1').get_json()
+        second = self.client.get(f"/api/receivables?per_page=1&after={first['next_cursor']}").get_json()
+        self.assertEqual([s['id'] for s in first['sales'] + second['sales']], [self.old.id, self.recent.id])
+
+        response = self.client.get('/sales/receivables')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'380.50', response.data)
+
+    def test_rebuild_after_core_inserts(self):
+        db.session.execute(insert(Payment.__table__).values(
+            sale_id=self.recent.id, amount=80.5, payment_method='card', status='completed'))
+        self.assertEqual(self.amounts(self.recent)[:2], (0.0, 80.5))
+        self.assertEqual(rebuild_sale_balances(), 3)
+        db.session.commit()
+        self.assertEqual(self.amounts(self.recent)[:2], (80.5, 0.0))
+
+    def test_outstanding_sales_use_the_partial_index(self):
+        for query in (select(Sale.id).where(OUTSTANDING).order_by(Sale.sale_date, Sale.id).limit(51),
+                      select(db.func.sum(Sale.balance_due)).where(OUTSTANDING)):
+            compiled = query.compile(db.engine, compile_kwargs={'literal_binds': True})
+            plan = ' '.join(row[-1] for row in db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')))
+            self.assertIn('idx_sale_outstanding', plan)
+
+
+if __name__ == '__main__':
+    unittest.main()
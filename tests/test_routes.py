@@ -1,10 +1,14 @@
+import io
 import json
 import unittest
-from app import app, db
-from models import User, Product, Expense, Sale, Supplier, SaleItem
+from app import create_app
+from extensions import db
+from models import User, Product, Expense, Sale, Supplier, SaleItem, StockHistory
 from forms import ExpenseForm, ProductForm, ImportForm
 from flask_login import login_user, current_user
 
+app = create_app('testing')
+
 class TestRoutes(unittest.TestCase):
     def setUp(self):
         """Set up test client and initialize database"""
@@ -84,6 +88,22 @@ class TestRoutes(unittest.TestCase):
         response = self.app.post('/products/new', data=product_data, follow_redirects=True)
         self.assertEqual(response.status_code, 200)
 
+    def test_reorder_product(self):
+        """A reorder request is logged in the stock ledger"""
+        self.login()
+        product = Product(name='Flour', price=120.0, unit='kg', stock_quantity=3,
+                          minimum_stock_level=15, reorder_quantity=20)
+        db.session.add(product)
+        db.session.commit()
+
+        response = self.app.post(f'/inventory/reorder/{product.id}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.get_json()['success'])
+        entry = StockHistory.query.filter_by(product_id=product.id, type='reorder').one()
+        self.assertEqual((entry.quantity, entry.notes), (30, 'Reorder request for 30 units'))
+        self.assertEqual(db.session.get(Product, product.id).stock_quantity, 3)
+        self.assertEqual(self.app.post('/inventory/reorder/999').status_code, 404)
+
     def test_expense_routes(self):
         """Test expense-related routes"""
         self.login()
@@ -145,6 +165,29 @@ class TestRoutes(unittest.TestCase):
         response = self.app.get('/import/products')
         self.assertEqual(response.status_code, 200)
 
+    def test_inventory_import_rejects_bad_rows(self):
+        """Negative quantities and stock shortfalls abort the import with their own messages"""
+        self.login()
+        bread = Product(name='Bread', price=50.0, unit='loaf', stock_quantity=10)
+        db.session.add(bread)
+        db.session.commit()
+
+        def import_csv(lines):
+            data = {'file': (io.BytesIO('\n'.join(['product_id,quantity,type,reference'] + lines).encode()),
+                             'stock.csv')}
+            return self.app.post('/import/inventory', data=data, content_type='multipart/form-data')
+
+        response = import_csv([f'{bread.id},5,in,PO1', f'{bread.id},-3,out,SO1'])
+        self.assertIn(b'Row 3: quantity must not be negative', response.data)
+        response = import_csv([f'{bread.id},25,out,SO2'])
+        self.assertIn(b'Insufficient stock for Bread: 25 requested, 10 available', response.data)
+        self.assertEqual(db.session.get(Product, bread.id).stock_quantity, 10)
+        self.assertEqual(StockHistory.query.count(), 0)
+
+        response = import_csv([f'{bread.id},5,in,PO1', f'{bread.id},3,out,SO1'])
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(db.session.get(Product, bread.id).stock_quantity, 12)
+
     def test_logout_route(self):
         """Test logout route"""
         self.login()
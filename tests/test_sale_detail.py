@@ -0,0 +1,86 @@
+import unittest
+from sqlalchemy import event
+from app import create_app
+from extensions import cache, db
+from models import Product, Sale, SaleItem, User
+
+app = create_app('testing')
+
+
+class TestSaleDetail(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        cache.clear()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        products = [Product(name=f'Loaf {i}', price=50.0, unit='loaf') for i in range(3)]
+        self.sale = Sale(customer_name='Amina', total_amount=150.0, payment_method='cash',
+                         payment_status='completed')
+        self.sale.items = [SaleItem(product=product, quantity=1, unit_price=50.0, total_price=50.0)
+                           for product in products]
+        db.session.add_all([user, self.sale])
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def get(self, sale_id):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            response = self.client.get(f'/sales/{sale_id}')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+        return response, statements
+
+    def test_completed_receipt_is_cached(self):
+        response, statements = self.get(self.sale.id)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Loaf 2', response.data)
+        self.assertEqual(len([s for s in statements if 'sale_item' in s]), 1)
+
+        cached, statements = self.get(self.sale.id)
+        self.assertEqual(cached.data, response.data)
+        self.assertFalse([s for s in statements if 'sale_item' in s])
+
+        # Changing the sale moves updated_at and so the cache key
+        sale = db.session.get(Sale, self.sale.id)
+        sale.customer_name = 'Baraka'
+        db.session.commit()
+        updated, _ = self.get(self.sale.id)
+        self.assertIn(b'Baraka', updated.data)
+
+    def test_pending_and_missing_sales(self):
+        sale = db.session.get(Sale, self.sale.id)
+        sale.payment_status = 'pending'
+        db.session.commit()
+        self.get(self.sale.id)
+        _, statements = self.get(self.sale.id)
+        self.assertEqual(len([s for s in statements if 'sale_item' in s]), 1)
+        self.assertEqual(self.get(self.sale.id + 1)[0].status_code, 404)
+
+    def test_item_logging_is_behind_flag(self):
+        with self.assertNoLogs('barkery_system', level='INFO'):
+            self.get(self.sale.id)
+        cache.clear()
+        app.config['SALE_DEBUG_LOGGING'] = True
+        try:
+            with self.assertLogs('barkery_system', level='INFO') as logs:
+                self.get(self.sale.id)
+        finally:
+            app.config['SALE_DEBUG_LOGGING'] = False
+        self.assertEqual(len(logs.output), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
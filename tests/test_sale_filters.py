@@ -0,0 +1,86 @@
+import unittest
+from datetime import datetime, timedelta
+from sqlalchemy import select, text
+from app import create_app
+from extensions import db
+from models import Sale, User
+from services.sale_queries import filter_sales
+
+app = create_app('testing')
+
+
+class TestSaleFilters(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        db.session.add(user)
+        start = datetime(2024, 3, 1, 9, 0)
+        customers = ['Amina Otieno', 'amir', 'Baraka', None]
+        db.session.add_all(
+            Sale(total_amount=float(100 + i), sale_date=start + timedelta(hours=12 * i),
+                 customer_name=customers[i % 4], payment_method=('cash', 'mpesa', 'card')[i % 3],
+                 payment_status='completed' if i % 2 else 'pending')
+            for i in range(24)
+        )
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def sales(self, **params):
+        response = self.client.get('/api/sales', query_string=params)
+        self.assertEqual(response.status_code, 200, response.get_data(as_text=True))
+        return response.get_json()
+
+    def test_filters(self):
+        data = self.sales(date_from='2024-03-02', date_to='2024-03-03', payment_method='mpesa')
+        self.assertEqual([s['sale_date'] for s in data['sales']], ['2024-03-03T09:00:00'])
+        self.assertEqual(data['filters'], {'date_from': '2024-03-02', 'date_to': '2024-03-03',
+                                           'payment_method': 'mpesa'})
+
+        names = {s['customer_name'] for s in self.sales(customer='AMI')['sales']}
+        self.assertEqual(names, {'Amina Otieno', 'amir'})
+        pending = self.sales(payment_status='pending', customer='bar')['sales']
+        self.assertEqual({(s['customer_name'], s['payment_status']) for s in pending}, {('Baraka', 'pending')})
+
+        # No code point follows U+10FFFF, so the range is bounded by the one before it
+        self.assertEqual(self.sales(customer='ami\U0010ffff')['sales'], [])
+        self.assertEqual(self.sales(customer='\U0010ffff')['sales'], [])
+
+    def test_sort_by_amount_across_pages(self):
+        first = self.sales(sort='largest', payment_status='completed', per_page=5)
+        second = self.sales(sort='largest', payment_status='completed', per_page=5, after=first['next_cursor'])
+        amounts = [s['total_amount'] for s in first['sales'] + second['sales']]
+        self.assertEqual(amounts, [123.0, 121.0, 119.0, 117.0, 115.0, 113.0, 111.0, 109.0, 107.0, 105.0])
+        # A cursor only works with the sort it came from
+        self.assertEqual(self.client.get('/api/sales', query_string={'after': first['next_cursor']}).status_code, 400)
+
+    def test_invalid_filters(self):
+        self.assertEqual(self.client.get('/api/sales?date_from=yesterday').status_code, 400)
+        self.assertEqual(self.client.get('/api/sales?sort=random').status_code, 400)
+        response = self.client.get('/sales?customer=ami&payment_method=cash')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'value="ami"', response.data)
+
+    def test_filters_use_indexes(self):
+        def plan(**filters):
+            query, sort_column, _ = filter_sales(select(Sale.id), filters)
+            compiled = query.order_by(sort_column.desc(), Sale.id.desc()).limit(51).compile(
+                db.engine, compile_kwargs={'literal_binds': True})
+            rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {compiled}')).all()
+            return ' '.join(row[-1] for row in rows)
+
+        self.assertIn('idx_sale_method_date', plan(payment_method='mpesa'))
+        self.assertIn('idx_sale_customer_date', plan(customer='ami'))
+        self.assertIn('INDEX idx_sale_date', plan(date_from='2024-03-02', date_to='2024-03-03'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+from sqlalchemy import event
+from app import create_app
+from extensions import cache, db
+from models import Payment, Product, Sale, SaleItem, User
+
+app = create_app('testing')
+
+VIEWS = ('/sales/{}', '/sales/{}/debug', '/sales/{}/edit', '/sales/{}/payments', '/sales/{}/payment')
+
+
+class TestSaleQueries(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        db.session.add(user)
+        db.session.commit()
+        self.small, self.large = self.make_sale(2), self.make_sale(12)
+        db.session.expunge_all()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def make_sale(self, lines):
+        sale = Sale(total_amount=10.0 * lines, payment_status='completed')
+        for i in range(lines):
+            product = Product(name=f'Item {lines}-{i}', price=10.0, unit='piece', stock_quantity=10)
+            sale.items.append(SaleItem(product=product, quantity=1, unit_price=10.0, total_price=10.0))
+        sale.payments = [Payment(amount=5.0 * lines, payment_method='cash', status='completed')
+                         for _ in range(2)]
+        db.session.add(sale)
+        db.session.commit()
+        return sale.id
+
+    def count_queries(self, url):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        cache.clear()
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            response = self.client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+        self.assertEqual(response.status_code, 200, url)
+        return len(statements)
+
+    def test_query_count_does_not_depend_on_lines(self):
+        for view in VIEWS:
+            self.count_queries(view.format(self.small))  # warm up
+            self.assertEqual(self.count_queries(view.format(self.small)),
+                             self.count_queries(view.format(self.large)), view)
+
+    def test_payments_relationship(self):
+        sale = db.session.get(Sale, self.small)
+        self.assertEqual(len(sale.payments), 2)
+        self.assertIs(sale.payments[0].sale, sale)
+        response = self.client.get(f'/sales/{self.small}/payment')
+        self.assertIn(b'Previous Payments', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import json
+import unittest
+from datetime import date, datetime, timezone
+from app import create_app
+from extensions import db
+from models import DailySalesSummary, Payment, Product, Sale, SaleItem, User
+from services import sales_summary
+
+app = create_app('testing')
+
+
+class TestDailySalesSummary(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        self.product = Product(name='Test Bread', price=50.0, unit='loaf', stock_quantity=100)
+        db.session.add_all([user, self.product])
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def checkout(self, quantity, payment_method='cash'):
+        self.client.post('/pos/process', data={
+            'items': json.dumps([{'id': self.product.id, 'quantity': quantity, 'price': 50.0}]),
+            'total_amount': 50.0 * quantity,
+            'payment_method': payment_method,
+        })
+
+    def summary(self):
+        return {
+            row.payment_method: (row.revenue, row.transactions, row.items_sold, row.amount_paid)
+            for row in DailySalesSummary.query.filter_by(summary_date=datetime.now(timezone.utc).date())
+        }
+
+    def test_checkout_updates_rollup(self):
+        """Each POS sale is added to its day and payment method"""
+        self.checkout(2)
+        self.checkout(1)
+        self.checkout(3, payment_method='mpesa')
+        self.assertEqual(self.summary(), {
+            'cash': (150.0, 2, 3, 150.0),
+            'mpesa': (150.0, 1, 3, 0.0),
+        })
+
+    def test_payment_and_delete(self):
+        """Payments raise amount paid and deleting a sale removes it"""
+        self.checkout(4, payment_method='mpesa')
+        sale = Sale.query.one()
+        self.client.post(f'/sales/{sale.id}/payment', data={
+            'amount': 120.0, 'payment_method': 'mpesa', 'transaction_id': 'QX123',
+        })
+        self.assertEqual(self.summary()['mpesa'], (200.0, 1, 4, 120.0))
+
+        self.client.post(f'/sales/{sale.id}/delete')
+        self.assertEqual(self.summary()['mpesa'], (0.0, 0, 0, 0.0))
+
+    def test_failed_checkout_leaves_rollup(self):
+        """A rejected sale rolls the rollup back with it"""
+        self.checkout(500)
+        self.assertEqual(self.summary(), {})
+
+    def test_rebuild_matches_incremental(self):
+        """Rebuilding from the sales tables gives the incrementally kept totals"""
+        self.checkout(2)
+        self.checkout(5, payment_method='card')
+        sale = Sale.query.filter_by(payment_method='card').one()
+        self.client.post(f'/sales/{sale.id}/payment', data={'amount': 250.0, 'payment_method': 'card'})
+        incremental = self.summary()
+
+        DailySalesSummary.query.delete()
+        db.session.commit()
+        sales_summary.rebuild_daily_sales_summary()
+        db.session.commit()
+        self.assertEqual(self.summary(), incremental)
+
+    def test_rebuild_range(self):
+        """A ranged rebuild only replaces the requested days"""
+        for sale_date, amount in [(datetime(2024, 3, 14, 23, 59), 10.0),
+                                  (datetime(2024, 3, 15, 9, 0), 20.0),
+                                  (datetime(2024, 3, 16, 0, 0), 40.0)]:
+            sale = Sale(total_amount=amount, sale_date=sale_date)
+            sale.items.append(SaleItem(product=self.product, quantity=1, unit_price=amount, total_price=amount))
+            db.session.add(sale)
+        db.session.commit()
+
+        self.assertEqual(sales_summary.rebuild_daily_sales_summary(date(2024, 3, 15), date(2024, 3, 15)), 1)
+        db.session.commit()
+        self.assertEqual(sales_summary.period_totals(date(2024, 3, 1), date(2024, 4, 1)), [
+            {'date': date(2024, 3, 15), 'revenue': 20.0, 'transactions': 1, 'items_sold': 1, 'amount_paid': 20.0},
+        ])
+
+    def test_rebuild_command(self):
+        db.session.add(Sale(total_amount=75.0, sale_date=datetime(2024, 3, 15, 9, 0)))
+        db.session.add(Payment(sale_id=1, amount=30.0, payment_method='cash', status='completed'))
+        db.session.commit()
+        result = app.test_cli_runner().invoke(args=['rebuild-sales-summary'])
+        self.assertIn('Rebuilt 1 daily sales summary rows', result.output)
+        row = DailySalesSummary.query.one()
+        self.assertEqual((row.revenue, row.transactions, row.amount_paid), (75.0, 1, 30.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
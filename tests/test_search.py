@@ -0,0 +1,89 @@
+import unittest
+from app import create_app
+from extensions import db
+from models import Product, User
+from services.search import match_expression, rebuild_search_index
+
+app = create_app('testing')
+
+
+class TestProductSearch(unittest.TestCase):
+    def setUp(self):
+        self.client = app.test_client()
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        self.products = {
+            name: Product(name=name, price=100.0, unit='piece', category=category, description=description)
+            for name, category, description in (
+                ('Chocolate Cake', 'cakes', 'Rich sponge'),
+                ('Carrot Cake', 'cakes', 'With chocolate frosting'),
+                ('White Bread', 'bread', 'Sliced loaf'),
+                ('Crème Brûlée', 'desserts', None),
+            )
+        }
+        db.session.add(user)
+        db.session.add_all(self.products.values())
+        db.session.commit()
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def search(self, q, **params):
+        response = self.client.get('/api/products/search', query_string={'q': q, **params})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def names(self, q, **params):
+        return [product['name'] for product in self.search(q, **params)['products']]
+
+    def test_match_expression(self):
+        self.assertEqual(match_expression('choc  "cak'), '"choc"* AND "cak"*')
+        self.assertIsNone(match_expression(' -* '))
+
+    def test_prefix_match_ranked_by_name(self):
+        self.assertEqual(self.names('choc'), ['Chocolate Cake', 'Carrot Cake'])
+        self.assertEqual(self.names('choc cak'), ['Chocolate Cake', 'Carrot Cake'])
+        self.assertEqual(self.names('bread'), ['White Bread'])
+        self.assertEqual(self.names('creme'), ['Crème Brûlée'])
+        self.assertEqual(self.names(''), [])
+
+    def test_pagination(self):
+        first = self.search('cake', per_page=1)
+        second = self.search('cake', per_page=1, page=2)
+        self.assertTrue(first['has_more'])
+        self.assertFalse(second['has_more'])
+        self.assertEqual(len({first['products'][0]['id'], second['products'][0]['id']}), 2)
+
+    def test_index_follows_product_changes(self):
+        bread = self.products['White Bread']
+        bread.name = 'Brown Bread'
+        db.session.add(Product(name='Banana Bread', price=80.0, unit='loaf', category='bread'))
+        db.session.delete(self.products['Carrot Cake'])
+        self.products['Crème Brûlée'].is_active = False
+        db.session.commit()
+
+        self.assertEqual(sorted(self.names('bread')), ['Banana Bread', 'Brown Bread'])
+        self.assertEqual(self.names('white'), [])
+        self.assertEqual(self.names('choc'), ['Chocolate Cake'])
+        self.assertEqual(self.names('creme'), [])
+
+        # The product list searches inactive products too
+        response = self.client.get('/products?q=creme')
+        self.assertIn(b'Cr\xc3\xa8me', response.data)
+        self.assertNotIn(b'Chocolate Cake', response.data)
+
+    def test_rebuild(self):
+        db.session.execute(db.text('DELETE FROM product_search'))
+        self.assertEqual(self.names('cake'), [])
+        self.assertEqual(rebuild_search_index(), 4)
+        self.assertEqual(self.names('cake'), ['Chocolate Cake', 'Carrot Cake'])
+
+
+if __name__ == '__main__':
+    unittest.main()
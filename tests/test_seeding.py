@@ -0,0 +1,65 @@
+import unittest
+from sqlalchemy import func
+from app import create_app
+from extensions import db
+from models import DailySalesSummary, Payment, Product, Sale, SaleItem, StockHistory, User
+from seeding import SeedPlan, seed_database
+
+app = create_app('testing')
+
+PLAN = SeedPlan(suppliers=3, products=20, employees=4, recipes=5, production_batches=30,
+                sales=200, items_per_sale=3, expenses=10, stock_history=100, days=30)
+
+
+class TestSeeding(unittest.TestCase):
+    def setUp(self):
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='admin', email='admin@example.com', is_active=True)
+        user.set_password('adminpassword')
+        db.session.add(user)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_row_counts(self):
+        inserted = seed_database(PLAN, random_seed=1)
+        self.assertEqual(inserted['product'], 20)
+        self.assertEqual(inserted['sale'], 200)
+        self.assertEqual(Sale.query.count(), 200)
+        self.assertEqual(SaleItem.query.count(), inserted['sale_item'])
+        self.assertEqual(StockHistory.query.count(), 100)
+        self.assertEqual(Payment.query.count(), inserted['payment'])
+
+    def test_consistent_totals(self):
+        """Sale totals match their items and the rollup matches the sales"""
+        seed_database(PLAN, random_seed=1)
+        item_totals = dict(db.session.query(SaleItem.sale_id, func.sum(SaleItem.total_price))
+                           .group_by(SaleItem.sale_id))
+        for sale in Sale.query:
+            self.assertAlmostEqual(sale.total_amount, item_totals[sale.id], places=2)
+
+        rollup_revenue = db.session.query(func.sum(DailySalesSummary.revenue)).scalar()
+        sales_revenue = db.session.query(func.sum(Sale.total_amount)).scalar()
+        self.assertAlmostEqual(rollup_revenue, sales_revenue, places=2)
+
+    def test_appends(self):
+        """Seeding twice appends rows instead of replacing them"""
+        seed_database(PLAN, random_seed=1)
+        seed_database(PLAN, random_seed=2)
+        self.assertEqual(Product.query.count(), 40)
+        self.assertEqual(Sale.query.count(), 400)
+
+    def test_seed_command(self):
+        result = app.test_cli_runner().invoke(args=['seed', '--scale', '0.001', '--seed', '3'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('sale: 100', result.output)
+        self.assertEqual(Sale.query.count(), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from app import create_app
+from extensions import db
+from helpers import testing_config
+from models import Product, Sale, SaleItem, User
+from sql_profiling import QueryStats, statement_shape
+
+
+class TestStatementShape(unittest.TestCase):
+    def test_in_lists_collapse(self):
+        """IN lists of any length and whitespace differences share one shape"""
+        self.assertEqual(
+            statement_shape('SELECT * FROM product\n WHERE id IN (?, ?, ?)'),
+            statement_shape('SELECT * FROM product WHERE id IN (?)'),
+        )
+        self.assertEqual(
+            statement_shape('SELECT * FROM product WHERE id IN (%(id_1_1)s, %(id_1_2)s)'),
+            'SELECT * FROM product WHERE id IN (?)',
+        )
+
+    def test_repeated(self):
+        stats = QueryStats()
+        for _ in range(3):
+            stats.record('SELECT 1', 0.001)
+        stats.record('SELECT 2', 0.001)
+        self.assertEqual(stats.count, 4)
+        self.assertEqual(stats.repeated(2), [('SELECT 1', 3)])
+
+
+class TestRequestProfiling(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(testing_config(SQL_PROFILING=True, SQL_SERVER_TIMING=True, SQL_REPEAT_THRESHOLD=3))
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        user = User(username='testuser', email='testuser@example.com', is_active=True)
+        user.set_password('testpassword')
+        db.session.add(user)
+
+        sale = Sale(total_amount=50.0)
+        for i in range(5):
+            product = Product(name=f'Bread {i}', price=10.0, unit='loaf', stock_quantity=10)
+            sale.items.append(SaleItem(product=product, quantity=1, unit_price=10.0, total_price=10.0))
+        db.session.add(sale)
+        db.session.commit()
+        self.sale_id = sale.id
+        db.session.expunge_all()
+
+        @self.app.route('/lazy-products/<int:id>')
+        def lazy_products(id):
+            sale = db.session.get(Sale, id)
+            return ', '.join(item.product.name for item in sale.items)
+
+        self.client.post('/login', data={'username': 'testuser', 'password': 'testpassword'})
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_server_timing_header(self):
+        response = self.client.get('/dashboard')
+        self.assertEqual(response.status_code, 200)
+        self.assertRegex(response.headers['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries"$')
+
+    def test_repeated_statement_warns(self):
+        """Lazy-loading each item's product in a loop is reported as an N+1"""
+        with self.assertLogs('barkery_system', level='WARNING') as logs:
+            self.client.get(f'/lazy-products/{self.sale_id}')
+        self.assertTrue(any('Possible N+1 query in lazy_products' in line for line in logs.output))
+
+    def test_disabled(self):
+        app = create_app(testing_config(SQL_PROFILING=False))
+        with app.test_client() as client:
+            self.assertNotIn('Server-Timing', client.get('/login').headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import unittest
+from app import create_app
+from database import begin_write_transaction
+from extensions import db
+from helpers import testing_config
+from models import Product
+from services.stock import InsufficientStock, put_stock, take_stock
+
+app = create_app('testing')
+
+STRESS_STOCK = 60
+STRESS_WORKERS = 4
+
+
+def stress_config(path):
+    return testing_config(SQLALCHEMY_DATABASE_URI=f'sqlite:///{path}')
+
+
+def sell_until_empty(path, product_id, results):
+    """Worker: sell one unit per transaction until stock runs out."""
+    worker_app = create_app(stress_config(path))
+    sold = 0
+    with worker_app.app_context():
+        while True:
+            begin_write_transaction(db.session)
+            try:
+                take_stock({product_id: 1})
+            except InsufficientStock:
+                db.session.rollback()
+                break
+            db.session.commit()
+            sold += 1
+        db.engine.dispose()
+    results.put(sold)
+
+
+class TestStock(unittest.TestCase):
+    def setUp(self):
+        self.app_context = app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.bread = Product(name='Bread', price=50.0, unit='loaf', stock_quantity=5)
+        self.cake = Product(name='Cake', price=500.0, unit='piece', stock_quantity=2)
+        db.session.add_all([self.bread, self.cake])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_take_and_put(self):
+        take_stock({self.bread.id: 3, self.cake.id: 2})
+        put_stock({self.cake.id: 4})
+        db.session.commit()
+        self.assertEqual(db.session.get(Product, self.bread.id).stock_quantity, 2)
+        self.assertEqual(db.session.get(Product, self.cake.id).stock_quantity, 4)
+
+    def test_shortfall_changes_nothing(self):
+        """A cart with one short line leaves every product untouched"""
+        with self.assertRaises(InsufficientStock) as raised:
+            take_stock({self.bread.id: 1, self.cake.id: 3, 999: 1})
+        db.session.commit()
+        self.assertEqual([(s.product_id, s.requested, s.available) for s in raised.exception.shortfalls],
+                         [(self.cake.id, 3, 2), (999, 1, 0)])
+        self.assertEqual(self.bread.stock_quantity, 5)
+        self.assertEqual(self.cake.stock_quantity, 2)
+
+    def test_negative_quantity_rejected(self):
+        with self.assertRaises(ValueError):
+            put_stock({self.bread.id: -1})
+
+
+class TestConcurrentStock(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'stock.db')
+        self.app = create_app(stress_config(self.path))
+        with self.app.app_context():
+            db.create_all()
+            product = Product(name='Baguette', price=80.0, unit='piece', stock_quantity=STRESS_STOCK)
+            db.session.add(product)
+            db.session.commit()
+            self.product_id = product.id
+            db.engine.dispose()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_stock_never_negative(self):
+        """Several processes racing for the last units sell exactly the stock on hand"""
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        workers = [ctx.Process(target=sell_until_empty, args=(self.path, self.product_id, results))
+                   for _ in range(STRESS_WORKERS)]
+        for worker in workers:
+            worker.start()
+        sold = [results.get(timeout=60) for _ in workers]
+        for worker in workers:
+            worker.join(timeout=60)
+            self.assertEqual(worker.exitcode, 0)
+
+        self.assertEqual(sum(sold), STRESS_STOCK)
+        with self.app.app_context():
+            self.assertEqual(db.session.get(Product, self.product_id).stock_quantity, 0)
+            db.engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,10 @@
-from app import app, init_db
+from app import create_app, init_db
+
+# Created at import time so gunicorn (with --preload) builds the app once in
+# the master process and shares it with every forked worker.
+app = create_app()
 
 if __name__ == "__main__":
     with app.app_context():
         init_db()
-    app.run() 
\ No newline at end of file
+    app.run()